@@ -0,0 +1,95 @@
+"""
+精确求解器基准测试
+
+在 autoresearch 基准用例上比较 DQN 贪心 rollout 与分支定界精确求解器：
+终局奖励 (env 回放) 与单次规划延迟。
+
+使用方法:
+    python scripts/benchmark_exact_planner.py models/dqn_meal_best.policy
+    python scripts/benchmark_exact_planner.py models/dqn_meal_best.pt --max-nodes 32 --repeats 10
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from intelligent_meal_planner.rl.autoresearch.benchmark import get_default_benchmark_cases
+from intelligent_meal_planner.rl.exact_planner import solve_exact
+from intelligent_meal_planner.tools.rl_model_tool import (
+    load_policy,
+    make_planning_env,
+    EXACT_MAX_NODES,
+    replay_plan,
+    rollout_plans,
+)
+
+
+def _timed(fn, repeats):
+    """返回 (最后一次结果, 各次耗时毫秒)"""
+    result, elapsed = None, []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        elapsed.append((time.perf_counter() - start) * 1000.0)
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='精确求解器基准测试')
+    parser.add_argument('model', type=str, help='.pt 检查点或 .policy 导出路径')
+    parser.add_argument('--max-nodes', type=int, default=EXACT_MAX_NODES,
+                        help='精确求解展开节点上限 (0 表示不限)')
+    parser.add_argument('--time-limit-ms', type=float, default=None, help='精确求解时间保护上限 (毫秒)')
+    parser.add_argument('--repeats', type=int, default=5, help='每个用例重复计时次数')
+    parser.add_argument('--loose-budget', action='store_true', help='使用非严格预算 (默认严格)')
+    args = parser.parse_args()
+
+    model, engine = load_policy(Path(args.model))
+    max_nodes = args.max_nodes or None
+    print(f"DQN 推理引擎: {engine}, 精确求解节点上限: {max_nodes or '不限'}\n")
+    print(f"{'case':>16} | {'dqn reward':>10} | {'dqn ms':>7} | {'exact reward':>12} | "
+          f"{'exact ms':>8} | {'optimal':>7} | {'nodes':>6}")
+    print("-" * 84)
+
+    gains, dqn_ms, exact_ms = [], [], []
+    for case in get_default_benchmark_cases():
+        env = make_planning_env(
+            case.target_calories, case.target_protein, case.target_carbs,
+            case.target_fat, case.budget_limit, strict_budget=not args.loose_budget,
+        )
+        (dqn_plan,), dqn_elapsed = _timed(lambda: rollout_plans(model, [env]), args.repeats)
+        dqn_reward = dqn_plan[1]['final_reward'] if dqn_plan[2] == 'ok' else float('nan')
+
+        env.reset()
+        exact, exact_elapsed = _timed(
+            lambda: solve_exact(env, time_limit_ms=args.time_limit_ms, max_nodes=max_nodes),
+            args.repeats,
+        )
+        if exact is None:
+            exact_reward, optimal, nodes = float('nan'), False, 0
+        else:
+            # 以 env 回放的奖励为准
+            exact_reward = replay_plan(env, exact.actions)[1]['final_reward']
+            optimal, nodes = exact.optimal, exact.nodes
+
+        dqn_ms.append(statistics.median(dqn_elapsed))
+        exact_ms.append(statistics.median(exact_elapsed))
+        if dqn_plan[2] == 'ok' and exact is not None:
+            gains.append(exact_reward - dqn_reward)
+        print(f"{case.name:>16} | {dqn_reward:>10.2f} | {dqn_ms[-1]:>7.2f} | {exact_reward:>12.2f} | "
+              f"{exact_ms[-1]:>8.2f} | {str(optimal):>7} | {nodes:>6}")
+
+    print("-" * 84)
+    if gains:
+        print(f"平均奖励提升: {statistics.mean(gains):+.2f} (最小 {min(gains):+.2f})")
+    print(f"延迟中位数: DQN {statistics.median(dqn_ms):.2f} ms, 精确求解 {statistics.median(exact_ms):.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
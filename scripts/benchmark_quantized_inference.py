@@ -0,0 +1,64 @@
+"""
+量化推理基准测试
+
+在 autoresearch 基准用例上比较 fp32 Q 网络与其他推理实现
+(动态 int8 量化、NumPy .policy)：贪心动作一致率与单次 select_action 延迟。
+
+使用方法:
+    python scripts/benchmark_quantized_inference.py models/dqn_meal_best.pt
+    python scripts/benchmark_quantized_inference.py models/dqn_meal_best.pt --threads 1 --min-agreement 0.99
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from intelligent_meal_planner.rl.autoresearch.benchmark import get_default_benchmark_cases
+from intelligent_meal_planner.rl.autoresearch.evaluator import compare_agents
+from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+from intelligent_meal_planner.rl.numpy_policy import NumpyDuelingPolicy, export_numpy_policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description='量化推理基准测试')
+    parser.add_argument('checkpoint', type=str, help='.pt 检查点路径')
+    parser.add_argument('--threads', type=int, default=None, help='torch 线程预算 (默认 RL_INFERENCE_THREADS)')
+    parser.add_argument('--repeats', type=int, default=20, help='每个状态重复计时次数')
+    parser.add_argument('--min-agreement', type=float, default=None,
+                        help='int8 动作一致率低于该值时以非零状态退出')
+    args = parser.parse_args()
+
+    cases = get_default_benchmark_cases()
+    reference = MaskableDQNAgent.from_pretrained(args.checkpoint, device='cpu', num_threads=args.threads)
+    int8 = MaskableDQNAgent.from_pretrained(args.checkpoint, quantize=True, num_threads=args.threads)
+    with tempfile.TemporaryDirectory() as tmp:
+        numpy_policy = NumpyDuelingPolicy.load(
+            export_numpy_policy(args.checkpoint, Path(tmp) / 'policy.policy'), mmap=False
+        )
+
+    print(f"{'engine':>8} | {'agreement':>9} | {'mean ms':>8} | {'p50 ms':>8} | {'p99 ms':>8}")
+    print("-" * 54)
+    results = {}
+    for name, candidate in (('int8', int8), ('numpy', numpy_policy)):
+        result = compare_agents(reference, candidate, cases, repeats=args.repeats)
+        results[name] = result
+        if name == 'int8':
+            latency = result['reference_latency']
+            print(f"{'fp32':>8} | {1.0:>9.3f} | {latency['mean_ms']:>8.3f} | "
+                  f"{latency['p50_ms']:>8.3f} | {latency['p99_ms']:>8.3f}")
+        latency = result['candidate_latency']
+        print(f"{name:>8} | {result['agreement_rate']:>9.3f} | {latency['mean_ms']:>8.3f} | "
+              f"{latency['p50_ms']:>8.3f} | {latency['p99_ms']:>8.3f}")
+
+    if args.min_agreement is not None and results['int8']['agreement_rate'] < args.min_agreement:
+        print(f"int8 动作一致率 {results['int8']['agreement_rate']:.3f} 低于 {args.min_agreement}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
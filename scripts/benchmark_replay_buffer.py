@@ -0,0 +1,81 @@
+"""
+优先经验回放微基准测试
+
+测量 sample(batch_size) + update_priorities 的吞吐量 (次/秒) 及存储占用，
+缓冲区以随机经验填满后再计时。
+
+使用方法:
+    python scripts/benchmark_replay_buffer.py
+    python scripts/benchmark_replay_buffer.py --capacities 100000 1000000 --iterations 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from intelligent_meal_planner.rl.dqn.replay_buffer import PrioritizedReplayBuffer
+
+
+STATE_DIM = 13
+ACTION_DIM = 300
+
+
+def fill_buffer(buffer: PrioritizedReplayBuffer, chunk: int = 10000, seed: int = 0):
+    """以随机经验填满缓冲区"""
+    rng = np.random.default_rng(seed)
+    remaining = buffer.capacity
+    while remaining > 0:
+        n = min(chunk, remaining)
+        buffer.add_batch(
+            rng.uniform(-1, 1, size=(n, STATE_DIM)).astype(np.float32),
+            rng.integers(0, ACTION_DIM, size=n),
+            rng.normal(size=n).astype(np.float32),
+            rng.uniform(-1, 1, size=(n, STATE_DIM)).astype(np.float32),
+            rng.random(n) < 1 / 6,
+            rng.random((n, ACTION_DIM)) < 0.2,
+            rng.random((n, ACTION_DIM)) < 0.2,
+        )
+        remaining -= n
+
+
+def benchmark(capacity: int, batch_size: int, iterations: int):
+    buffer = PrioritizedReplayBuffer(capacity=capacity)
+    fill_buffer(buffer)
+    rng = np.random.default_rng(1)
+
+    # 预热，让优先级分布偏离初始的均匀值
+    for _ in range(10):
+        _, indices, _ = buffer.sample(batch_size)
+        buffer.update_priorities(indices, rng.normal(size=batch_size))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _, indices, _ = buffer.sample(batch_size)
+        buffer.update_priorities(indices, rng.normal(size=batch_size))
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed, buffer.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='优先经验回放微基准测试')
+    parser.add_argument('--capacities', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'capacity':>10} | {'sample+update /s':>17} | {'ms/iter':>8} | {'storage MB':>10}")
+    print("-" * 55)
+    for capacity in args.capacities:
+        rate, nbytes = benchmark(capacity, args.batch_size, args.iterations)
+        print(f"{capacity:>10,} | {rate:>17.0f} | {1000 / rate:>8.3f} | {nbytes / 2**20:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+策略蒸馏
+
+将训练好的 Dueling DQN (教师) 蒸馏为小型学生网络，并在 autoresearch 基准上
+用 evaluate_agent_dual 验证：学生得分与教师相差不超过容差时才保存并导出
+.policy 推理文件。
+
+使用方法:
+    python scripts/distill_policy.py models/dqn_meal_best.pt
+    python scripts/distill_policy.py models/dqn_meal_best.pt --hidden-dims 128 64 32 --tolerance 0.5
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+from intelligent_meal_planner.rl.dqn.distill import collect_teacher_dataset, distill_student, validate_student
+from intelligent_meal_planner.rl.numpy_policy import export_numpy_policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description='策略蒸馏')
+    parser.add_argument('teacher', type=str, help='教师 .pt 检查点')
+    parser.add_argument('--output', type=str, default=str(project_root / "models" / "dqn_meal_student.pt"))
+    parser.add_argument('--hidden-dims', type=int, nargs=3, default=[64, 64, 32])
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--rollouts', type=int, default=4, help='每个目标推演的 episode 数')
+    parser.add_argument('--tolerance', type=float, default=1.0, help='允许的基准得分差 (0-100 分制)')
+    parser.add_argument('--force', action='store_true', help='未通过验证也保存')
+    args = parser.parse_args()
+
+    teacher = MaskableDQNAgent.from_pretrained(args.teacher)
+    dataset = collect_teacher_dataset(teacher, n_rollouts=args.rollouts)
+    print(f"蒸馏数据: {len(dataset['states']):,} 个状态")
+
+    student = distill_student(teacher, dataset, hidden_dims=args.hidden_dims, epochs=args.epochs)
+    result = validate_student(teacher, student, tolerance=args.tolerance)
+
+    n_teacher = sum(p.numel() for p in teacher.q_network.parameters())
+    n_student = sum(p.numel() for p in student.q_network.parameters())
+    print(f"参数量: 教师 {n_teacher:,} -> 学生 {n_student:,}")
+    print(f"基准得分: 教师 {result['teacher_score']:.2f} | 学生 {result['student_score']:.2f} "
+          f"(差 {result['score_gap']:+.2f}, 容差 {args.tolerance})")
+    print(f"动作一致率: {result['agreement_rate']:.3f}")
+    print(f"p99 延迟: 教师 {result['teacher_latency']['p99_ms']:.3f} ms | "
+          f"学生 {result['student_latency']['p99_ms']:.3f} ms")
+
+    if not result['passed'] and not args.force:
+        print("学生未通过验证，未保存")
+        sys.exit(1)
+
+    student.save(args.output)
+    print(f"学生模型保存至: {args.output}")
+    print(f"推理文件导出至: {export_numpy_policy(args.output)}")
+
+
+if __name__ == '__main__':
+    main()
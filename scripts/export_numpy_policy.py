@@ -0,0 +1,38 @@
+"""
+导出推理模型
+
+将 MaskableDQNAgent 的 .pt 检查点转换为仅含 online 网络权重、网络结构与
+菜品目录版本的 .policy 文件，供 RLModelTool 在不导入 torch 的情况下
+以内存映射方式加载推理。
+
+使用方法:
+    python scripts/export_numpy_policy.py models/dqn_meal_best.pt
+    python scripts/export_numpy_policy.py models/dqn_meal_best.pt -o deploy/dqn_meal_best.policy
+    python scripts/export_numpy_policy.py old_checkpoint.pt --catalog-version 1a2b3c4d5e6f
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from intelligent_meal_planner.rl.numpy_policy import export_numpy_policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出推理模型')
+    parser.add_argument('checkpoint', type=str, help='.pt 检查点路径')
+    parser.add_argument('-o', '--output', type=str, default=None, help='输出路径 (默认同名 .policy)')
+    parser.add_argument('--catalog-version', type=str, default=None,
+                        help='训练所用菜品目录版本 (默认取检查点配置中记录的版本)')
+    args = parser.parse_args()
+
+    output = export_numpy_policy(args.checkpoint, args.output, args.catalog_version)
+    print(f"已导出: {output} ({output.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ DQN 训练脚本 - 带动作掩码的 Dueling Double DQN
     python scripts/train_dqn_maskable.py
     python scripts/train_dqn_maskable.py --timesteps 300000
     python scripts/train_dqn_maskable.py --mode test
+    python scripts/train_dqn_maskable.py --replay-save models/replay/run1
+    python scripts/train_dqn_maskable.py --replay-warm-start models/replay/run1
 """
 
 import sys
@@ -22,8 +24,13 @@ from torch.utils.tensorboard import SummaryWriter
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
+from intelligent_meal_planner.rl.catalog import RecipeCatalog
 from intelligent_meal_planner.rl.environment import MealPlanningEnv
+from intelligent_meal_planner.rl.vec_env import VecMealPlanningEnv
+from intelligent_meal_planner.rl.async_vec_env import AsyncMealPlanningVecEnv
+from intelligent_meal_planner.rl.telemetry import EpisodeTelemetry
 from intelligent_meal_planner.rl.dqn import MaskableDQNAgent, EpsilonScheduler
+from intelligent_meal_planner.rl.numpy_policy import export_numpy_policy
 
 
 # ============ 配置 ============
@@ -43,6 +50,9 @@ DQN_CONFIG = {
     # 经验回放
     'buffer_size': 100000,
     'min_buffer_size': 10000,
+    'buffer_dir': None,          # 内存映射存储目录 (None=内存; 容量超过内存时使用)
+    'buffer_warm_start': None,   # 预热用的经验语料目录 (由 --replay-save 保存)
+    'prefetch_batches': 2,       # 后台预取的批次数 (0=同步采样)
 
     # 探索 (与课程学习阶段对齐)
     'epsilon_schedule': [
@@ -59,6 +69,7 @@ DQN_CONFIG = {
 
     # 硬件
     'n_envs': 8,
+    'n_workers': 0,  # 环境工作进程数 (0=主进程内推进; 多核训练机可设为 CPU 核心数)
     'device': 'cuda' if torch.cuda.is_available() else 'cpu',
     'total_timesteps': 500000,
 }
@@ -74,15 +85,36 @@ def make_env(training_mode: bool = True) -> MealPlanningEnv:
     return MealPlanningEnv(training_mode=training_mode)
 
 
-def train(total_timesteps: int = None):
-    """训练 DQN 模型"""
+def make_vec_env(
+    n_envs: int,
+    training_mode: bool = True,
+    telemetry: EpisodeTelemetry = None,
+    n_workers: int = 0,
+):
+    """创建向量化环境 (n_workers > 0 时在多个工作进程中推进)"""
+    if n_workers > 0:
+        return AsyncMealPlanningVecEnv(
+            n_envs=n_envs, n_workers=n_workers,
+            training_mode=training_mode, telemetry=telemetry,
+        )
+    return VecMealPlanningEnv(n_envs=n_envs, training_mode=training_mode, telemetry=telemetry)
+
+
+def train(total_timesteps: int = None, replay_save: str = None):
+    """
+    训练 DQN 模型
+
+    Args:
+        total_timesteps: 总步数
+        replay_save: 训练结束后保存经验回放的目录 (供后续实验预热)
+    """
     total_timesteps = total_timesteps or DQN_CONFIG['total_timesteps']
     n_envs = DQN_CONFIG['n_envs']
 
     print(f"=" * 60)
     print(f"DQN 训练开始")
     print(f"设备: {DQN_CONFIG['device']}")
-    print(f"并行环境数: {n_envs}")
+    print(f"并行环境数: {n_envs} (工作进程: {DQN_CONFIG['n_workers']})")
     print(f"总步数: {total_timesteps:,}")
     print(f"=" * 60)
 
@@ -91,23 +123,28 @@ def train(total_timesteps: int = None):
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # 创建环境
-    envs = [make_env(training_mode=True) for _ in range(n_envs)]
+    # 创建环境 (episode 奖励分量写入遥测缓冲区，按日志间隔汇总到 TensorBoard)
+    telemetry = EpisodeTelemetry(capacity=8192)
+    vec_env = make_vec_env(
+        n_envs, training_mode=True, telemetry=telemetry, n_workers=DQN_CONFIG['n_workers']
+    )
 
     # 创建 Agent
     config = DQN_CONFIG.copy()
     config['total_timesteps'] = total_timesteps
+    config['catalog_version'] = RecipeCatalog.load().version  # 推理时校验目录是否一致
     agent = MaskableDQNAgent(state_dim=13, action_dim=300, config=config)
+    if config['buffer_warm_start']:
+        print(f"经验回放预热: {len(agent.buffer):,} 条 (来自 {config['buffer_warm_start']})")
 
     # TensorBoard
     run_name = f"dqn_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     writer = SummaryWriter(LOG_DIR / run_name)
 
     # 训练状态
-    obs_list = [env.reset()[0] for env in envs]
-    mask_list = [env.action_masks() for env in envs]
-    episode_rewards = [0.0] * n_envs
-    episode_lengths = [0] * n_envs
+    obs, _ = vec_env.reset()
+    masks = vec_env.action_masks()
+    episode_rewards = np.zeros(n_envs)
 
     # 统计
     total_episodes = 0
@@ -122,48 +159,13 @@ def train(total_timesteps: int = None):
 
     while global_step < total_timesteps:
         # 更新课程学习
-        for env in envs:
-            env.global_step = global_step
-
-        # 选择动作
-        actions = []
-        for i in range(n_envs):
-            action = agent.select_action(
-                obs_list[i], mask_list[i], global_step
-            )
-            actions.append(action)
-
-        # 执行动作
-        for i in range(n_envs):
-            next_obs, reward, terminated, truncated, info = envs[i].step(actions[i])
-            done = terminated or truncated
-            next_mask = envs[i].action_masks()
-
-            # 存储经验
-            agent.store_transition(
-                obs_list[i], actions[i], reward, next_obs, done,
-                mask_list[i], next_mask
-            )
-
-            episode_rewards[i] += reward
-            episode_lengths[i] += 1
-
-            if done:
-                # Episode 结束
-                total_episodes += 1
-                recent_rewards.append(episode_rewards[i])
-                if len(recent_rewards) > 100:
-                    recent_rewards.pop(0)
-
-                # 重置
-                obs_list[i], _ = envs[i].reset()
-                mask_list[i] = envs[i].action_masks()
-                episode_rewards[i] = 0.0
-                episode_lengths[i] = 0
-            else:
-                obs_list[i] = next_obs
-                mask_list[i] = next_mask
+        vec_env.global_step = global_step
+
+        # 选择动作 (所有环境一次前向传播)
+        actions = agent.select_actions(obs, masks, global_step)
 
+        # 执行动作 (结束的环境自动重置)；多进程环境推进期间在主进程中训练
+        vec_env.step_async(actions)
         global_step += n_envs
 
         # 训练
@@ -175,6 +177,35 @@ def train(total_timesteps: int = None):
                 writer.add_scalar('train/q_mean', metrics['q_mean'], global_step)
                 writer.add_scalar('train/learning_rate', metrics['learning_rate'], global_step)
 
+        next_obs, rewards, terminated, truncated, infos = vec_env.step_wait()
+        dones = terminated | truncated
+        next_masks = vec_env.action_masks()
+
+        # 结束的 episode 存储终止状态，而不是重置后的初始状态
+        stored_next_obs = next_obs
+        stored_next_masks = next_masks
+        if dones.any():
+            stored_next_obs = np.where(dones[:, None], infos['final_observation'], next_obs)
+            stored_next_masks = np.where(dones[:, None], infos['final_action_masks'], next_masks)
+
+        # 存储经验
+        agent.store_transitions(
+            obs, actions, rewards, stored_next_obs, dones,
+            masks, stored_next_masks
+        )
+
+        episode_rewards += rewards
+        for i in np.flatnonzero(dones):
+            # Episode 结束
+            total_episodes += 1
+            recent_rewards.append(episode_rewards[i])
+            if len(recent_rewards) > 100:
+                recent_rewards.pop(0)
+        episode_rewards[dones] = 0.0
+
+        obs = next_obs
+        masks = next_masks
+
         # 日志
         if global_step % 10000 == 0:
             elapsed = time.time() - start_time
@@ -191,6 +222,8 @@ def train(total_timesteps: int = None):
             writer.add_scalar('rollout/ep_reward_mean', avg_reward, global_step)
             writer.add_scalar('rollout/epsilon', epsilon, global_step)
             writer.add_scalar('time/fps', fps, global_step)
+            for name, value in telemetry.summary(telemetry.drain()).items():
+                writer.add_scalar(f'episode/{name}', value, global_step)
 
             # 保存最佳模型
             if avg_reward > best_reward and len(recent_rewards) >= 50:
@@ -202,9 +235,18 @@ def train(total_timesteps: int = None):
         if global_step % 50000 == 0:
             agent.save(CHECKPOINT_DIR / f"dqn_step_{global_step}.pt")
 
-    # 保存最终模型
+    # 保存最终模型 (先停止预取线程，应用剩余的优先级更新)
+    agent.close()
     agent.save(MODEL_DIR / "dqn_meal_final.pt")
+    # 导出仅供推理的 .policy 文件 (API 进程无需 torch，内存映射加载)
+    for name in ("dqn_meal_best.pt", "dqn_meal_final.pt"):
+        if (MODEL_DIR / name).exists():
+            export_numpy_policy(MODEL_DIR / name)
     writer.close()
+    vec_env.close()
+    if replay_save:
+        agent.buffer.save(replay_save)
+        print(f"经验回放保存至: {replay_save}")
 
     print(f"\n训练完成!")
     print(f"最终平均奖励: {np.mean(recent_rewards):.2f}")
@@ -253,10 +295,18 @@ def main():
     parser.add_argument('--mode', type=str, default='train', choices=['train', 'test'])
     parser.add_argument('--timesteps', type=int, default=500000)
     parser.add_argument('--model', type=str, default=None)
+    parser.add_argument('--replay-dir', type=str, default=None, help='经验回放内存映射存储目录')
+    parser.add_argument('--replay-warm-start', type=str, default=None, help='从保存的经验回放预热')
+    parser.add_argument('--replay-save', type=str, default=None, help='训练结束后保存经验回放')
     args = parser.parse_args()
 
+    if args.replay_dir:
+        DQN_CONFIG['buffer_dir'] = args.replay_dir
+    if args.replay_warm_start:
+        DQN_CONFIG['buffer_warm_start'] = args.replay_warm_start
+
     if args.mode == 'train':
-        train(total_timesteps=args.timesteps)
+        train(total_timesteps=args.timesteps, replay_save=args.replay_save)
     else:
         test(model_path=args.model)
 
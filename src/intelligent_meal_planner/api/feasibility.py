@@ -1,12 +1,33 @@
 """
 可行性计算服务 - 计算给定预算下的最大可达营养值
+
+最大可达值来自精确的预算前沿：对 3 餐 x 2 道菜 (6 道菜互不重复) 的方案结构，
+在离散价格网格上做 0/1 动态规划，得到每个营养素在总价恰为 p 时的最大值，
+再取前缀最大值得到"预算不超过 B 时的最大值"。前沿是阶梯函数，只保存取值变化的
+断点 (升序预算数组 + 对应最大值)，查询任意预算为一次二分查找。
+
+逐项前沿无法发现"各项单独可达、但无法在同一方案中同时达到"的目标，
+联合可行性 (check_joint_feasibility) 用 LP 松弛同时约束四项营养与预算，见 JointFeasibilityChecker。
+
+忌口会改变可选菜品，前沿按排除的标签组合分别计算 (FeasibilityFrontier)，懒加载并缓存。
 """
 
-from pathlib import Path
+import itertools
 import json
-from typing import Dict, Tuple
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
 from pydantic import BaseModel
 
+MEAL_TYPES = ("breakfast", "lunch", "dinner")
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+NUTRIENT_LABELS = {"calories": "热量", "protein": "蛋白质", "carbs": "碳水", "fat": "脂肪"}
+
 
 class FeasibilityResult(BaseModel):
     """可行性检查结果"""
@@ -21,11 +42,24 @@ class FeasibilityResult(BaseModel):
     protein_feasibility: float = 100.0
     carbs_feasibility: float = 100.0
     fat_feasibility: float = 100.0
+    # 四项目标能否在同一方案中同时达到 (见 JointFeasibilityResult)
+    jointly_feasible: bool = True
+    joint_confidence: Literal["certain", "likely"] = "certain"
     # 是否有警告
     has_warning: bool = False
     warning_message: str = ""
 
 
+class JointFeasibilityResult(BaseModel):
+    """四项营养目标能否在同一方案中同时达到"""
+
+    budget: float
+    feasible: bool
+    # certain: 有可行方案为证，或有对偶证书证明不可行；likely: LP 松弛可行，但未找到整数方案
+    confidence: Literal["certain", "likely"]
+    reason: str = ""
+
+
 def estimate_budget_band(budget: float, protein_min: int) -> Tuple[float, float]:
     protein_pressure = max(0, protein_min - 70)
     recommended_budget_min = max(float(budget), 80.0 + protein_pressure * 1.2)
@@ -33,17 +67,228 @@ def estimate_budget_band(budget: float, protein_min: int) -> Tuple[float, float]
     return recommended_budget_min, recommended_budget_comfort
 
 
+def price_unit(prices: List[float]) -> float:
+    """能精确表示全部价格的最大网格步长 (按分取最大公约数)"""
+    unit = 0
+    for price in prices:
+        unit = math.gcd(unit, int(round(price * 100)))
+    return max(unit, 1) / 100.0
+
+
+def compute_budget_frontier(
+    recipes: List[dict], items_per_meal: int = 2
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    精确计算各营养素的最大可达值随预算变化的前沿
+
+    动态规划逐道菜处理，状态为 (早餐已选数, 午餐已选数, 晚餐已选数, 总价格格点)，
+    值为各营养素的最大累计值；每道菜可不选，或放入它适用的某一餐 (最多一次)，
+    因此同时属于午餐和晚餐的菜不会被重复计入。
+
+    Returns:
+        (budgets [M] 升序, values [M, 4])：预算 >= budgets[i] 时各营养素的最大值至少为 values[i]；
+        没有任何完整方案时两者都为空
+    """
+    if not recipes:
+        return np.zeros(0), np.zeros((0, len(NUTRIENTS)))
+
+    unit = price_unit([r["price"] for r in recipes])
+    units = [int(round(r["price"] / unit)) for r in recipes]
+    n_prices = items_per_meal * len(MEAL_TYPES) * max(units) + 1
+    counts = (items_per_meal + 1,) * len(MEAL_TYPES)
+
+    best = np.full(counts + (n_prices, len(NUTRIENTS)), -np.inf)
+    best[(0,) * len(MEAL_TYPES) + (0,)] = 0.0
+    for recipe, cost in zip(recipes, units):
+        gain = np.array([recipe[name] for name in NUTRIENTS], dtype=np.float64)
+        previous = best.copy()
+        for meal, meal_type in enumerate(MEAL_TYPES):
+            if meal_type not in recipe.get("meal_type", []):
+                continue
+            # 该餐已选数 c -> c + 1，总价格点 p -> p + cost
+            source = [slice(None)] * len(MEAL_TYPES)
+            target = [slice(None)] * len(MEAL_TYPES)
+            source[meal] = slice(0, items_per_meal)
+            target[meal] = slice(1, items_per_meal + 1)
+            src = tuple(source) + (slice(0, n_prices - cost),)
+            dst = tuple(target) + (slice(cost, n_prices),)
+            best[dst] = np.maximum(best[dst], previous[src] + gain)
+
+    exact_cost = best[(items_per_meal,) * len(MEAL_TYPES)]
+    frontier = np.maximum.accumulate(exact_cost, axis=0)
+    reachable = np.isfinite(frontier[:, 0])
+    if not reachable.any():
+        return np.zeros(0), np.zeros((0, len(NUTRIENTS)))
+
+    # 只保留取值发生变化的格点
+    changed = np.ones(n_prices, dtype=bool)
+    changed[1:] = np.any(frontier[1:] != frontier[:-1], axis=1)
+    keep = np.flatnonzero(reachable & changed)
+    return keep * unit, frontier[keep]
+
+
+class JointFeasibilityChecker:
+    """
+    联合可行性：是否存在一个方案 (3 餐 x 2 道、菜品不重复、总价 <= 预算)
+    使四项营养同时不低于目标
+
+    对 LP 松弛做拉格朗日对偶：营养与预算约束乘子 z >= 0 (归一化到单纯形)，
+    保留餐次结构约束。餐次结构是二部 b-匹配多面体 (整点)，因此内层
+    max_x Σ_i w_i x_i 可以精确求解，对偶值等于 LP 松弛的最优值：
+
+    - 某个 z 使对偶函数 φ(z) > 0，即为 Farkas 证书：LP 松弛不可行，整数方案更不可能 (certain)；
+    - 内层最优方案恰好满足全部目标与预算，即为可行证据 (certain)；
+    - 迭代结束仍无结论：LP 松弛无法排除，视为可行 (likely)。
+
+    内层每餐只需考虑该餐权重最高的 6 道候选 (交换论证：方案共 6 道菜，
+    任一餐若用了前 6 之外的菜，前 6 中必有未被使用的菜可以替换且不变差)，
+    3 餐候选对组合不超过 15^3 个，一次数组运算即可枚举。
+
+    Args:
+        recipes: 菜品列表 (需含 price / meal_type / 四项营养)
+        max_iterations: 投影次梯度迭代次数上限
+    """
+
+    def __init__(self, recipes: List[dict], max_iterations: int = 200, items_per_meal: int = 2):
+        self.items_per_meal = items_per_meal
+        self.max_iterations = max_iterations
+        self.nutrients = np.array(
+            [[r[name] for name in NUTRIENTS] for r in recipes], dtype=np.float64
+        ).reshape(-1, len(NUTRIENTS))
+        self.prices = np.array([r["price"] for r in recipes], dtype=np.float64)
+        self.eligible = [
+            np.array(
+                [i for i, r in enumerate(recipes) if meal_type in r.get("meal_type", [])],
+                dtype=np.int64,
+            )
+            for meal_type in MEAL_TYPES
+        ]
+        self.top_k = items_per_meal * len(MEAL_TYPES)
+
+    def best_plan(self, weights: np.ndarray) -> Optional[np.ndarray]:
+        """餐次结构下权重和最大的方案 (菜品索引)；凑不齐三餐时为 None"""
+        pairs = []
+        for indices in self.eligible:
+            if len(indices) < self.items_per_meal:
+                return None
+            top = indices[np.argsort(-weights[indices], kind="stable")[: self.top_k]]
+            combos = np.array(list(itertools.combinations(top, self.items_per_meal)))
+            pairs.append(combos)
+
+        # [nb, nl, nd, 6] 全部组合
+        grids = np.meshgrid(*(np.arange(len(p)) for p in pairs), indexing="ij")
+        plans = np.concatenate(
+            [p[g.ravel()] for p, g in zip(pairs, grids)], axis=1
+        )
+        ordered = np.sort(plans, axis=1)
+        distinct = np.all(ordered[:, 1:] != ordered[:, :-1], axis=1)
+        if not distinct.any():
+            return None
+        scores = np.where(distinct, weights[plans].sum(axis=1), -np.inf)
+        return plans[int(np.argmax(scores))]
+
+    def check(self, budget: float, targets: Tuple[float, ...]) -> Tuple[bool, str, str]:
+        """返回 (feasible, confidence, reason)"""
+        active = [k for k, target in enumerate(targets) if target > 0]
+        target = np.array([targets[k] for k in active], dtype=np.float64)
+        ratios = self.nutrients[:, active] / target  # 每道菜贡献的目标比例
+        price_ratio = self.prices / budget if budget > 0 else np.full(len(self.prices), np.inf)
+
+        # z = (各营养乘子, 预算乘子)，从均匀分布出发
+        z = np.full(len(active) + 1, 1.0 / (len(active) + 1))
+        for iteration in range(self.max_iterations):
+            weights = ratios @ z[:-1] - z[-1] * np.where(np.isfinite(price_ratio), price_ratio, 1e9)
+            plan = self.best_plan(weights)
+            if plan is None:
+                return False, "certain", "菜品不足以凑齐一日三餐"
+            achieved = ratios[plan].sum(axis=0)
+            cost = self.prices[plan].sum()
+            if np.all(achieved >= 1.0 - 1e-9) and cost <= budget + 1e-9:
+                return True, "certain", ""
+
+            # φ(z) = Σ z_k - z_B - max_x [Σ z_k·达成比例_k(x) - z_B·花费比例(x)]
+            cost_ratio = cost / budget if budget > 0 else np.inf
+            phi = z[:-1].sum() - z[-1] - (z[:-1] @ achieved - z[-1] * min(cost_ratio, 1e9))
+            if phi > 1e-9:
+                short = [NUTRIENT_LABELS[NUTRIENTS[active[k]]] for k in np.flatnonzero(z[:-1] > 1e-6)]
+                return False, "certain", "、".join(short) + "无法在预算内同时达标"
+
+            gradient = np.append(1.0 - achieved, min(cost_ratio, 1e9) - 1.0)
+            z = _project_to_simplex(z + gradient / np.sqrt(iteration + 1.0))
+        return True, "likely", "LP 松弛可行"
+
+
+def _project_to_simplex(v: np.ndarray) -> np.ndarray:
+    """欧氏投影到概率单纯形 {z >= 0, Σz = 1}"""
+    u = np.sort(v)[::-1]
+    cumulative = np.cumsum(u) - 1.0
+    rho = np.flatnonzero(u - cumulative / np.arange(1, len(v) + 1) > 0)[-1]
+    return np.maximum(v - cumulative[rho] / (rho + 1.0), 0.0)
+
+
+class FeasibilityFrontier:
+    """
+    一组可选菜品上的预算前沿与联合可行性
+
+    预算前沿在构造时计算一次，之后只做查表；联合可行性按 (预算网格, 目标) 记忆化。
+    """
+
+    def __init__(self, recipes: List[dict], unit: float):
+        self.recipe_count = len(recipes)
+        self.budgets, self.values = compute_budget_frontier(recipes)
+        self.price_unit = unit
+        self.joint_checker = JointFeasibilityChecker(recipes)
+        # 方案总价在价格网格上，预算向下取整到网格不改变结论，作为记忆化键
+        self._joint_cached = lru_cache(maxsize=4096)(self._check_joint)
+
+    @property
+    def min_plan_cost(self) -> Optional[float]:
+        """凑齐一日三餐 (每餐 2 道) 的最低总价；没有完整方案时为 None"""
+        if len(self.budgets) == 0:
+            return None
+        return float(self.budgets[0])
+
+    def max_achievable(self, budget: float) -> Dict[str, int]:
+        """给定预算下的最大可达营养值 (预算不足以凑齐三餐时均为 0)"""
+        # 价格为网格上的精确值，加微小容差避免浮点误差
+        index = int(np.searchsorted(self.budgets, budget + 1e-9, side="right")) - 1
+        if index < 0:
+            return {name: 0 for name in NUTRIENTS}
+        return {name: int(value) for name, value in zip(NUTRIENTS, self.values[index])}
+
+    def check_joint(self, budget: float, targets: Tuple[float, ...]) -> Tuple[bool, str, str]:
+        """联合可行性 (feasible, confidence, reason)，结果记忆化"""
+        grid_budget = math.floor(budget / self.price_unit + 1e-9) * self.price_unit
+        targets = tuple(round(float(t), 3) for t in targets)
+        return self._joint_cached(grid_budget, targets)
+
+    def _check_joint(self, budget: float, targets: Tuple[float, ...]) -> Tuple[bool, str, str]:
+        # 逐项精确前沿已能判定的，不必求解松弛
+        if self.min_plan_cost is None or budget < self.min_plan_cost:
+            return False, "certain", "预算不足以凑齐一日三餐"
+        max_vals = self.max_achievable(budget)
+        short = [NUTRIENT_LABELS[name] for name, t in zip(NUTRIENTS, targets) if max_vals[name] < t]
+        if short:
+            return False, "certain", "、".join(short) + "在预算内无法达到"
+        return self.joint_checker.check(budget, targets)
+
+
 class FeasibilityService:
-    """可行性计算服务"""
+    """
+    可行性计算服务
 
-    # 预算到最大可达值的缓存
-    _cache: Dict[int, Dict[str, int]] = {}
+    忌口按菜品标签精确匹配排除 (与配餐环境一致)。每种排除标签组合对应一条独立的
+    预算前沿，首次用到时才计算，按标签位掩码缓存在有界 LRU 中，
+    忌口相同的用户 (不论标签顺序) 共用同一条前沿。无忌口的前沿在启动时计算。
+    """
 
-    def __init__(self):
-        data_path = Path(__file__).parent.parent / "data" / "recipes.json"
-        with open(data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        self.recipes = data.get("recipes", [])
+    def __init__(self, recipes: Optional[List[dict]] = None, max_frontiers: int = 64):
+        if recipes is None:
+            data_path = Path(__file__).parent.parent / "data" / "recipes.json"
+            with open(data_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            recipes = data.get("recipes", [])
+        self.recipes = recipes
 
         # 按餐次分类
         self.breakfast = [
@@ -52,61 +297,90 @@ class FeasibilityService:
         self.lunch = [r for r in self.recipes if "lunch" in r.get("meal_type", [])]
         self.dinner = [r for r in self.recipes if "dinner" in r.get("meal_type", [])]
 
-        # 预计算常用预算值
-        self._precompute_common_budgets()
+        # 排除后的菜品价格仍在全量菜品的价格网格上，共用同一网格
+        self.price_unit = price_unit([r["price"] for r in self.recipes]) if self.recipes else 1.0
 
-    def _precompute_common_budgets(self):
-        """预计算常用预算值的最大可达营养"""
-        for budget in range(20, 205, 5):  # 20, 25, 30, ..., 200
-            self._cache[budget] = self._compute_max_achievable(float(budget))
+        # 每个标签一位，菜品的标签位掩码用于快速筛选排除后的菜品
+        tags = sorted({tag for r in self.recipes for tag in r.get("tags", [])})
+        self.tag_bits: Dict[str, int] = {tag: 1 << i for i, tag in enumerate(tags)}
+        self.recipe_tag_masks: List[int] = [
+            sum(self.tag_bits[tag] for tag in set(r.get("tags", []))) for r in self.recipes
+        ]
 
-    def _compute_max_achievable(
-        self, budget: float, items_per_meal: int = 2
-    ) -> Dict[str, int]:
-        """
-        贪心算法计算给定预算下的最大可达营养值
+        self.max_frontiers = max_frontiers
+        self._frontiers: "OrderedDict[int, FeasibilityFrontier]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self.frontier()
 
-        策略: 对每餐次，优先选择热量/价格比最高的菜品
-        """
-        remaining = budget
-        totals = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0}
+    def exclusion_mask(self, disliked_foods: Optional[List[str]] = None) -> int:
+        """忌口标签的位掩码；不在菜品标签中的忌口不影响可选菜品，忽略"""
+        mask = 0
+        for tag in disliked_foods or ():
+            mask |= self.tag_bits.get(tag, 0)
+        return mask
 
-        # 按热量/价格比排序每个餐次的菜品
-        bf_sorted = sorted(
-            self.breakfast, key=lambda x: x["calories"] / x["price"], reverse=True
-        )
-        lu_sorted = sorted(
-            self.lunch, key=lambda x: x["calories"] / x["price"], reverse=True
-        )
-        dn_sorted = sorted(
-            self.dinner, key=lambda x: x["calories"] / x["price"], reverse=True
-        )
+    def frontier(self, disliked_foods: Optional[List[str]] = None) -> FeasibilityFrontier:
+        """排除忌口标签后的可行性前沿 (首次用到时计算并缓存)"""
+        mask = self.exclusion_mask(disliked_foods)
+        with self._lock:
+            frontier = self._frontiers.get(mask)
+            if frontier is not None:
+                self._frontiers.move_to_end(mask)
+                self._hits += 1
+                return frontier
+            self._misses += 1
 
-        for meal_list in [bf_sorted, lu_sorted, dn_sorted]:
-            selected = 0
-            for dish in meal_list:
-                if selected >= items_per_meal:
-                    break
-                if dish["price"] <= remaining:
-                    totals["calories"] += dish["calories"]
-                    totals["protein"] += dish["protein"]
-                    totals["carbs"] += dish["carbs"]
-                    totals["fat"] += dish["fat"]
-                    remaining -= dish["price"]
-                    selected += 1
+        # 在锁外计算，避免阻塞其他忌口组合的查询；并发首次计算同一组合时保留先写入的
+        recipes = [
+            r for r, tags in zip(self.recipes, self.recipe_tag_masks) if not tags & mask
+        ]
+        built = FeasibilityFrontier(recipes, self.price_unit)
+        with self._lock:
+            frontier = self._frontiers.setdefault(mask, built)
+            self._frontiers.move_to_end(mask)
+            while len(self._frontiers) > self.max_frontiers:
+                self._frontiers.popitem(last=False)
+        return frontier
 
-        return {k: int(v) for k, v in totals.items()}
+    def frontier_cache_info(self) -> Dict[str, int]:
+        """前沿缓存统计"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._frontiers),
+                "max_size": self.max_frontiers,
+            }
 
-    def get_max_achievable(self, budget: float) -> Dict[str, int]:
-        """获取给定预算下的最大可达营养值"""
-        # 四舍五入到最近的5元
-        budget_key = int(round(budget / 5) * 5)
-        budget_key = max(20, min(budget_key, 200))
+    @property
+    def min_plan_cost(self) -> Optional[float]:
+        """无忌口时凑齐一日三餐 (每餐 2 道) 的最低总价；没有完整方案时为 None"""
+        return self.frontier().min_plan_cost
 
-        if budget_key in self._cache:
-            return self._cache[budget_key]
+    def get_max_achievable(
+        self, budget: float, disliked_foods: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """获取给定预算下的最大可达营养值 (预算不足以凑齐三餐时均为 0)"""
+        return self.frontier(disliked_foods).max_achievable(budget)
 
-        return self._compute_max_achievable(budget)
+    def check_joint_feasibility(
+        self,
+        budget: float,
+        target_calories: float,
+        target_protein: float,
+        target_carbs: float,
+        target_fat: float,
+        disliked_foods: Optional[List[str]] = None,
+    ) -> JointFeasibilityResult:
+        """检查四项营养目标能否在同一方案中同时达到 (结果按预算网格与目标记忆化)"""
+        feasible, confidence, reason = self.frontier(disliked_foods).check_joint(
+            budget, (target_calories, target_protein, target_carbs, target_fat)
+        )
+        return JointFeasibilityResult(
+            budget=budget, feasible=feasible, confidence=confidence, reason=reason
+        )
 
     def check_feasibility(
         self,
@@ -117,14 +391,19 @@ class FeasibilityService:
         target_fat: int,
         warning_threshold: float = 1.2,  # 超出20%开始警告
         error_threshold: float = 2.0,  # 超出100%返回错误级别
+        disliked_foods: Optional[List[str]] = None,
     ) -> FeasibilityResult:
         """
         检查目标参数的可行性
 
+        Args:
+            disliked_foods: 忌口标签，带这些标签的菜品不计入可达范围
+
         Returns:
             FeasibilityResult 包含可达性百分比和警告信息
         """
-        max_vals = self.get_max_achievable(budget)
+        frontier = self.frontier(disliked_foods)
+        max_vals = frontier.max_achievable(budget)
 
         # 计算各指标可达性(目标能达成的百分比)
         cal_feas = (
@@ -149,6 +428,14 @@ class FeasibilityService:
         # 判断是否需要警告
         has_warning = False
         warning_parts = []
+        min_cost = frontier.min_plan_cost
+        if min_cost is None:
+            has_warning = True
+            warning_parts.append("排除忌口后的菜品不足以凑齐一日三餐")
+        elif budget < min_cost:
+            has_warning = True
+            warning_parts.append(f"不足以凑齐一日三餐(最低需要{min_cost:.1f}元)")
+
         if cal_feas < 100:
             has_warning = True
             if cal_feas < (100 / error_threshold):  # < 50%
@@ -161,6 +448,13 @@ class FeasibilityService:
             has_warning = True
             warning_parts.append(f"蛋白质最高可达{max_vals['protein']}g")
 
+        jointly_feasible, joint_confidence, _ = frontier.check_joint(
+            budget, (target_calories, target_protein, target_carbs, target_fat)
+        )
+        if not jointly_feasible and not has_warning:
+            has_warning = True
+            warning_parts.append("各项营养目标无法在同一方案中同时达到")
+
         warning_message = ""
         if has_warning:
             warning_message = f"当前{budget:.0f}元预算下：" + "，".join(warning_parts)
@@ -175,6 +469,8 @@ class FeasibilityService:
             protein_feasibility=round(pro_feas, 1),
             carbs_feasibility=round(carb_feas, 1),
             fat_feasibility=round(fat_feas, 1),
+            jointly_feasible=jointly_feasible,
+            joint_confidence=joint_confidence,
             has_warning=has_warning,
             warning_message=warning_message,
         )
@@ -15,6 +15,7 @@ from fastapi.responses import JSONResponse
 from pythonjsonlogger import jsonlogger
 
 from ..db import database, models
+from ..tools.planning_pool import get_planning_pool
 from .routers import (
     auth_router,
     dashboard_router,
@@ -153,12 +154,29 @@ def init_db() -> None:
         session.close()
 
 
+def warm_model_registry() -> None:
+    """Load the DQN policy once and run a dummy plan before serving requests."""
+    from ..tools.model_registry import get_model_registry
+
+    try:
+        loaded = get_model_registry().warm_start()
+        logger.info("DQN model warmed up: %s (%s engine)", loaded.version, loaded.engine)
+    except FileNotFoundError:
+        logger.info("No DQN model found; meal plans will use the fallback planner")
+    except Exception as e:
+        logger.warning("DQN model warm start failed: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     logger.info("Starting API")
     init_db()
+    warm_model_registry()
+    planning_pool = get_planning_pool()
+    planning_pool.start()
     yield
     logger.info("Stopping API")
+    planning_pool.shutdown(wait=False)
 
 
 app = FastAPI(
@@ -269,3 +287,18 @@ async def root():
 @app.get("/health", tags=["system"])
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/planner", tags=["system"])
+async def planner_stats():
+    """Served model version, plan cache and micro-batching counters, for monitoring."""
+    from ..tools.model_registry import get_model_registry
+    from ..tools.plan_cache import get_plan_cache
+    from ..tools.planner_service import get_planner_service
+
+    return {
+        "model_version": get_model_registry().version,
+        "plan_cache": get_plan_cache().stats(),
+        "planner": get_planner_service().stats(),
+        "planning_pool": get_planning_pool().stats(),
+    }
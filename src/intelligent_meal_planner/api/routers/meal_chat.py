@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from ...db.database import get_db
 from ...db.models import User
+from ...tools.planning_pool import PlanningPoolSaturatedError, PlanningTimeoutError
 from ..schemas import (
     MealChatMessageRequest,
     MealChatPresentationRequest,
@@ -70,7 +72,19 @@ async def generate_session(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    return meal_chat_app.generate_session(db, current_user, session_id)
+    # Planning blocks on the RL worker pool, so keep it off the event loop.
+    try:
+        return await run_in_threadpool(
+            meal_chat_app.generate_session, db, current_user, session_id
+        )
+    except PlanningPoolSaturatedError:
+        raise HTTPException(
+            status_code=429,
+            detail="Meal planner is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    except PlanningTimeoutError:
+        raise HTTPException(status_code=504, detail="Meal planning timed out")
 
 
 @router.post("/sessions/{session_id}/presentation", response_model=MealChatSessionResponse)
@@ -1,12 +1,16 @@
+from itertools import chain
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ...db.database import get_db
 from ...db.models import User
-from ..schemas import MealPlanResponse
-from ..services import meal_chat_app
+from ...tools.planning_pool import PlanningPoolSaturatedError, PlanningTimeoutError
+from ..schemas import MealPlanBatchRequest, MealPlanResponse
+from ..services import meal_chat_app, meal_plan_service
 from .auth import get_current_user
 
 router = APIRouter(prefix="/meal-plans", tags=["配餐历史"])
@@ -19,3 +23,25 @@ async def get_history(
     current_user: User = Depends(get_current_user),
 ):
     return meal_chat_app.get_completed_plans(db, current_user.id, limit)
+
+
+@router.post("/batch", summary="批量生成配餐 (NDJSON 流)")
+async def generate_batch(
+    payload: MealPlanBatchRequest,
+    current_user: User = Depends(get_current_user),
+):
+    items = meal_plan_service.generate_plan_batch(payload.items)
+    # 先在线程池里算出第一块，规划池饱和/超时仍能以 429/504 返回
+    try:
+        first = await run_in_threadpool(next, items)
+    except PlanningPoolSaturatedError:
+        raise HTTPException(
+            status_code=429,
+            detail="Meal planner is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    except PlanningTimeoutError:
+        raise HTTPException(status_code=504, detail="Meal planning timed out")
+
+    lines = (item.model_dump_json() + "\n" for item in chain([first], items))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
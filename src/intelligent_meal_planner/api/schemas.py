@@ -142,6 +142,7 @@ class MealPlanResponse(BaseModel):
     nutrition: NutritionSummary
     target: UserPreferences
     score: float  # RL 模型评分
+    warning: str | None = None  # 营养目标无法同时达到等提示
 
 
 class MealPlanHistory(BaseModel):
@@ -151,6 +152,21 @@ class MealPlanHistory(BaseModel):
     items: List[MealPlanResponse]
 
 
+class MealPlanBatchRequest(BaseModel):
+    """批量配餐请求 (每项一组偏好)"""
+
+    items: List[UserPreferences] = Field(..., min_length=1, max_length=5000)
+
+
+class MealPlanBatchItem(BaseModel):
+    """批量配餐结果 (NDJSON 中的一行)"""
+
+    index: int  # 对应请求 items 中的位置
+    status: Literal["ok", "budget_infeasible", "error"]
+    meal_plan: Optional[MealPlanResponse] = None
+    detail: Optional[str] = None
+
+
 class NegotiatedMealPlanAlternativeResponse(BaseModel):
     option_key: str
     title: str
@@ -6,7 +6,7 @@ import re
 import uuid
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session, selectinload
@@ -30,6 +30,7 @@ from ..meal_chat.target_mapper import build_hidden_targets
 from .feasibility import feasibility_service
 from .schemas import (
     MealItem,
+    MealPlanBatchItem,
     MealPlanResponse,
     NutritionSummary,
     RecipeBase,
@@ -37,6 +38,9 @@ from .schemas import (
     UserPreferences,
 )
 
+# 未做 rollout 即判定预算不可行时使用的规划结果
+INFEASIBLE_PAYLOAD: Dict[str, Any] = {"meal_plan": {}, "metrics": {}, "status": "budget_infeasible"}
+
 
 class RecipeService:
     def __init__(self):
@@ -89,17 +93,24 @@ class RecipeService:
 
 
 class MealPlanService:
-    def __init__(self):
+    def __init__(self, planner_backend: Optional[str] = None):
         self.recipe_service = RecipeService()
+        # "dqn" / "exact"；None 时沿用 RL_PLANNER_BACKEND
+        self.planner_backend = planner_backend
+        self.budget_guard = BudgetGuardService()
         self._history: Dict[str, MealPlanResponse] = {}
 
     def generate_plan(self, preferences: UserPreferences) -> MealPlanResponse:
+        if not self.budget_guard.has_plan(preferences.max_budget):
+            # 预算凑不齐一日三餐时 rollout 必然失败，直接返回 budget_infeasible 结果
+            return self._build_response(INFEASIBLE_PAYLOAD, preferences)
         try:
-            from ..tools.rl_model_tool import create_rl_model_tool
+            from ..tools.planning_pool import get_planning_pool, run_default_plan
 
-            tool = create_rl_model_tool()
             data = json.loads(
-                tool._run(
+                get_planning_pool().run(
+                    run_default_plan,
+                    planner_backend=self.planner_backend,
                     target_calories=preferences.target_calories,
                     target_protein=preferences.target_protein,
                     target_carbs=preferences.target_carbs,
@@ -114,8 +125,121 @@ class MealPlanService:
         except FileNotFoundError:
             return self._generate_random_plan(preferences)
 
+    def generate_plan_batch(
+        self, preferences_list: List[UserPreferences], chunk_size: int = 256
+    ) -> Iterator[MealPlanBatchItem]:
+        """
+        批量配餐：每块偏好在规划池中一次批量 rollout，按输入顺序逐项产出
+
+        第一块遇到规划池饱和/超时直接抛出 (由路由映射为 429/504)；
+        之后的块失败时该块每项以 status="error" 产出，结果流不中断。
+        预算凑不齐一日三餐的项不进入 rollout，直接以 budget_infeasible 产出。
+        """
+        from ..tools.planning_pool import (
+            PlanningPoolSaturatedError,
+            PlanningTimeoutError,
+            get_planning_pool,
+            run_default_plan_batch,
+        )
+
+        for start in range(0, len(preferences_list), chunk_size):
+            chunk = preferences_list[start : start + chunk_size]
+            plannable = [
+                offset
+                for offset, preferences in enumerate(chunk)
+                if self.budget_guard.has_plan(preferences.max_budget)
+            ]
+            requests = [
+                dict(
+                    target_calories=preferences.target_calories,
+                    target_protein=preferences.target_protein,
+                    target_carbs=preferences.target_carbs,
+                    target_fat=preferences.target_fat,
+                    max_budget=preferences.max_budget,
+                    disliked_ingredients=preferences.disliked_foods,
+                    preferred_tags=preferences.preferred_tags,
+                    strict_budget=True,
+                )
+                for preferences in (chunk[offset] for offset in plannable)
+            ]
+            payloads: List[Optional[dict]] = [INFEASIBLE_PAYLOAD] * len(chunk)
+            try:
+                if requests:
+                    planned = get_planning_pool().run(
+                        run_default_plan_batch, requests, planner_backend=self.planner_backend
+                    )
+                    for offset, payload in zip(plannable, planned):
+                        payloads[offset] = payload
+            except FileNotFoundError:
+                for offset in plannable:
+                    payloads[offset] = None
+            except (PlanningPoolSaturatedError, PlanningTimeoutError) as exc:
+                if start == 0:
+                    raise
+                for offset in range(len(chunk)):
+                    yield MealPlanBatchItem(index=start + offset, status="error", detail=str(exc))
+                continue
+
+            for offset, preferences in enumerate(chunk):
+                if payloads[offset] is None:
+                    # 与 generate_plan 一致：没有模型时退回随机方案
+                    status, plan = "ok", self._generate_random_plan(preferences)
+                else:
+                    status = payloads[offset]["status"]
+                    # 批量结果直接流式返回，不写入方案历史
+                    plan = self._build_response(payloads[offset], preferences, record=False)
+                yield MealPlanBatchItem(
+                    index=start + offset,
+                    status=status,
+                    meal_plan=plan if status == "ok" else None,
+                )
+
+    def generate_plan_options(
+        self, preferences: UserPreferences, num_plans: int = 3
+    ) -> Dict[str, Any]:
+        """主方案 + 互不相同的备选方案 (NegotiatedMealPlanResponse 结构)，由束搜索一次生成"""
+        from ..tools.planning_pool import get_planning_pool, run_default_plan_options
+
+        try:
+            options = get_planning_pool().run(
+                run_default_plan_options,
+                num_plans=num_plans,
+                target_calories=preferences.target_calories,
+                target_protein=preferences.target_protein,
+                target_carbs=preferences.target_carbs,
+                target_fat=preferences.target_fat,
+                max_budget=preferences.max_budget,
+                disliked_ingredients=preferences.disliked_foods,
+                preferred_tags=preferences.preferred_tags,
+                strict_budget=True,
+            )
+        except FileNotFoundError:
+            options = []
+        if not options:
+            primary = self._generate_random_plan(preferences)
+            return {"primary": primary.model_dump(mode="json"), "alternatives": []}
+
+        responses = [self._build_response(data, preferences) for data in options]
+        primary = responses[0]
+        alternatives = []
+        for index, response in enumerate(responses[1:], start=1):
+            nutrition = response.nutrition
+            alternatives.append(
+                {
+                    "option_key": f"alternative_{index}",
+                    "title": f"备选方案 {index}",
+                    "rationale": (
+                        f"总热量约 {nutrition.total_calories:.0f} kcal，"
+                        f"蛋白质 {nutrition.total_protein:.0f} g，"
+                        f"总花费 {nutrition.total_price:.1f} 元"
+                    ),
+                    "meal_plan": response.model_dump(mode="json"),
+                }
+            )
+        return {"primary": primary.model_dump(mode="json"), "alternatives": alternatives}
+
     def _build_response(
-        self, data: dict, preferences: UserPreferences
+        self, data: dict, preferences: UserPreferences, record: bool = True
     ) -> MealPlanResponse:
         meal_plan = data.get("meal_plan", {})
         metrics = data.get("metrics", {})
@@ -158,7 +282,8 @@ class MealPlanService:
             target=preferences,
             score=metrics.get("final_reward", 0),
         )
-        self._history[plan_id] = response
+        if record:
+            self._history[plan_id] = response
         return response
 
     def _generate_random_plan(self, preferences: UserPreferences) -> MealPlanResponse:
@@ -224,29 +349,93 @@ class MealPlanService:
 
 
 class BudgetGuardService:
-    def check(self, budget, target_calories, target_protein, target_carbs, target_fat):
+    """规划前的可行性判断，用于在 RL rollout 之前拒绝注定失败的请求"""
+
+    def has_plan(self, budget):
+        """预算能否凑齐一日三餐；否则严格预算下的 rollout 必然以 budget_infeasible 结束"""
+        # 环境对忌口只扣分不屏蔽，这里按全部菜品判断
+        min_cost = feasibility_service.min_plan_cost
+        return min_cost is not None and budget >= min_cost - 1e-9
+
+    def check(
+        self,
+        budget,
+        target_calories,
+        target_protein,
+        target_carbs,
+        target_fat,
+        disliked_foods=None,
+    ):
+        """四项营养目标能否在预算内 (排除忌口后) 由同一方案同时达到"""
+        return self._all_reachable(
+            feasibility_service.check_feasibility(
+                budget=budget,
+                target_calories=target_calories,
+                target_protein=target_protein,
+                target_carbs=target_carbs,
+                target_fat=target_fat,
+                disliked_foods=disliked_foods,
+            )
+        )
+
+    def nutrient_warning(
+        self,
+        budget,
+        target_calories,
+        target_protein,
+        target_carbs,
+        target_fat,
+        disliked_foods=None,
+    ):
+        """营养目标无法同时达到时的提示；全部可达时返回 None"""
         result = feasibility_service.check_feasibility(
             budget=budget,
             target_calories=target_calories,
             target_protein=target_protein,
             target_carbs=target_carbs,
             target_fat=target_fat,
+            disliked_foods=disliked_foods,
+        )
+        if self._all_reachable(result):
+            return None
+        return result.warning_message or (
+            f"当前{budget:.0f}元预算下：各项营养目标无法在同一方案中同时达到"
         )
+
+    @staticmethod
+    def _all_reachable(result):
         return (
             result.calories_feasibility >= 100
             and result.protein_feasibility >= 100
             and result.carbs_feasibility >= 100
             and result.fat_feasibility >= 100
+            and result.jointly_feasible
         )
 
 
 class StrictBudgetPlanner:
+    def __init__(self, budget_guard: Optional[BudgetGuardService] = None):
+        self.budget_guard = budget_guard or BudgetGuardService()
+
     def generate(self, goal, budget, disliked_foods, preferred_tags, hidden_targets):
-        from ..tools.rl_model_tool import create_rl_model_tool
+        from ..tools.planning_pool import get_planning_pool, run_default_plan
+
+        # 预算凑不齐三餐时不做 rollout；营养目标只作软约束，无法同时达到时给出提示
+        if not self.budget_guard.has_plan(budget):
+            raise ValueError("budget_infeasible")
+        warning = self.budget_guard.nutrient_warning(
+            budget,
+            hidden_targets["target_calories"],
+            hidden_targets["target_protein"],
+            hidden_targets["target_carbs"],
+            hidden_targets["target_fat"],
+            disliked_foods=disliked_foods,
+        )
 
-        tool = create_rl_model_tool()
         payload = json.loads(
-            tool._run(
+            get_planning_pool().run(
+                run_default_plan,
+                planner_backend=meal_plan_service.planner_backend,
                 target_calories=hidden_targets["target_calories"],
                 target_protein=hidden_targets["target_protein"],
                 target_carbs=hidden_targets["target_carbs"],
@@ -273,6 +462,7 @@ class StrictBudgetPlanner:
         response = meal_plan_service._build_response(payload, preferences)
         if response.nutrition.total_price > budget:
             raise ValueError("budget_infeasible")
+        response.warning = warning
         return response.model_dump(mode="json")
 
 
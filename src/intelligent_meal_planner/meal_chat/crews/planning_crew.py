@@ -6,6 +6,7 @@ from crewai import Agent, Crew, Task, Process
 from ..llm_config import get_planning_llm
 from ..models.planning import PlanningResult
 from ..tools.rl_planning_tool import create_meal_plan_dict
+from ...tools.planning_pool import PlanningPoolSaturatedError, PlanningTimeoutError
 from ..profile.schema import UserProfile
 
 
@@ -246,6 +247,9 @@ class PlanningCrew:
                 target_carbs=int((target_ranges["carbs_min"] + target_ranges["carbs_max"]) / 2),
                 target_fat=int((target_ranges["fat_min"] + target_ranges["fat_max"]) / 2),
             )
+        except (PlanningPoolSaturatedError, PlanningTimeoutError):
+            # 过载与超时交给 API 层映射为 429 / 504，而不是生成失败
+            raise
         except Exception as e:
             return PlanningResult(
                 meal_plan={},
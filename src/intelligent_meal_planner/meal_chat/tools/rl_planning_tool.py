@@ -6,9 +6,23 @@ from typing import Optional
 
 from crewai.tools import tool
 
+from ...tools.model_registry import get_model_registry
+from ...tools.plan_cache import get_plan_cache
+from ...tools.planner_service import get_planner_service
+from ...tools.planning_pool import get_planning_pool
 from ...tools.rl_model_tool import RLModelTool
 
 
+def _plan_with_rl_tool(**request) -> str:
+    """在规划工作池中执行：共享模型、方案缓存与微批规划服务"""
+    rl_tool = RLModelTool(
+        registry=get_model_registry(),
+        plan_cache=get_plan_cache(),
+        planner=get_planner_service(),
+    )
+    return rl_tool._run(**request)
+
+
 @tool("DQN配餐工具")
 def dqn_meal_planning_tool(
     health_goal: str,
@@ -36,9 +50,9 @@ def dqn_meal_planning_tool(
     Returns:
         JSON 字符串，包含配餐方案和营养统计
     """
-    rl_tool = RLModelTool()
-
-    result_json = rl_tool._run(
+    # 推理在独立工作池中执行，池满时抛出 PlanningPoolSaturatedError
+    result_json = get_planning_pool().run(
+        _plan_with_rl_tool,
         target_calories=target_calories,
         target_protein=target_protein,
         target_carbs=target_carbs,
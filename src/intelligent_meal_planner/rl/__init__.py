@@ -2,6 +2,12 @@
 强化学习模块
 """
 
+from .catalog import RecipeCatalog
 from .environment import MealPlanningEnv
+from .telemetry import EpisodeTelemetry
+from .vec_env import VecMealPlanningEnv
+from .async_vec_env import AsyncMealPlanningVecEnv
+from .numpy_policy import NumpyDuelingPolicy
 
-__all__ = ['MealPlanningEnv']
\ No newline at end of file
+__all__ = ['RecipeCatalog', 'MealPlanningEnv', 'VecMealPlanningEnv', 'AsyncMealPlanningVecEnv', 'EpisodeTelemetry',
+           'NumpyDuelingPolicy']
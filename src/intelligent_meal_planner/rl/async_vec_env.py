@@ -0,0 +1,333 @@
+"""
+多进程异步向量化配餐环境
+
+将 n_envs 个环境切分为若干分片，每个工作进程持有一个 VecMealPlanningEnv 分片。
+观察值、掩码、奖励等通过共享内存 NumPy 数组交换，管道中只传递简短命令，
+不序列化任何数组；环境推进与主进程中的学习可以分别占用不同 CPU 核心。
+
+接口与 VecMealPlanningEnv 一致 (reset / step / action_masks / global_step)，
+另提供 step_async / step_wait 以便在等待环境时执行训练步骤。
+"""
+
+import multiprocessing as mp
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .telemetry import TELEMETRY_FIELDS, EpisodeTelemetry
+from .vec_env import VecMealPlanningEnv
+
+
+# 每个环境允许按分片切分的目标参数
+_PER_ENV_KWARGS = ('target_calories', 'target_protein', 'target_carbs', 'target_fat', 'budget_limit')
+
+_ALIGN = 64
+
+
+class _SharedArrays:
+    """在一块共享内存上按固定布局分配多个 NumPy 数组"""
+
+    def __init__(self, spec: Dict[str, Tuple[Tuple[int, ...], str]], raw=None, ctx=None):
+        self.spec = spec
+        offsets = {}
+        nbytes = 0
+        for name, (shape, dtype) in spec.items():
+            nbytes = (nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+            offsets[name] = nbytes
+            nbytes += int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+        if raw is None:
+            raw = (ctx or mp).RawArray('b', max(1, nbytes))
+        self.raw = raw
+
+        memory = np.ctypeslib.as_array(raw).view(np.uint8)
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (shape, dtype) in spec.items():
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            start = offsets[name]
+            self.arrays[name] = memory[start:start + size].view(dtype).reshape(shape)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+
+def _worker(remote, parent_remote, raw, spec, start: int, stop: int, env_kwargs: Dict,
+            record_telemetry: bool):
+    """工作进程：推进 [start, stop) 分片，结果直接写入共享内存"""
+    parent_remote.close()
+    buffers = _SharedArrays(spec, raw=raw)
+    rows = slice(start, stop)
+    n = stop - start
+
+    telemetry = EpisodeTelemetry(capacity=n) if record_telemetry else None
+    env = VecMealPlanningEnv(n_envs=n, telemetry=telemetry, **env_kwargs)
+
+    def write_state(obs):
+        buffers['obs'][rows] = obs
+        buffers['masks'][rows] = env.action_masks()
+        buffers['targets'][rows] = env.targets
+        buffers['totals'][rows] = env.totals
+
+    try:
+        while True:
+            cmd, arg = remote.recv()
+            try:
+                if cmd == 'step':
+                    env.global_step = int(buffers['global_step'][0])
+                    obs, rewards, terminated, truncated, infos = env.step(buffers['actions'][rows])
+                    buffers['rewards'][rows] = rewards
+                    buffers['terminated'][rows] = terminated
+                    buffers['truncated'][rows] = truncated
+                    for key in ('valid_action', 'total_cost', 'total_calories', 'step', 'unique_categories'):
+                        buffers[key][rows] = infos[key]
+                    if 'final_observation' in infos:
+                        buffers['final_observation'][rows] = infos['final_observation']
+                        buffers['final_action_masks'][rows] = infos['final_action_masks']
+                        buffers['final_totals'][rows] = infos['final_totals']
+                        buffers['final_targets'][rows] = infos['final_targets']
+                    if telemetry is not None:
+                        recorded = terminated & infos['valid_action']
+                        buffers['telemetry'][rows][recorded] = telemetry.drain()
+                    write_state(obs)
+                    remote.send((True, None))
+                elif cmd == 'reset':
+                    if arg is not None:
+                        arg = arg + start
+                    env.global_step = int(buffers['global_step'][0])
+                    obs, _ = env.reset(seed=arg)
+                    write_state(obs)
+                    remote.send((True, env.curriculum_stage if env.training_mode else 0))
+                elif cmd == 'close':
+                    remote.send((True, None))
+                    break
+                else:
+                    raise ValueError(f"Unknown command: {cmd}")
+            except Exception:
+                remote.send((False, traceback.format_exc()))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        remote.close()
+
+
+class AsyncMealPlanningVecEnv:
+    """
+    多进程向量化配餐环境
+
+    Args:
+        n_envs: 并行环境总数
+        n_workers: 工作进程数 (环境按连续分片均分，不超过 n_envs)
+        seed: 随机种子；第 i 个环境所在分片使用 seed + 分片起始索引
+        telemetry: Episode 遥测缓冲区 (工作进程回传奖励分量后在主进程记录)
+        start_method: multiprocessing 启动方式 (None=平台默认)
+        其余参数与 VecMealPlanningEnv 相同；目标与预算数组按分片切分
+    """
+
+    def __init__(
+        self,
+        n_envs: int,
+        n_workers: int = 2,
+        seed: Optional[int] = None,
+        telemetry: Optional[EpisodeTelemetry] = None,
+        start_method: Optional[str] = None,
+        **env_kwargs,
+    ):
+        self.n_envs = int(n_envs)
+        self.n_workers = max(1, min(int(n_workers), self.n_envs))
+        self.telemetry = telemetry
+        self.closed = False
+
+        # 空间定义与单进程环境一致 (目录在进程内缓存，构造开销很小)
+        template = VecMealPlanningEnv(n_envs=1, **{
+            key: value for key, value in env_kwargs.items() if key not in _PER_ENV_KWARGS
+        })
+        self.training_mode = template.training_mode
+        self.catalog = template.catalog
+        self.n_real_recipes = template.n_real_recipes
+        self.meal_types = template.meal_types
+        self.max_steps = template.max_steps
+        self.observation_space = template.observation_space
+        self.action_space = template.action_space
+        self.action_dim = template.action_dim
+        self.curriculum_stage = 1
+
+        n, a = self.n_envs, self.action_dim
+        spec = {
+            'global_step': ((1,), 'int64'),
+            'actions': ((n,), 'int64'),
+            'obs': ((n, 13), 'float32'),
+            'masks': ((n, a), 'bool'),
+            'targets': ((n, 5), 'float64'),
+            'totals': ((n, 5), 'float64'),
+            'rewards': ((n,), 'float64'),
+            'terminated': ((n,), 'bool'),
+            'truncated': ((n,), 'bool'),
+            'valid_action': ((n,), 'bool'),
+            'total_cost': ((n,), 'float64'),
+            'total_calories': ((n,), 'float64'),
+            'step': ((n,), 'int64'),
+            'unique_categories': ((n,), 'int64'),
+            'final_observation': ((n, 13), 'float32'),
+            'final_action_masks': ((n, a), 'bool'),
+            'final_totals': ((n, 5), 'float64'),
+            'final_targets': ((n, 5), 'float64'),
+            'telemetry': ((n, len(TELEMETRY_FIELDS)), 'float64'),
+        }
+        ctx = mp.get_context(start_method)
+        self._buffers = _SharedArrays(spec, ctx=ctx)
+
+        bounds = np.linspace(0, n, self.n_workers + 1).astype(int)
+        self._shards = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        self._remotes = []
+        self._processes = []
+        for start, stop in self._shards:
+            shard_kwargs = dict(env_kwargs)
+            for key in _PER_ENV_KWARGS:
+                if key in shard_kwargs and np.ndim(shard_kwargs[key]) > 0:
+                    shard_kwargs[key] = np.asarray(shard_kwargs[key], dtype=np.float64)[start:stop]
+            if seed is not None:
+                shard_kwargs['seed'] = seed + start
+
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(work_remote, remote, self._buffers.raw, spec, start, stop,
+                      shard_kwargs, telemetry is not None),
+                daemon=True,
+            )
+            process.start()
+            work_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+        self._waiting = False
+
+    # ------------------------------------------------------------------
+    # 课程学习
+    # ------------------------------------------------------------------
+
+    @property
+    def global_step(self) -> int:
+        return int(self._buffers['global_step'][0])
+
+    @global_step.setter
+    def global_step(self, value: int):
+        # 工作进程在下一次 step / reset 时从共享内存读取
+        self._buffers['global_step'][0] = value
+
+    # ------------------------------------------------------------------
+    # 通信
+    # ------------------------------------------------------------------
+
+    def _send(self, cmd: str, args: Optional[List] = None):
+        for i, remote in enumerate(self._remotes):
+            remote.send((cmd, None if args is None else args[i]))
+
+    def _gather(self) -> List:
+        results = []
+        errors = []
+        for remote in self._remotes:
+            ok, payload = remote.recv()
+            if ok:
+                results.append(payload)
+            else:
+                errors.append(payload)
+        if errors:
+            raise RuntimeError("环境工作进程出错:\n" + "\n".join(errors))
+        return results
+
+    # ------------------------------------------------------------------
+    # 环境接口
+    # ------------------------------------------------------------------
+
+    def reset(self, seed: Optional[int] = None, options=None) -> Tuple[np.ndarray, Dict]:
+        """重置所有环境，返回 ([N, 13] 观察值, info)"""
+        self._send('reset', [seed] * self.n_workers)
+        stages = self._gather()
+        self.curriculum_stage = max(stages)
+        targets = self._buffers['targets']
+        return self._buffers['obs'].copy(), {
+            'curriculum_stage': self.curriculum_stage,
+            'target_calories': targets[:, 0].copy(),
+            'budget_limit': targets[:, 4].copy(),
+        }
+
+    def step_async(self, actions: np.ndarray):
+        """写入动作并通知工作进程推进，不等待结果"""
+        self._buffers['actions'][:] = actions
+        self._send('step')
+        self._waiting = True
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """等待 step_async 完成，返回值与 VecMealPlanningEnv.step 相同"""
+        self._gather()
+        self._waiting = False
+
+        buffers = self._buffers
+        terminated = buffers['terminated'].copy()
+        infos = {
+            key: buffers[key].copy()
+            for key in ('valid_action', 'total_cost', 'total_calories', 'step', 'unique_categories')
+        }
+        if terminated.any():
+            done = terminated[:, None]
+            infos['final_observation'] = np.where(done, buffers['final_observation'], buffers['obs'])
+            infos['final_action_masks'] = np.where(done, buffers['final_action_masks'], buffers['masks'])
+            infos['final_totals'] = np.where(done, buffers['final_totals'], buffers['totals'])
+            infos['final_targets'] = np.where(done, buffers['final_targets'], buffers['targets'])
+            if self.telemetry is not None:
+                recorded = terminated & infos['valid_action']
+                if recorded.any():
+                    self.telemetry.record_batch(buffers['telemetry'][recorded])
+
+        return (
+            buffers['obs'].copy(),
+            buffers['rewards'].copy(),
+            terminated,
+            buffers['truncated'].copy(),
+            infos,
+        )
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """同时推进所有环境 (结束的环境自动重置)"""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def action_masks(self) -> np.ndarray:
+        """当前动作掩码 [N, action_dim] (由工作进程在 step / reset 后写入)"""
+        return self._buffers['masks'].copy()
+
+    def close(self):
+        """关闭所有工作进程"""
+        if self.closed:
+            return
+        if self._waiting:
+            try:
+                self._gather()
+            except (RuntimeError, EOFError, OSError):
+                pass
+        for remote in self._remotes:
+            try:
+                remote.send(('close', None))
+                remote.recv()
+            except (EOFError, OSError, BrokenPipeError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for remote in self._remotes:
+            remote.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
@@ -4,10 +4,12 @@ Runs an agent through a set of benchmark cases using MealPlanningEnv in
 evaluation (non-training) mode and collects per-case metrics.
 
 Supports dual evaluation: closed (original recipes) + open (with custom recipes).
+compare_agents reports greedy-action agreement and per-call latency between a
+reference agent and an optimized variant (quantized, distilled, NumPy, ...).
 """
 
-import io
-import contextlib
+import time
+
 import numpy as np
 from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
 
@@ -52,18 +54,17 @@ def _run_single_case(
         custom_recipes=custom_recipes,
     )
 
-    with contextlib.redirect_stdout(io.StringIO()):
-        obs, info = env.reset()
-        total_reward = 0.0
-        step = 0
-        done = False
-        while not done:
-            mask = env.action_masks()
-            action = agent.select_action(obs, mask, step=step, deterministic=True)
-            obs, reward, terminated, truncated, info = env.step(action)
-            total_reward += reward
-            step += 1
-            done = terminated or truncated
+    obs, info = env.reset()
+    total_reward = 0.0
+    step = 0
+    done = False
+    while not done:
+        mask = env.action_masks()
+        action = agent.select_action(obs, mask, step=step, deterministic=True)
+        obs, reward, terminated, truncated, info = env.step(action)
+        total_reward += reward
+        step += 1
+        done = terminated or truncated
 
     return {
         "case_name": case.name,
@@ -157,3 +158,74 @@ def evaluate_agent_dual(
             "diversity_score": closed_result["report"]["diversity_score"],
         },
     }
+
+
+def _latency_summary(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000.0
+    return {
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def compare_agents(
+    reference: AgentProtocol,
+    candidate: AgentProtocol,
+    cases: List[BenchmarkCase],
+    price_scale: float = 1.0,
+    budget_scale: float = 1.0,
+    custom_recipes: Optional[List[Dict]] = None,
+    repeats: int = 1,
+) -> Dict[str, Any]:
+    """Measure how often candidate picks the same greedy action as reference.
+
+    Both agents are queried on every state of the reference agent's own
+    trajectory, so a single disagreement does not cascade into the rest of
+    the episode. Each call is timed; ``repeats`` re-times every call to
+    smooth out noise on short benchmarks.
+    """
+    reference_times: List[float] = []
+    candidate_times: List[float] = []
+    per_case = []
+    for case in cases:
+        env = MealPlanningEnv(
+            target_calories=case.target_calories,
+            target_protein=case.target_protein,
+            target_carbs=case.target_carbs,
+            target_fat=case.target_fat,
+            budget_limit=case.budget_limit * budget_scale,
+            training_mode=False,
+            price_scale=price_scale,
+            custom_recipes=custom_recipes,
+        )
+        obs, _ = env.reset()
+        matches = 0
+        steps = 0
+        done = False
+        while not done:
+            mask = env.action_masks()
+            for _ in range(repeats):
+                start = time.perf_counter()
+                action = int(reference.select_action(obs, mask, step=steps, deterministic=True))
+                reference_times.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                candidate_action = int(candidate.select_action(obs, mask, step=steps, deterministic=True))
+                candidate_times.append(time.perf_counter() - start)
+
+            matches += candidate_action == action
+            steps += 1
+            obs, _, terminated, truncated, _ = env.step(action)
+            done = terminated or truncated
+
+        per_case.append({"case_name": case.name, "steps": steps, "agreement_rate": matches / steps})
+
+    total_steps = sum(c["steps"] for c in per_case)
+    return {
+        "per_case": per_case,
+        "agreement_rate": sum(c["agreement_rate"] * c["steps"] for c in per_case) / total_steps,
+        "steps": total_steps,
+        "reference_latency": _latency_summary(reference_times),
+        "candidate_latency": _latency_summary(candidate_times),
+    }
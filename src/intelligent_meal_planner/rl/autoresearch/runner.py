@@ -30,7 +30,13 @@ SUMMARY_REQUIRED_KEYS = [
 ]
 
 
-def _train_and_get_agent(timesteps: int, checkpoint_dir: str, train_fn=None):
+def _train_and_get_agent(
+    timesteps: int,
+    checkpoint_dir: str,
+    train_fn=None,
+    replay_warm_start: Optional[str] = None,
+    replay_save_dir: Optional[str] = None,
+):
     """Train a DQN agent and return it for evaluation.
 
     This function is designed to be mockable in tests. When train_fn is
@@ -42,16 +48,23 @@ def _train_and_get_agent(timesteps: int, checkpoint_dir: str, train_fn=None):
         checkpoint_dir: Directory to save the checkpoint.
         train_fn: Optional callable(timesteps) -> agent. If provided, uses
             this instead of the built-in training loop.
+        replay_warm_start: Optional saved replay directory used to pre-fill the
+            buffer (built-in loop only), so learning starts without re-collecting.
+        replay_save_dir: Optional directory to persist the replay buffer to
+            after training, for warm-starting later experiments.
     """
     if train_fn is not None:
         agent = train_fn(timesteps)
         ckpt_path = Path(checkpoint_dir) / "agent.pt"
         ckpt_path.parent.mkdir(parents=True, exist_ok=True)
         agent.save(str(ckpt_path))
+        if replay_save_dir:
+            agent.close()
+            agent.buffer.save(replay_save_dir)
         return agent
 
     # Default built-in training loop (backward compatible)
-    from intelligent_meal_planner.rl.environment import MealPlanningEnv
+    from intelligent_meal_planner.rl.vec_env import VecMealPlanningEnv
     from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
 
     config = {
@@ -77,51 +90,56 @@ def _train_and_get_agent(timesteps: int, checkpoint_dir: str, train_fn=None):
         "n_envs": 8,
         "device": "cuda" if torch.cuda.is_available() else "cpu",
         "total_timesteps": timesteps,
+        "buffer_warm_start": replay_warm_start,
+        "prefetch_batches": 2,
     }
 
     n_envs = config["n_envs"]
-    envs = [MealPlanningEnv(training_mode=True) for _ in range(n_envs)]
+    vec_env = VecMealPlanningEnv(n_envs=n_envs, training_mode=True)
     agent = MaskableDQNAgent(state_dim=13, action_dim=300, config=config)
 
-    obs_list = [env.reset()[0] for env in envs]
-    mask_list = [env.action_masks() for env in envs]
+    obs, _ = vec_env.reset()
+    masks = vec_env.action_masks()
 
     global_step = 0
     while global_step < timesteps:
-        for env in envs:
-            env.global_step = global_step
-
-        actions = [
-            agent.select_action(obs_list[i], mask_list[i], global_step)
-            for i in range(n_envs)
-        ]
-
-        for i in range(n_envs):
-            next_obs, reward, terminated, truncated, info = envs[i].step(actions[i])
-            done = terminated or truncated
-            next_mask = envs[i].action_masks()
-
-            agent.store_transition(
-                obs_list[i], actions[i], reward, next_obs, done,
-                mask_list[i], next_mask,
-            )
-
-            if done:
-                obs_list[i], _ = envs[i].reset()
-                mask_list[i] = envs[i].action_masks()
-            else:
-                obs_list[i] = next_obs
-                mask_list[i] = next_mask
+        vec_env.global_step = global_step
+
+        actions = agent.select_actions(obs, masks, global_step)
+
+        next_obs, rewards, terminated, truncated, infos = vec_env.step(actions)
+        dones = terminated | truncated
+        next_masks = vec_env.action_masks()
+
+        # Finished episodes were auto-reset; store their terminal state instead.
+        stored_next_obs = next_obs
+        stored_next_masks = next_masks
+        if dones.any():
+            stored_next_obs = np.where(dones[:, None], infos["final_observation"], next_obs)
+            stored_next_masks = np.where(dones[:, None], infos["final_action_masks"], next_masks)
+
+        agent.store_transitions(
+            obs, actions, rewards, stored_next_obs, dones,
+            masks, stored_next_masks,
+        )
+
+        obs = next_obs
+        masks = next_masks
 
         global_step += n_envs
 
         if global_step % config["train_freq"] == 0:
             agent.train_step_fn()
 
+    # Stop the prefetch thread so pending priority updates land before saving.
+    agent.close()
+
     # Save checkpoint
     ckpt_path = Path(checkpoint_dir) / "agent.pt"
     ckpt_path.parent.mkdir(parents=True, exist_ok=True)
     agent.save(str(ckpt_path))
+    if replay_save_dir:
+        agent.buffer.save(replay_save_dir)
 
     return agent
 
@@ -134,12 +152,23 @@ def run_experiment(
     price_scale: float = 1.0,
     budget_scale: float = 1.0,
     custom_recipes: Optional[list] = None,
+    replay_warm_start: Optional[str] = None,
+    save_replay: bool = False,
 ) -> Dict[str, Any]:
-    """Run a single autoresearch experiment: train, evaluate, save."""
+    """Run a single autoresearch experiment: train, evaluate, save.
+
+    With ``save_replay`` the replay buffer is persisted to ``<run_dir>/replay``;
+    pass that directory as ``replay_warm_start`` to later runs to skip the
+    cold-start collection phase.
+    """
     run_dir = Path(output_dir) / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
 
-    agent = _train_and_get_agent(timesteps, str(run_dir / "checkpoints"))
+    agent = _train_and_get_agent(
+        timesteps, str(run_dir / "checkpoints"),
+        replay_warm_start=replay_warm_start,
+        replay_save_dir=str(run_dir / "replay") if save_replay else None,
+    )
 
     cases = get_default_benchmark_cases()
     eval_results = evaluate_agent_dual(
@@ -0,0 +1,250 @@
+"""
+列式菜品目录 (RecipeCatalog)
+
+进程内只读共享的菜品特征矩阵：
+- 营养与价格: calories / protein / carbs / fat / price 连续 float32 数组，
+  以及用于累加与预算比较的 float64 原始值 (features_f64 / price_f64)
+- 餐次: meal_type_bits 位掩码 (bit0=breakfast, bit1=lunch, bit2=dinner)
+- 类别 / 标签: 整数编码 (category_codes, tag_matrix 按标签编码索引)
+- 每个餐次的候选索引 (meal_indices) 及按价格排序的索引 (meal_indices_by_price)
+
+同一路径的数据库只解析一次，所有环境共享同一份数组；
+price_scale 与 custom_recipes 通过 overlay() 生成轻量覆盖层，不修改基础目录。
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+MEAL_TYPES: Tuple[str, ...] = ('breakfast', 'lunch', 'dinner')
+
+DEFAULT_RECIPES_PATH = Path(__file__).parent.parent / "data" / "recipes.json"
+
+_CATALOG_CACHE: Dict[str, "RecipeCatalog"] = {}
+_CATALOG_LOCK = threading.Lock()
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array)
+    array.setflags(write=False)
+    return array
+
+
+class RecipeCatalog:
+    """
+    只读列式菜品目录
+
+    不要直接修改数组或 recipes 中的字典；需要调整价格或追加菜品时使用 overlay()。
+
+    Args:
+        recipes: 菜品字典列表 (与 recipes.json 中的结构一致)
+        version: 目录版本标识 (用于校验模型与目录是否匹配)
+    """
+
+    def __init__(self, recipes: Sequence[Dict], version: str = ""):
+        self.version = version
+        self._recipes: Optional[Tuple[Dict, ...]] = tuple(recipes)
+        self._build_columns(self._recipes)
+
+    # ------------------------------------------------------------------
+    # 构建
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, recipes_path: Optional[str] = None) -> "RecipeCatalog":
+        """加载 (并缓存) 指定路径的菜品目录，同一路径在进程内只解析一次"""
+        path = Path(recipes_path) if recipes_path is not None else DEFAULT_RECIPES_PATH
+        key = str(path.resolve())
+
+        catalog = _CATALOG_CACHE.get(key)
+        if catalog is not None:
+            return catalog
+
+        with _CATALOG_LOCK:
+            catalog = _CATALOG_CACHE.get(key)
+            if catalog is None:
+                raw = path.read_bytes()
+                data = json.loads(raw.decode('utf-8'))
+                version = hashlib.sha1(raw).hexdigest()[:12]
+                catalog = cls(data['recipes'], version=version)
+                _CATALOG_CACHE[key] = catalog
+        return catalog
+
+    def _build_columns(self, recipes: Sequence[Dict]):
+        n = len(recipes)
+        self.ids = _readonly(np.array([r['id'] for r in recipes], dtype=np.int64))
+        self.names: Tuple[str, ...] = tuple(r['name'] for r in recipes)
+
+        values = np.array(
+            [(r['calories'], r['protein'], r['carbs'], r['fat'], r['price']) for r in recipes],
+            dtype=np.float64,
+        ).reshape(n, 5)
+        self._set_values(values)
+
+        bits = np.zeros(n, dtype=np.uint8)
+        for i, recipe in enumerate(recipes):
+            meal_type = recipe['meal_type']
+            if isinstance(meal_type, str):
+                meal_type = [meal_type]
+            for m, name in enumerate(MEAL_TYPES):
+                if name in meal_type:
+                    bits[i] |= 1 << m
+        self.meal_type_bits = _readonly(bits)
+
+        category_index: Dict[str, int] = {}
+        codes = [category_index.setdefault(r['category'], len(category_index)) for r in recipes]
+        self.categories: Tuple[str, ...] = tuple(category_index)
+        self.category_codes = _readonly(np.array(codes, dtype=np.int16))
+
+        tag_index: Dict[str, int] = {}
+        for recipe in recipes:
+            for tag in recipe.get('tags', []):
+                tag_index.setdefault(tag, len(tag_index))
+        tag_matrix = np.zeros((n, len(tag_index)), dtype=bool)
+        for i, recipe in enumerate(recipes):
+            for tag in recipe.get('tags', []):
+                tag_matrix[i, tag_index[tag]] = True
+        self.tags: Tuple[str, ...] = tuple(tag_index)
+        self.tag_index = tag_index
+        self.tag_matrix = _readonly(tag_matrix)
+
+        self._build_meal_indices()
+
+    def _set_values(self, values: np.ndarray):
+        """values: [n, 5] 菜品字典中的原始数值 (float64)"""
+        self.features = _readonly(values.astype(np.float32))
+        self.calories = _readonly(self.features[:, 0])
+        self.protein = _readonly(self.features[:, 1])
+        self.carbs = _readonly(self.features[:, 2])
+        self.fat = _readonly(self.features[:, 3])
+        self.price = _readonly(self.features[:, 4])
+        # 营养与花费累加、预算比较使用菜品字典中的原始数值 (float64)，
+        # 与逐项 Python float 运算结果一致 (float32 上转会引入误差，如 12.3 -> 12.300000190734863)
+        self.features_f64 = _readonly(np.asarray(values, dtype=np.float64))
+        self.price_f64 = _readonly(self.features_f64[:, 4])
+
+    def _build_meal_indices(self):
+        """预计算每个餐次的候选菜品索引 (依赖 meal_type_bits 与 price_f64)"""
+        self.meal_masks = _readonly(np.stack([
+            (self.meal_type_bits & (1 << m)) != 0 for m in range(len(MEAL_TYPES))
+        ]).reshape(len(MEAL_TYPES), len(self)))
+
+        meal_indices = []
+        meal_prices = []
+        by_price = []
+        by_price_prices = []
+        for m in range(len(MEAL_TYPES)):
+            idx = np.flatnonzero(self.meal_masks[m])
+            order = idx[np.argsort(self.price_f64[idx], kind='stable')]
+            meal_indices.append(_readonly(idx))
+            meal_prices.append(_readonly(self.price_f64[idx]))
+            by_price.append(_readonly(order))
+            by_price_prices.append(_readonly(self.price_f64[order]))
+        self.meal_indices: Tuple[np.ndarray, ...] = tuple(meal_indices)
+        self.meal_prices: Tuple[np.ndarray, ...] = tuple(meal_prices)
+        self.meal_indices_by_price: Tuple[np.ndarray, ...] = tuple(by_price)
+        self.meal_sorted_prices: Tuple[np.ndarray, ...] = tuple(by_price_prices)
+
+    # ------------------------------------------------------------------
+    # 覆盖层
+    # ------------------------------------------------------------------
+
+    def overlay(
+        self,
+        price_scale: float = 1.0,
+        custom_recipes: Optional[List[Dict]] = None,
+    ) -> "RecipeCatalog":
+        """
+        生成价格缩放 / 追加自定义菜品的覆盖层
+
+        基础目录保持不变；仅价格缩放时类别、标签、餐次数组直接共享。
+        自定义菜品的 id 从基础目录最大 id + 1 开始顺延。
+
+        Args:
+            price_scale: 菜品价格缩放因子 (1.0=原价)，缩放后保留一位小数
+            custom_recipes: 自定义菜品列表 (已通过验证)
+        """
+        if price_scale == 1.0 and not custom_recipes:
+            return self
+
+        view = object.__new__(RecipeCatalog)
+        view.version = f"{self.version}+p{price_scale:g}"
+        view._base = self
+        view._price_scale = price_scale
+        view._custom_recipes = []
+
+        if custom_recipes:
+            base_id = int(self.ids.max()) + 1 if len(self) else 0
+            for i, cr in enumerate(custom_recipes):
+                entry = dict(cr)
+                entry['id'] = base_id + i
+                if isinstance(entry.get('meal_type'), str):
+                    entry['meal_type'] = [entry['meal_type']]
+                if 'tags' not in entry:
+                    entry['tags'] = []
+                view._custom_recipes.append(entry)
+            digest = hashlib.sha1(
+                json.dumps(view._custom_recipes, sort_keys=True, ensure_ascii=False).encode('utf-8')
+            ).hexdigest()[:8]
+            view.version += f"+c{digest}"
+
+            # 自定义菜品数量有限 (<=150)，合并后重建即可
+            merged = RecipeCatalog(self.recipes + tuple(view._custom_recipes))
+            for attr in ('ids', 'names', 'meal_type_bits', 'categories', 'category_codes',
+                         'tags', 'tag_index', 'tag_matrix'):
+                setattr(view, attr, getattr(merged, attr))
+            values = np.array(merged.features_f64)
+        else:
+            for attr in ('ids', 'names', 'meal_type_bits', 'categories', 'category_codes',
+                         'tags', 'tag_index', 'tag_matrix'):
+                setattr(view, attr, getattr(self, attr))
+            values = np.array(self.features_f64)
+
+        if price_scale != 1.0:
+            # 与逐项 round(price * price_scale, 1) 一致
+            values[:, 4] = [round(price * price_scale, 1) for price in values[:, 4].tolist()]
+
+        view._recipes = None
+        view._set_values(values)
+        view._build_meal_indices()
+        return view
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_recipes(self) -> int:
+        return len(self.ids)
+
+    @property
+    def recipes(self) -> Tuple[Dict, ...]:
+        """菜品字典 (只读)；覆盖层首次访问时才生成缩放后的字典"""
+        if self._recipes is None:
+            prices = self.price_f64.tolist()
+            entries = []
+            for recipe, price in zip(self._base.recipes + tuple(self._custom_recipes), prices):
+                if self._price_scale != 1.0:
+                    recipe = dict(recipe)
+                    recipe['price'] = price
+                entries.append(recipe)
+            self._recipes = tuple(entries)
+        return self._recipes
+
+    def category_of(self, index: int) -> str:
+        return self.categories[self.category_codes[index]]
+
+    def has_any_tag(self, tags: Iterable[str]) -> np.ndarray:
+        """返回 [n] 布尔数组：菜品是否带有任一给定标签"""
+        codes = [self.tag_index[tag] for tag in tags if tag in self.tag_index]
+        if not codes:
+            return np.zeros(len(self), dtype=bool)
+        return self.tag_matrix[:, codes].any(axis=1)
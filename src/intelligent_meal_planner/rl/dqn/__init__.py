@@ -6,13 +6,18 @@ DQN 模块 - 带动作掩码的 Dueling Double DQN 实现
 
 from .networks import DuelingDQN
 from .replay_buffer import PrioritizedReplayBuffer
+from .prefetch import BatchPrefetcher
 from .agent import MaskableDQNAgent
+from .quantization import quantize_dynamic_int8, set_inference_threads
 from .utils import EpsilonScheduler, LinearScheduler
 
 __all__ = [
     'DuelingDQN',
     'PrioritizedReplayBuffer',
+    'BatchPrefetcher',
     'MaskableDQNAgent',
     'EpsilonScheduler',
     'LinearScheduler',
+    'quantize_dynamic_int8',
+    'set_inference_threads',
 ]
@@ -7,6 +7,8 @@
 - 优先经验回放
 """
 
+import threading
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -16,6 +18,8 @@ from pathlib import Path
 
 from .networks import DuelingDQN
 from .replay_buffer import PrioritizedReplayBuffer
+from .prefetch import BatchPrefetcher
+from .quantization import quantize_dynamic_int8, set_inference_threads
 from .utils import EpsilonScheduler, LinearScheduler
 
 
@@ -57,14 +61,23 @@ class MaskableDQNAgent:
             lr=self.config.get('learning_rate', 1e-4)
         )
 
-        # 经验回放
+        # 经验回放 (buffer_dir 指定时存储在内存映射文件中)
         self.buffer = PrioritizedReplayBuffer(
             capacity=self.config.get('buffer_size', 100000),
             alpha=self.config.get('per_alpha', 0.6),
             beta_start=self.config.get('per_beta_start', 0.4),
             beta_end=self.config.get('per_beta_end', 1.0),
-            beta_steps=self.config.get('per_beta_steps', 400000)
+            beta_steps=self.config.get('per_beta_steps', 400000),
+            storage_dir=self.config.get('buffer_dir')
         )
+        # 从已保存的经验语料预热，跳过 min_buffer_size 的冷启动收集
+        if self.config.get('buffer_warm_start'):
+            self.buffer.warm_start(self.config['buffer_warm_start'])
+
+        # 后台批次预取 (prefetch_batches > 0 时启用)：采样与梯度更新重叠
+        self.prefetch_batches = self.config.get('prefetch_batches', 0)
+        self._buffer_lock = threading.Lock()
+        self._prefetcher: Optional[BatchPrefetcher] = None
 
         # 调度器
         self.epsilon_scheduler = EpsilonScheduler(
@@ -101,6 +114,10 @@ class MaskableDQNAgent:
             'per_beta_steps': 400000,
             'total_timesteps': 500000,
             'epsilon_schedule': None,
+            'buffer_dir': None,
+            'buffer_warm_start': None,
+            'prefetch_batches': 0,
+            'catalog_version': None,
             'device': 'cuda' if torch.cuda.is_available() else 'cpu',
         }
 
@@ -142,6 +159,80 @@ class MaskableDQNAgent:
                 q_values = self.q_network.get_action_values(state_t, mask_t)
                 return q_values.argmax(dim=1).item()
 
+    def select_actions(
+        self,
+        states: np.ndarray,
+        action_masks: np.ndarray,
+        step: int,
+        deterministic: bool = False
+    ) -> np.ndarray:
+        """
+        批量选择动作 (带掩码的 epsilon-greedy，一次前向传播)
+
+        探索的环境在各自的有效动作中均匀采样 (掩码后的随机分数取 argmax)，
+        利用的环境合并为一个批次经过 q_network；无有效动作的环境返回 0。
+
+        Args:
+            states: 状态 [N, state_dim]
+            action_masks: 动作掩码 [N, action_dim] (True=有效)
+            step: 当前步数
+            deterministic: 是否确定性选择
+
+        Returns:
+            动作索引数组 [N] (int64)
+        """
+        states = np.asarray(states, dtype=np.float32)
+        action_masks = np.asarray(action_masks, dtype=bool)
+        n = len(states)
+        actions = np.zeros(n, dtype=np.int64)
+
+        has_valid = action_masks.any(axis=1)
+        epsilon = 0.0 if deterministic else self.epsilon_scheduler.get_epsilon(step)
+        explore = np.random.random(n) < epsilon
+        exploit = has_valid & ~explore
+        explore &= has_valid
+
+        if explore.any():
+            # 探索：掩码外的分数为 -1，均匀分数的 argmax 即为有效动作中的均匀采样
+            scores = np.random.random((int(explore.sum()), action_masks.shape[1]))
+            scores[~action_masks[explore]] = -1.0
+            actions[explore] = scores.argmax(axis=1)
+
+        if exploit.any():
+            # 利用：一次前向传播，选择有效动作中 Q 值最大的
+            with torch.no_grad():
+                state_t = torch.from_numpy(states[exploit]).to(self.device)
+                mask_t = torch.from_numpy(action_masks[exploit]).to(self.device)
+                q_values = self.q_network.get_action_values(state_t, mask_t)
+                actions[exploit] = q_values.argmax(dim=1).cpu().numpy()
+
+        return actions
+
+    def get_action_values(
+        self,
+        states: np.ndarray,
+        action_masks: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        批量计算 Q 值 (NumPy 输入输出，与 NumpyDuelingPolicy.get_action_values 一致)
+
+        Args:
+            states: 状态 [N, state_dim]
+            action_masks: 动作掩码 [N, action_dim] (True=有效)，无效动作的 Q 值为 -inf
+
+        Returns:
+            Q 值 [N, action_dim] (float32)
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float32))
+        with torch.no_grad():
+            state_t = torch.from_numpy(states).to(self.device)
+            mask_t = None
+            if action_masks is not None:
+                masks = np.atleast_2d(np.asarray(action_masks, dtype=bool))
+                mask_t = torch.from_numpy(masks).to(self.device)
+            q_values = self.q_network.get_action_values(state_t, mask_t)
+        return q_values.float().cpu().numpy()
+
     def store_transition(
         self,
         state: np.ndarray,
@@ -153,10 +244,28 @@ class MaskableDQNAgent:
         next_action_mask: np.ndarray
     ):
         """存储经验"""
-        self.buffer.add(
-            state, action, reward, next_state, done,
-            action_mask, next_action_mask
-        )
+        with self._buffer_lock:
+            self.buffer.add(
+                state, action, reward, next_state, done,
+                action_mask, next_action_mask
+            )
+
+    def store_transitions(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+        action_masks: np.ndarray,
+        next_action_masks: np.ndarray
+    ):
+        """批量存储经验 (向量化环境一步产生的 N 条经验)"""
+        with self._buffer_lock:
+            self.buffer.add_batch(
+                states, actions, rewards, next_states, dones,
+                action_masks, next_action_masks
+            )
 
     def train_step_fn(self, batch_size: int = None) -> Optional[Dict]:
         """
@@ -171,17 +280,31 @@ class MaskableDQNAgent:
         if len(self.buffer) < min_buffer:
             return None
 
-        # 采样
-        batch, indices, weights = self.buffer.sample(batch_size)
-
-        # 转换为张量
-        states = torch.FloatTensor(batch['states']).to(self.device)
-        actions = torch.LongTensor(batch['actions']).to(self.device)
-        rewards = torch.FloatTensor(batch['rewards']).to(self.device)
-        next_states = torch.FloatTensor(batch['next_states']).to(self.device)
-        dones = torch.FloatTensor(batch['dones']).to(self.device)
-        next_masks = torch.BoolTensor(batch['next_action_masks']).to(self.device)
-        weights = torch.FloatTensor(weights).to(self.device)
+        # 采样：预取时直接取后台线程准备好的张量槽位
+        prefetcher = self._get_prefetcher(batch_size)
+        if prefetcher is not None:
+            slot, batch, indices = prefetcher.get()
+        else:
+            with self._buffer_lock:
+                batch, indices, weights = self.buffer.sample(batch_size)
+            batch = {
+                'states': torch.from_numpy(batch['states']),
+                'actions': torch.from_numpy(batch['actions']),
+                'rewards': torch.from_numpy(batch['rewards']),
+                'next_states': torch.from_numpy(batch['next_states']),
+                'dones': torch.from_numpy(batch['dones']).float(),
+                'next_action_masks': torch.from_numpy(batch['next_action_masks']),
+                'weights': torch.from_numpy(weights),
+            }
+            batch = {name: tensor.to(self.device) for name, tensor in batch.items()}
+
+        states = batch['states']
+        actions = batch['actions']
+        rewards = batch['rewards']
+        next_states = batch['next_states']
+        dones = batch['dones']
+        next_masks = batch['next_action_masks']
+        weights = batch['weights']
 
         # 计算当前 Q 值
         current_q = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze(1)
@@ -212,8 +335,12 @@ class MaskableDQNAgent:
         nn.utils.clip_grad_norm_(self.q_network.parameters(), self.grad_clip)
         self.optimizer.step()
 
-        # 更新优先级
-        self.buffer.update_priorities(indices, td_errors)
+        # 更新优先级 (预取时交给后台线程在下一次采样前应用)
+        if prefetcher is not None:
+            prefetcher.update_priorities(indices, td_errors)
+            prefetcher.release(slot)
+        else:
+            self.buffer.update_priorities(indices, td_errors)
 
         # 更新目标网络
         self.train_step += 1
@@ -233,6 +360,23 @@ class MaskableDQNAgent:
             'learning_rate': new_lr,
         }
 
+    def _get_prefetcher(self, batch_size: int) -> Optional[BatchPrefetcher]:
+        """按需启动预取器；批次大小与配置不一致时退回同步采样"""
+        if self.prefetch_batches <= 0 or batch_size != self.config.get('batch_size', 256):
+            return None
+        if self._prefetcher is None:
+            self._prefetcher = BatchPrefetcher(
+                self.buffer, batch_size, self.device, self._buffer_lock,
+                depth=self.prefetch_batches
+            )
+        return self._prefetcher
+
+    def close(self):
+        """停止预取线程并应用剩余的优先级更新 (保存经验回放前调用)"""
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
     def update_target_network(self):
         """硬更新目标网络"""
         self.target_network.load_state_dict(self.q_network.state_dict())
@@ -260,16 +404,45 @@ class MaskableDQNAgent:
         self.train_step = checkpoint['train_step']
 
     @classmethod
-    def from_pretrained(cls, path: str, device: str = None):
-        """从预训练模型加载"""
+    def from_pretrained(
+        cls,
+        path: str,
+        device: str = None,
+        quantize: bool = False,
+        num_threads: Optional[int] = None
+    ):
+        """
+        从预训练模型加载
+
+        Args:
+            path: 检查点路径
+            device: 推理设备 (默认沿用训练配置，无 CUDA 时退回 CPU)
+            quantize: 对 online 网络做动态 int8 量化 (仅 CPU 推理，量化后不可再训练)
+            num_threads: 本进程 torch 线程预算 (None 时读取 RL_INFERENCE_THREADS)
+        """
+        set_inference_threads(num_threads)
         checkpoint = torch.load(path, map_location='cpu')
         config = checkpoint['config']
 
-        if device:
+        if quantize:
+            config['device'] = 'cpu'
+        elif device:
             config['device'] = device
         elif not torch.cuda.is_available() and config.get('device', '').startswith('cuda'):
             config['device'] = 'cpu'
 
-        agent = cls(config=config)
+        # 推理不需要经验回放：不打开训练时的内存映射目录，也不预热
+        config['buffer_dir'] = None
+        config['buffer_warm_start'] = None
+
+        # 网络结构以权重形状为准 (动作维度随菜品目录而变，不能用默认值)
+        q_state = checkpoint['q_network']
+        agent = cls(
+            state_dim=q_state['feature.0.weight'].shape[1],
+            action_dim=q_state['advantage_stream.2.weight'].shape[0],
+            config=config
+        )
         agent.load(path)
+        if quantize:
+            agent.q_network = quantize_dynamic_int8(agent.q_network)
         return agent
@@ -0,0 +1,220 @@
+"""
+策略蒸馏：将 Dueling DQN 教师网络压缩为小型学生网络
+
+1. collect_teacher_dataset: 在一组营养目标 × 预算 × 价格系数的网格上，
+   用教师策略 (带少量随机探索以覆盖更多状态) 批量推演 VecMealPlanningEnv，
+   记录每个状态的动作掩码、教师 Q 值与贪心动作
+2. distill_student: 学生网络同时拟合有效动作上的教师 Q 值 (MSE)
+   与教师贪心动作 (带掩码的交叉熵)
+3. validate_student: 用 evaluate_agent_dual 对比教师与学生的基准得分，
+   得分差在容差内才可上线；同时报告动作一致率与延迟
+"""
+
+import copy
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from ..vec_env import VecMealPlanningEnv
+from .agent import MaskableDQNAgent
+
+
+# 宏量营养素比例 (蛋白质, 碳水, 脂肪)：均衡 | 健身/高蛋白 | Keto/低碳
+MACRO_MODES = ((0.20, 0.50, 0.30), (0.35, 0.45, 0.20), (0.30, 0.10, 0.60))
+
+
+def target_grid(
+    calories: Sequence[float] = (1200, 1500, 1800, 2100, 2400, 2700, 3000),
+    cost_per_100kcal: Sequence[float] = (2.0, 3.0, 4.5, 6.0, 8.0),
+    macro_modes: Sequence[Sequence[float]] = MACRO_MODES
+) -> np.ndarray:
+    """
+    生成目标网格
+
+    Returns:
+        [N, 5] (calories, protein, carbs, fat, budget)；预算按每 100kcal 花费换算，
+        限制在 [30, 250] 元
+    """
+    rows = []
+    for kcal in calories:
+        for protein_ratio, carb_ratio, fat_ratio in macro_modes:
+            for cost in cost_per_100kcal:
+                rows.append((
+                    kcal,
+                    kcal * protein_ratio / 4.0,
+                    kcal * carb_ratio / 4.0,
+                    kcal * fat_ratio / 9.0,
+                    float(np.clip(kcal / 100.0 * cost, 30.0, 250.0)),
+                ))
+    return np.asarray(rows, dtype=np.float64)
+
+
+@torch.no_grad()
+def _q_values(agent: MaskableDQNAgent, states: np.ndarray) -> np.ndarray:
+    agent.q_network.eval()
+    return agent.q_network(torch.from_numpy(states).to(agent.device)).cpu().numpy()
+
+
+def collect_teacher_dataset(
+    teacher: MaskableDQNAgent,
+    targets: Optional[np.ndarray] = None,
+    price_scales: Sequence[float] = (0.8, 1.0, 1.25),
+    n_rollouts: int = 4,
+    epsilon: float = 0.15,
+    seed: int = 0
+) -> Dict[str, np.ndarray]:
+    """
+    推演教师策略，收集蒸馏数据
+
+    每个 (目标, 价格系数) 推演 n_rollouts 个 episode：第一个完全贪心，
+    其余以 epsilon 概率从有效动作中随机选择，覆盖教师轨迹附近的状态。
+
+    Returns:
+        states [M, 13] float32, masks [M, A] bool, q_values [M, A] float32,
+        actions [M] int64 (教师在有效动作上的贪心动作)
+    """
+    targets = target_grid() if targets is None else np.asarray(targets, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    explore = np.repeat(np.arange(n_rollouts) > 0, len(targets)) * epsilon
+    tiled = np.tile(targets, (n_rollouts, 1))
+
+    states, masks, q_values, actions = [], [], [], []
+    for price_scale in price_scales:
+        env = VecMealPlanningEnv(
+            n_envs=len(tiled),
+            target_calories=tiled[:, 0], target_protein=tiled[:, 1],
+            target_carbs=tiled[:, 2], target_fat=tiled[:, 3], budget_limit=tiled[:, 4],
+            training_mode=False, price_scale=price_scale,
+        )
+        obs, _ = env.reset()
+        mask = env.action_masks()[:, :teacher.action_dim]
+        for _ in range(env.max_steps):
+            q = _q_values(teacher, obs)
+            greedy = np.where(mask, q, -np.inf).argmax(axis=1)
+            valid = mask.any(axis=1)
+
+            states.append(obs[valid])
+            masks.append(mask[valid])
+            q_values.append(q[valid])
+            actions.append(greedy[valid])
+
+            noise = np.where(mask, rng.random(mask.shape), -1.0).argmax(axis=1)
+            chosen = np.where(rng.random(len(obs)) < explore, noise, greedy)
+            obs, _, _, _, _ = env.step(chosen)
+            mask = env.action_masks()[:, :teacher.action_dim]
+
+    return {
+        'states': np.concatenate(states).astype(np.float32),
+        'masks': np.concatenate(masks),
+        'q_values': np.concatenate(q_values).astype(np.float32),
+        'actions': np.concatenate(actions).astype(np.int64),
+    }
+
+
+def distill_student(
+    teacher: MaskableDQNAgent,
+    dataset: Dict[str, np.ndarray],
+    hidden_dims: List[int] = None,
+    epochs: int = 30,
+    batch_size: int = 512,
+    learning_rate: float = 1e-3,
+    q_weight: float = 0.1,
+    ce_weight: float = 1.0,
+    temperature: float = 1.0,
+    seed: int = 0
+) -> MaskableDQNAgent:
+    """
+    训练学生网络
+
+    Args:
+        teacher: 教师 Agent (提供状态/动作维度与配置)
+        dataset: collect_teacher_dataset 的结果
+        hidden_dims: 学生隐藏层维度 (默认 [64, 64, 32])
+        q_weight: 有效动作 Q 值 MSE 损失的权重
+        ce_weight: 贪心动作交叉熵损失的权重
+        temperature: 交叉熵的 softmax 温度
+
+    Returns:
+        学生 MaskableDQNAgent (配置沿用教师，可直接 save / export_numpy_policy)
+    """
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+
+    config = copy.deepcopy(teacher.config)
+    config['hidden_dims'] = list(hidden_dims or [64, 64, 32])
+    config['buffer_dir'] = None
+    config['buffer_warm_start'] = None
+    student = MaskableDQNAgent(state_dim=teacher.state_dim, action_dim=teacher.action_dim, config=config)
+    network = student.q_network
+    optimizer = torch.optim.Adam(network.parameters(), lr=learning_rate)
+
+    device = student.device
+    states = torch.from_numpy(dataset['states']).to(device)
+    masks = torch.from_numpy(dataset['masks']).to(device)
+    q_teacher = torch.from_numpy(dataset['q_values']).to(device)
+    actions = torch.from_numpy(dataset['actions']).to(device)
+
+    network.train()
+    n = len(states)
+    for _ in range(epochs):
+        order = torch.from_numpy(rng.permutation(n)).to(device)
+        for start in range(0, n, batch_size):
+            idx = order[start:start + batch_size]
+            mask = masks[idx]
+            q = network(states[idx])
+
+            q_loss = ((q - q_teacher[idx]) ** 2 * mask).sum() / mask.sum()
+            logits = q.masked_fill(~mask, float('-inf')) / temperature
+            ce_loss = F.cross_entropy(logits, actions[idx])
+            loss = q_weight * q_loss + ce_weight * ce_loss
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    network.eval()
+
+    student.target_network.load_state_dict(network.state_dict())
+    return student
+
+
+def validate_student(
+    teacher: MaskableDQNAgent,
+    student: MaskableDQNAgent,
+    cases=None,
+    tolerance: float = 1.0,
+    price_scale: float = 1.0,
+    budget_scale: float = 1.0,
+    custom_recipes: Optional[List[Dict]] = None
+) -> Dict:
+    """
+    基准验证
+
+    Args:
+        cases: 基准用例 (默认 get_default_benchmark_cases())
+        tolerance: 允许学生 aggregate_score 低于教师的分数 (0-100 分制)
+        price_scale / budget_scale / custom_recipes: 传给 evaluate_agent_dual 的开放评估参数
+
+    Returns:
+        teacher_score, student_score, score_gap, passed, agreement_rate,
+        teacher_latency, student_latency
+    """
+    from ..autoresearch.benchmark import get_default_benchmark_cases
+    from ..autoresearch.evaluator import compare_agents, evaluate_agent_dual
+
+    cases = cases or get_default_benchmark_cases()
+    eval_kwargs = dict(price_scale=price_scale, budget_scale=budget_scale, custom_recipes=custom_recipes)
+    teacher_score = evaluate_agent_dual(teacher, cases, **eval_kwargs)['report']['aggregate_score']
+    student_score = evaluate_agent_dual(student, cases, **eval_kwargs)['report']['aggregate_score']
+    comparison = compare_agents(teacher, student, cases, repeats=5)
+
+    return {
+        'teacher_score': teacher_score,
+        'student_score': student_score,
+        'score_gap': teacher_score - student_score,
+        'passed': teacher_score - student_score <= tolerance,
+        'agreement_rate': comparison['agreement_rate'],
+        'teacher_latency': comparison['reference_latency'],
+        'student_latency': comparison['candidate_latency'],
+    }
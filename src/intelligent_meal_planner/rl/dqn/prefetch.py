@@ -0,0 +1,162 @@
+"""
+经验回放批次预取 (BatchPrefetcher)
+
+后台线程从 PrioritizedReplayBuffer 采样下一批经验，写入预分配、可复用的张量槽位；
+学习线程取走一个已就绪的槽位完成梯度更新后归还。优先级更新先进入队列，
+由后台线程在下一次采样前统一应用，学习线程不再等待 Python 侧的采样与转换。
+
+与同步采样相比：采样的批次最多滞后 depth 步，新加入的经验与优先级更新
+会在随后的批次中生效。
+"""
+
+import queue
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import torch
+
+from .replay_buffer import PrioritizedReplayBuffer
+
+
+# 训练只需要以下字段 (当前状态的动作掩码不参与损失计算)
+_FIELDS = {
+    'states': torch.float32,
+    'actions': torch.int64,
+    'rewards': torch.float32,
+    'next_states': torch.float32,
+    'dones': torch.float32,
+    'next_action_masks': torch.bool,
+    'weights': torch.float32,
+}
+
+
+class BatchPrefetcher:
+    """
+    后台批次预取器
+
+    Args:
+        buffer: 经验回放缓冲区 (至少已有一条经验，用于确定张量形状)
+        batch_size: 批次大小
+        device: 训练设备；CUDA 时主机侧张量使用锁页内存，取出时异步拷贝到设备
+        lock: 保护 buffer 的锁 (与添加经验的线程共享)
+        depth: 预取槽位数
+    """
+
+    def __init__(
+        self,
+        buffer: PrioritizedReplayBuffer,
+        batch_size: int,
+        device: torch.device,
+        lock: threading.Lock,
+        depth: int = 2
+    ):
+        self.buffer = buffer
+        self.batch_size = batch_size
+        self.device = torch.device(device)
+        self.lock = lock
+        self.depth = depth
+
+        pin = self.device.type == 'cuda'
+        state_shape = tuple(buffer.storage['frame_states'].shape[1:])
+        shapes = {
+            'states': (batch_size, *state_shape),
+            'actions': (batch_size,),
+            'rewards': (batch_size,),
+            'next_states': (batch_size, *state_shape),
+            'dones': (batch_size,),
+            'next_action_masks': (batch_size, buffer.mask_dim),
+            'weights': (batch_size,),
+        }
+        self._host = [
+            {name: torch.empty(shapes[name], dtype=dtype, pin_memory=pin) for name, dtype in _FIELDS.items()}
+            for _ in range(depth)
+        ]
+        self._device = self._host if not pin else [
+            {name: torch.empty(shapes[name], dtype=dtype, device=self.device) for name, dtype in _FIELDS.items()}
+            for _ in range(depth)
+        ]
+        self._indices = [np.zeros(batch_size, dtype=np.int64) for _ in range(depth)]
+
+        self._free: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._ready: "queue.Queue[Tuple[int, Optional[BaseException]]]" = queue.Queue()
+        self._updates: "queue.SimpleQueue[Tuple[np.ndarray, np.ndarray]]" = queue.SimpleQueue()
+        for slot in range(depth):
+            self._free.put(slot)
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='replay-prefetch', daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # 后台线程
+    # ------------------------------------------------------------------
+
+    def _apply_updates(self):
+        while True:
+            try:
+                indices, td_errors = self._updates.get_nowait()
+            except queue.Empty:
+                return
+            self.buffer.update_priorities(indices, td_errors)
+
+    def _run(self):
+        while True:
+            slot = self._free.get()
+            if slot is None:
+                return
+            try:
+                with self.lock:
+                    self._apply_updates()
+                    batch, indices, weights = self.buffer.sample(self.batch_size)
+                # 采样结果均为新数组，填充张量时无需持有锁
+                host = self._host[slot]
+                for name in _FIELDS:
+                    source = weights if name == 'weights' else batch[name]
+                    host[name].copy_(torch.from_numpy(source))
+                self._indices[slot][:] = indices
+                self._ready.put((slot, None))
+            except BaseException as exc:  # 交给学习线程抛出
+                self._ready.put((slot, exc))
+                return
+
+    # ------------------------------------------------------------------
+    # 学习线程接口
+    # ------------------------------------------------------------------
+
+    def get(self) -> Tuple[int, Dict[str, torch.Tensor], np.ndarray]:
+        """
+        取出一个已就绪的批次
+
+        Returns:
+            slot: 槽位编号 (使用完毕后调用 release)
+            tensors: 字段名 -> 张量 (位于训练设备上，复用的存储)
+            indices: 树索引 (用于 update_priorities)
+        """
+        slot, exc = self._ready.get()
+        if exc is not None:
+            raise RuntimeError("经验回放预取线程出错") from exc
+        tensors = self._device[slot]
+        if tensors is not self._host[slot]:
+            for name, tensor in tensors.items():
+                tensor.copy_(self._host[slot][name], non_blocking=True)
+        return slot, tensors, self._indices[slot].copy()
+
+    def release(self, slot: int):
+        """归还槽位，后台线程随即为其准备下一批"""
+        if not self._closed:
+            self._free.put(slot)
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """优先级更新入队，由后台线程在下一次采样前应用"""
+        self._updates.put((indices, td_errors))
+
+    def close(self):
+        """停止后台线程，并应用尚未处理的优先级更新"""
+        if self._closed:
+            return
+        self._closed = True
+        self._free.put(None)
+        self._thread.join()
+        with self.lock:
+            self._apply_updates()
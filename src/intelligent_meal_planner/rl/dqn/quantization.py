@@ -0,0 +1,57 @@
+"""
+CPU 推理优化：动态 int8 量化与线程预算
+
+- quantize_dynamic_int8: 将 DuelingDQN 的全部 Linear 层替换为动态 int8 量化层
+  (权重离线量化，激活在运行时按批次量化)，仅用于 CPU 推理
+- set_inference_threads: 限制本进程 torch 的计算线程数，多个 uvicorn worker
+  共享同一节点时避免线程超额订阅
+"""
+
+import copy
+import os
+from typing import Optional
+
+import torch
+import torch.nn as nn
+
+from .networks import DuelingDQN
+
+
+# 未显式指定时读取的环境变量
+THREADS_ENV = 'RL_INFERENCE_THREADS'
+
+
+def quantize_dynamic_int8(network: DuelingDQN) -> DuelingDQN:
+    """
+    动态 int8 量化 (返回副本，原网络不变)
+
+    量化后的网络仍是 DuelingDQN，forward / get_action_values 用法不变，
+    但只能在 CPU 上运行且不可训练。
+    """
+    network = copy.deepcopy(network).cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(network, {nn.Linear}, dtype=torch.qint8)
+
+
+def set_inference_threads(num_threads: Optional[int] = None) -> int:
+    """
+    设置本进程的 torch 线程预算
+
+    Args:
+        num_threads: 线程数；None 时读取环境变量 RL_INFERENCE_THREADS，
+            两者都未设置则保持 torch 默认值
+
+    Returns:
+        生效的线程数
+    """
+    if num_threads is None and os.getenv(THREADS_ENV):
+        num_threads = int(os.environ[THREADS_ENV])
+    if num_threads is not None:
+        if num_threads < 1:
+            raise ValueError(f"num_threads must be positive, got {num_threads}")
+        torch.set_num_threads(num_threads)
+        try:
+            # 只能在首次并行计算之前设置，之后调用会抛出 RuntimeError
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+    return torch.get_num_threads()
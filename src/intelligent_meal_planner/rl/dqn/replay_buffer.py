@@ -2,34 +2,53 @@
 优先经验回放 (Prioritized Experience Replay)
 
 使用 SumTree 数据结构实现 O(log n) 的优先采样
+- 经验存储在预分配的类型化数组中 (按字段分列)
+- 观察值与动作掩码作为 "帧" 只存一份 (掩码按位压缩)，经验通过帧索引引用
+  state / next_state；上一步的 next_state 即为下一步的 state 时直接复用同一帧
+- 批量采样时整批并行下降 SumTree，批量更新优先级时逐层向上重算父节点
+- 可选 np.memmap 磁盘存储 (容量可超过内存)，支持保存 / 恢复 / 从经验语料预热
 """
 
+import json
+import os
+from pathlib import Path
+
 import numpy as np
-from typing import Tuple, Dict, Any
+from typing import Dict, Optional, Tuple
 
 
 class SumTree:
     """
     SumTree 数据结构，用于高效的优先采样
 
-    叶子节点存储优先级，内部节点存储子节点优先级之和
+    叶子节点存储优先级，内部节点存储子节点优先级之和；
+    叶子 tree_idx 对应的数据槽位为 tree_idx - capacity + 1
     """
 
     def __init__(self, capacity: int):
         self.capacity = capacity
         self.tree = np.zeros(2 * capacity - 1)
-        self.data = np.zeros(capacity, dtype=object)
         self.data_pointer = 0
         self.n_entries = 0
 
-    def add(self, priority: float, data: Any):
-        """添加数据和对应的优先级"""
-        tree_idx = self.data_pointer + self.capacity - 1
-        self.data[self.data_pointer] = data
-        self.update(tree_idx, priority)
+    def add(self, priority: float) -> int:
+        """为下一个数据槽位设置优先级，返回该槽位索引"""
+        data_idx = self.data_pointer
+        self.update(data_idx + self.capacity - 1, priority)
 
         self.data_pointer = (self.data_pointer + 1) % self.capacity
         self.n_entries = min(self.n_entries + 1, self.capacity)
+        return data_idx
+
+    def add_batch(self, priorities: np.ndarray) -> np.ndarray:
+        """为接下来的 len(priorities) 个数据槽位设置优先级，返回槽位索引"""
+        n = len(priorities)
+        data_idx = (self.data_pointer + np.arange(n)) % self.capacity
+        self.update_batch(data_idx + self.capacity - 1, priorities)
+
+        self.data_pointer = int((self.data_pointer + n) % self.capacity)
+        self.n_entries = min(self.n_entries + n, self.capacity)
+        return data_idx
 
     def update(self, tree_idx: int, priority: float):
         """更新优先级"""
@@ -40,26 +59,54 @@ class SumTree:
             tree_idx = (tree_idx - 1) // 2
             self.tree[tree_idx] += change
 
-    def get(self, s: float) -> Tuple[int, float, Any]:
-        """根据累积优先级采样"""
-        parent_idx = 0
+    def update_batch(self, tree_idx: np.ndarray, priorities: np.ndarray):
+        """
+        批量更新优先级
 
-        while True:
-            left_child_idx = 2 * parent_idx + 1
-            right_child_idx = left_child_idx + 1
+        重复的叶子以最后一次写入为准；受影响的父节点逐层由子节点之和重算，
+        叶子深度不同时祖先节点会在其最深后代更新之后再次重算。
+        """
+        tree_idx = np.asarray(tree_idx, dtype=np.int64)
+        priorities = np.broadcast_to(np.asarray(priorities, dtype=np.float64), tree_idx.shape)
+
+        # 去重，保留最后一次出现
+        reversed_idx = tree_idx[::-1]
+        nodes, last = np.unique(reversed_idx, return_index=True)
+        self.tree[nodes] = priorities[::-1][last]
 
-            if left_child_idx >= len(self.tree):
-                leaf_idx = parent_idx
+        while True:
+            nodes = np.unique((nodes[nodes > 0] - 1) // 2)
+            if nodes.size == 0:
                 break
+            self.tree[nodes] = self.tree[2 * nodes + 1] + self.tree[2 * nodes + 2]
 
-            if s <= self.tree[left_child_idx]:
-                parent_idx = left_child_idx
-            else:
-                s -= self.tree[left_child_idx]
-                parent_idx = right_child_idx
+    def get(self, s: float) -> Tuple[int, float, int]:
+        """根据累积优先级采样，返回 (叶子索引, 优先级, 数据槽位)"""
+        leaf_idx = int(self.get_batch(np.array([s], dtype=np.float64))[0])
+        return leaf_idx, self.tree[leaf_idx], leaf_idx - self.capacity + 1
+
+    def get_batch(self, s: np.ndarray) -> np.ndarray:
+        """
+        根据累积优先级批量采样，返回叶子索引
 
-        data_idx = leaf_idx - self.capacity + 1
-        return leaf_idx, self.tree[leaf_idx], self.data[data_idx]
+        与逐个下降完全相同的规则：s <= 左子树之和走左侧，否则减去左子树之和走右侧
+        """
+        s = np.array(s, dtype=np.float64)
+        idx = np.zeros(len(s), dtype=np.int64)
+        n_internal = self.capacity - 1
+
+        while True:
+            active = idx < n_internal
+            if not active.any():
+                break
+            left = 2 * idx[active] + 1
+            left_sum = self.tree[left]
+            s_active = s[active]
+            go_left = s_active <= left_sum
+            idx[active] = np.where(go_left, left, left + 1)
+            s[active] = np.where(go_left, s_active, s_active - left_sum)
+
+        return idx
 
     @property
     def total_priority(self) -> float:
@@ -70,21 +117,40 @@ class PrioritizedReplayBuffer:
     """
     优先经验回放缓冲区
 
+    存储布局 (首次 add 时按状态 / 掩码维度预分配):
+    - 帧: frame_states [F, state_dim] float32, frame_masks [F, ceil(A/8)] uint8 (np.packbits)
+    - 经验: state_frames / next_frames (帧索引), actions, rewards, dones
+
+    每次 add / add_batch 时，若第 i 条经验的 state 与掩码和上一次调用第 i 条经验的
+    next_state 与掩码完全相同 (向量化环境逐步推进时总是如此)，直接复用该帧。
+    帧环形缓冲区容量为 2 * capacity + 4 * frame_slack，复用只发生在两次调用的
+    经验条数都不超过 frame_slack 时，保证仍被引用的帧不会被覆盖。
+
+    指定 storage_dir 时上述数组均为该目录下的 .npy 内存映射文件 (SumTree 仍在内存中，
+    每条经验 16 字节)；save() / load() / warm_start() 用于跨实验复用经验。
+
     Args:
         capacity: 缓冲区容量
         alpha: 优先级指数 (0=均匀采样, 1=完全优先)
         beta_start: 重要性采样初始值
         beta_end: 重要性采样最终值
         beta_steps: beta 退火步数
+        frame_slack: 允许复用帧的单次批量上限 (通常为并行环境数)
+        storage_dir: 内存映射存储目录 (None=存储在内存中)
     """
 
+    META_FILE = 'meta.json'
+    TREE_FILE = 'tree.npy'
+
     def __init__(
         self,
         capacity: int = 100000,
         alpha: float = 0.6,
         beta_start: float = 0.4,
         beta_end: float = 1.0,
-        beta_steps: int = 400000
+        beta_steps: int = 400000,
+        frame_slack: int = 256,
+        storage_dir: Optional[str] = None
     ):
         self.tree = SumTree(capacity)
         self.capacity = capacity
@@ -97,6 +163,70 @@ class PrioritizedReplayBuffer:
         self.epsilon = 1e-6  # 防止优先级为0
         self.max_priority = 1.0
 
+        self.frame_slack = frame_slack
+        self.frame_capacity = 2 * capacity + 4 * frame_slack
+        self.frame_pointer = 0
+        self.storage: Dict[str, np.ndarray] = {}
+        self.mask_dim = 0
+        self.storage_dir = Path(storage_dir) if storage_dir is not None else None
+
+        # 上一次 add 调用写入的 next 帧索引 (用于复用)
+        self._last_next_frames: Optional[np.ndarray] = None
+
+    def _allocate(self, state: np.ndarray, action_mask: np.ndarray):
+        """按首条经验的形状预分配存储"""
+        state_shape = np.shape(state)
+        self.mask_dim = int(np.shape(action_mask)[-1])
+        packed_dim = (self.mask_dim + 7) // 8
+        layout = {
+            'frame_states': ((self.frame_capacity, *state_shape), np.float32),
+            'frame_masks': ((self.frame_capacity, packed_dim), np.uint8),
+            'state_frames': ((self.capacity,), np.int64),
+            'next_frames': ((self.capacity,), np.int64),
+            'actions': ((self.capacity,), np.int64),
+            'rewards': ((self.capacity,), np.float32),
+            'dones': ((self.capacity,), bool),
+        }
+        if self.storage_dir is None:
+            self.storage = {
+                name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in layout.items()
+            }
+        else:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            self.storage = {
+                name: np.lib.format.open_memmap(
+                    self.storage_dir / f'{name}.npy', mode='w+', dtype=dtype, shape=shape
+                )
+                for name, (shape, dtype) in layout.items()
+            }
+
+    def _write_frames(self, states: np.ndarray, packed_masks: np.ndarray) -> np.ndarray:
+        """写入新帧，返回帧索引"""
+        n = len(states)
+        frames = (self.frame_pointer + np.arange(n)) % self.frame_capacity
+        self.storage['frame_states'][frames] = states
+        self.storage['frame_masks'][frames] = packed_masks
+        self.frame_pointer = int((self.frame_pointer + n) % self.frame_capacity)
+        return frames
+
+    def _state_frames(self, states: np.ndarray, packed_masks: np.ndarray) -> np.ndarray:
+        """为 state 分配帧：与上一次调用的 next 帧相同的直接复用，其余写入新帧"""
+        n = len(states)
+        frames = np.empty(n, dtype=np.int64)
+        reuse = np.zeros(n, dtype=bool)
+
+        last = self._last_next_frames
+        if last is not None and len(last) == n and n <= self.frame_slack:
+            reuse = (
+                (self.storage['frame_states'][last] == states).reshape(n, -1).all(axis=1)
+                & (self.storage['frame_masks'][last] == packed_masks).all(axis=1)
+            )
+            frames[reuse] = last[reuse]
+
+        if not reuse.all():
+            frames[~reuse] = self._write_frames(states[~reuse], packed_masks[~reuse])
+        return frames
+
     def add(
         self,
         state: np.ndarray,
@@ -108,9 +238,197 @@ class PrioritizedReplayBuffer:
         next_action_mask: np.ndarray
     ):
         """添加经验"""
-        experience = (state, action, reward, next_state, done, action_mask, next_action_mask)
-        priority = self.max_priority ** self.alpha
-        self.tree.add(priority, experience)
+        self.add_batch(
+            np.asarray(state)[None], np.array([action]), np.array([reward]),
+            np.asarray(next_state)[None], np.array([done]),
+            np.asarray(action_mask)[None], np.asarray(next_action_mask)[None],
+        )
+
+    def add_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+        action_masks: np.ndarray,
+        next_action_masks: np.ndarray
+    ):
+        """批量添加经验 (每个参数第一维为经验条数，等价于按顺序逐条 add)"""
+        n = len(actions)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # 只有最后 capacity 条会保留下来
+            skip = n - self.capacity
+            self.tree.data_pointer = (self.tree.data_pointer + skip) % self.capacity
+            states, actions, rewards, next_states, dones, action_masks, next_action_masks = (
+                x[skip:] for x in (states, actions, rewards, next_states, dones,
+                                   action_masks, next_action_masks)
+            )
+            n = self.capacity
+            self._last_next_frames = None
+        if not self.storage:
+            self._allocate(states[0], action_masks[0])
+
+        states = np.asarray(states, dtype=np.float32)
+        next_states = np.asarray(next_states, dtype=np.float32)
+        packed_masks = np.packbits(np.asarray(action_masks, dtype=bool), axis=1)
+        packed_next_masks = np.packbits(np.asarray(next_action_masks, dtype=bool), axis=1)
+
+        state_frames = self._state_frames(states, packed_masks)
+        next_frames = self._write_frames(next_states, packed_next_masks)
+        self._last_next_frames = next_frames
+
+        idx = self.tree.add_batch(np.full(n, self.max_priority ** self.alpha))
+        storage = self.storage
+        storage['state_frames'][idx] = state_frames
+        storage['next_frames'][idx] = next_frames
+        storage['actions'][idx] = actions
+        storage['rewards'][idx] = rewards
+        storage['dones'][idx] = dones
+
+    def _unpack_masks(self, frames: np.ndarray) -> np.ndarray:
+        packed = self.storage['frame_masks'][frames]
+        return np.unpackbits(packed, axis=1, count=self.mask_dim).view(bool)
+
+    def get_transitions(self, data_idx: np.ndarray) -> Dict[str, np.ndarray]:
+        """按数据槽位取出经验 (掩码批量解压)"""
+        storage = self.storage
+        state_frames = storage['state_frames'][data_idx]
+        next_frames = storage['next_frames'][data_idx]
+        return {
+            'states': storage['frame_states'][state_frames],
+            'actions': storage['actions'][data_idx],
+            'rewards': storage['rewards'][data_idx],
+            'next_states': storage['frame_states'][next_frames],
+            'dones': storage['dones'][data_idx],
+            'action_masks': self._unpack_masks(state_frames),
+            'next_action_masks': self._unpack_masks(next_frames),
+        }
+
+    def chronological_indices(self) -> np.ndarray:
+        """当前保存的经验槽位，按写入先后排列"""
+        n = self.tree.n_entries
+        if n < self.capacity:
+            return np.arange(n)
+        return (self.tree.data_pointer + np.arange(n)) % self.capacity
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """
+        保存缓冲区到目录 (各存储数组为 .npy，另存 SumTree 与元数据)
+
+        以 'r+' / 'w+' 映射到目标文件的数组 (path 即为 storage_dir) 只需刷新内存映射；
+        其他数组 (包括以 'c' / 'r' 从目标目录加载的映射，刷新不会写回文件) 先写入临时文件
+        再替换，避免截断仍被映射的源文件。
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        for name, array in self.storage.items():
+            target = path / f'{name}.npy'
+            if (
+                isinstance(array, np.memmap)
+                and array.mode in ('r+', 'w+')
+                and Path(array.filename).resolve() == target.resolve()
+            ):
+                array.flush()
+            else:
+                tmp = target.with_suffix('.npy.tmp')
+                with open(tmp, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp, target)
+        np.save(path / self.TREE_FILE, self.tree.tree)
+
+        meta = {
+            'capacity': self.capacity,
+            'alpha': self.alpha,
+            'beta_start': self.beta_start,
+            'beta_end': self.beta_end,
+            'beta_steps': self.beta_steps,
+            'frame_slack': self.frame_slack,
+            'current_step': self.current_step,
+            'max_priority': self.max_priority,
+            'frame_pointer': self.frame_pointer,
+            'mask_dim': self.mask_dim,
+            'data_pointer': self.tree.data_pointer,
+            'n_entries': self.tree.n_entries,
+        }
+        with open(path / self.META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r+') -> 'PrioritizedReplayBuffer':
+        """
+        恢复 save() 保存的缓冲区 (容量、优先级与写入位置完全一致)
+
+        Args:
+            path: save() 的目录
+            mmap_mode: 'r+' 直接在原文件上继续写入; 'r' 只读; 'c' 写时复制 (不修改原文件);
+                None 全部读入内存
+        """
+        path = Path(path)
+        with open(path / cls.META_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        buffer = cls(
+            capacity=meta['capacity'],
+            alpha=meta['alpha'],
+            beta_start=meta['beta_start'],
+            beta_end=meta['beta_end'],
+            beta_steps=meta['beta_steps'],
+            frame_slack=meta['frame_slack'],
+            storage_dir=str(path) if mmap_mode == 'r+' else None,
+        )
+        buffer.current_step = meta['current_step']
+        buffer.max_priority = meta['max_priority']
+        buffer.frame_pointer = meta['frame_pointer']
+        buffer.mask_dim = meta['mask_dim']
+        buffer.tree.data_pointer = meta['data_pointer']
+        buffer.tree.n_entries = meta['n_entries']
+        buffer.tree.tree[:] = np.load(path / cls.TREE_FILE)
+
+        if meta['mask_dim']:
+            buffer.storage = {
+                name: np.load(path / f'{name}.npy', mmap_mode=mmap_mode)
+                for name in ('frame_states', 'frame_masks', 'state_frames', 'next_frames',
+                             'actions', 'rewards', 'dones')
+            }
+        return buffer
+
+    def warm_start(self, path: str, max_transitions: Optional[int] = None, chunk_size: int = 8192) -> int:
+        """
+        从 save() 保存的经验语料预热 (只读，不修改语料文件)
+
+        按写入顺序导入最近的 min(max_transitions, capacity) 条经验，
+        导入的经验以当前最大优先级加入 (旧网络的 TD 误差不再适用)。
+
+        Returns:
+            导入的经验条数
+        """
+        source = PrioritizedReplayBuffer.load(path, mmap_mode='r')
+        data_idx = source.chronological_indices()
+        limit = self.capacity if max_transitions is None else min(max_transitions, self.capacity)
+        data_idx = data_idx[len(data_idx) - min(limit, len(data_idx)):]
+
+        for start in range(0, len(data_idx), chunk_size):
+            batch = source.get_transitions(data_idx[start:start + chunk_size])
+            self.add_batch(
+                batch['states'], batch['actions'], batch['rewards'], batch['next_states'],
+                batch['dones'], batch['action_masks'], batch['next_action_masks'],
+            )
+        # 语料的最后一步与之后在线收集的经验并不连续，不复用其帧
+        self._last_next_frames = None
+        return len(data_idx)
+
+    @property
+    def nbytes(self) -> int:
+        """存储占用的字节数 (不含 SumTree)"""
+        return sum(array.nbytes for array in self.storage.values())
 
     def sample(self, batch_size: int) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
         """
@@ -121,38 +439,15 @@ class PrioritizedReplayBuffer:
             indices: 树索引 (用于更新优先级)
             weights: 重要性采样权重
         """
-        batch = {
-            'states': [], 'actions': [], 'rewards': [],
-            'next_states': [], 'dones': [],
-            'action_masks': [], 'next_action_masks': []
-        }
-        indices = np.zeros(batch_size, dtype=np.int32)
-        priorities = np.zeros(batch_size)
-
-        # 分段采样
+        # 分段采样：第 i 个样本落在 [segment * i, segment * (i + 1)) 中
         segment = self.tree.total_priority / batch_size
+        bounds = segment * np.arange(batch_size + 1)
+        s = np.random.uniform(bounds[:-1], bounds[1:])
 
-        for i in range(batch_size):
-            a = segment * i
-            b = segment * (i + 1)
-            s = np.random.uniform(a, b)
-
-            idx, priority, data = self.tree.get(s)
-            indices[i] = idx
-            priorities[i] = priority
-
-            state, action, reward, next_state, done, mask, next_mask = data
-            batch['states'].append(state)
-            batch['actions'].append(action)
-            batch['rewards'].append(reward)
-            batch['next_states'].append(next_state)
-            batch['dones'].append(done)
-            batch['action_masks'].append(mask)
-            batch['next_action_masks'].append(next_mask)
+        indices = self.tree.get_batch(s)
+        priorities = self.tree.tree[indices]
 
-        # 转换为 numpy 数组
-        for key in batch:
-            batch[key] = np.array(batch[key])
+        batch = self.get_transitions(indices - (self.capacity - 1))
 
         # 计算重要性采样权重
         beta = self._get_beta()
@@ -171,9 +466,8 @@ class PrioritizedReplayBuffer:
         """更新优先级"""
         priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
 
-        for idx, priority in zip(indices, priorities):
-            self.tree.update(idx, priority)
-            self.max_priority = max(self.max_priority, priority)
+        self.tree.update_batch(indices, priorities)
+        self.max_priority = max(self.max_priority, float(np.max(priorities)))
 
     def _get_beta(self) -> float:
         """获取当前 beta 值"""
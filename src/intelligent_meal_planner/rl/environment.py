@@ -1,10 +1,13 @@
-import json
+import copy
+
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
-from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+from .catalog import RecipeCatalog
+from .telemetry import EpisodeTelemetry
+
 
 class MealPlanningEnv(gym.Env):
     """
@@ -33,6 +36,8 @@ class MealPlanningEnv(gym.Env):
         price_scale: float = 1.0,
         custom_recipes: Optional[List[Dict]] = None,
         strict_budget: bool = False,
+        catalog: Optional[RecipeCatalog] = None,
+        telemetry: Optional[EpisodeTelemetry] = None,
     ):
         """
         初始化配餐环境
@@ -51,6 +56,8 @@ class MealPlanningEnv(gym.Env):
             training_mode: 是否为训练模式 (开启域随机化)
             price_scale: 菜品价格缩放因子 (1.0=原价)
             custom_recipes: 自定义菜品列表 (已通过验证)
+            catalog: 共享菜品目录 (默认按 recipes_path 加载进程内缓存的目录)
+            telemetry: Episode 遥测缓冲区 (None=不记录奖励分量)
         """
         super().__init__()
         
@@ -61,35 +68,14 @@ class MealPlanningEnv(gym.Env):
         self.default_target_carbs = target_carbs
         self.default_target_fat = target_fat
         
-        # 加载菜品数据库
-        if recipes_path is None:
-            # 默认路径
-            recipes_path = Path(__file__).parent.parent / "data" / "recipes.json"
-        
-        with open(recipes_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self.recipes = data['recipes']
+        # 加载菜品目录 (进程内共享，只解析一次)
+        if catalog is None:
+            catalog = RecipeCatalog.load(recipes_path)
 
-        # 价格缩放：按 price_scale 调整所有菜品价格
+        # 价格缩放 / 合并自定义菜品（已通过 recipe_validator 验证）：生成覆盖层，不修改共享目录
         self.price_scale = price_scale
-        if price_scale != 1.0:
-            for recipe in self.recipes:
-                recipe['price'] = round(recipe['price'] * price_scale, 1)
-
-        # 合并自定义菜品（已通过 recipe_validator 验证）
-        if custom_recipes:
-            base_id = max(r['id'] for r in self.recipes) + 1
-            for i, cr in enumerate(custom_recipes):
-                entry = dict(cr)
-                entry['id'] = base_id + i
-                if isinstance(entry.get('meal_type'), str):
-                    entry['meal_type'] = [entry['meal_type']]
-                if 'tags' not in entry:
-                    entry['tags'] = []
-                if price_scale != 1.0:
-                    entry['price'] = round(entry['price'] * price_scale, 1)
-                self.recipes.append(entry)
-        self.n_real_recipes = len(self.recipes)
+        self.catalog = catalog.overlay(price_scale=price_scale, custom_recipes=custom_recipes)
+        self.n_real_recipes = len(self.catalog)
         
         # 用户目标参数
         self.target_calories = target_calories
@@ -99,6 +85,7 @@ class MealPlanningEnv(gym.Env):
         self.budget_limit = budget_limit
         self.disliked_tags = disliked_tags if disliked_tags else []
         self.strict_budget = strict_budget
+        self.telemetry = telemetry
         
         # 奖励权重
         self.weight_nutrition = weight_nutrition
@@ -132,7 +119,8 @@ class MealPlanningEnv(gym.Env):
         self.global_step = 0  # 由外部trainer设置
         
         # 定义动作空间 (固定 300: 原始150 + 最多150自定义, 未用slot通过mask屏蔽)
-        self.action_space = spaces.Discrete(300)
+        # 目录超过 300 道菜时 (如基准测试的合成目录) 按目录大小扩展
+        self.action_space = spaces.Discrete(max(300, self.n_real_recipes))
         
         # 初始化状态
         self.current_step_idx = 0
@@ -141,9 +129,34 @@ class MealPlanningEnv(gym.Env):
         self.total_carbs = 0.0
         self.total_fat = 0.0
         self.total_cost = 0.0
-        self.selected_recipes = []
+        self.selected_actions = []
         self.selected_categories = []
         self.selected_recipe_indices = set()  # 记录已选菜品索引，防止重复
+        self._selected_mask = np.zeros(self.action_space.n, dtype=bool)  # 同上，供向量化掩码使用
+
+    @property
+    def recipes(self):
+        """菜品字典列表 (只读，来自共享目录)"""
+        return self.catalog.recipes
+
+    @property
+    def selected_recipes(self) -> List[Dict]:
+        """已选菜品字典 (按选择顺序)"""
+        recipes = self.catalog.recipes
+        return [recipes[i] for i in self.selected_actions]
+
+    def clone(self) -> "MealPlanningEnv":
+        """
+        复制当前 episode 状态 (用于束搜索等分支展开)
+
+        目录、目标与权重等只读配置与原环境共享，只复制累计量和已选菜品等可变状态。
+        """
+        env = copy.copy(self)
+        env.selected_actions = list(self.selected_actions)
+        env.selected_categories = list(self.selected_categories)
+        env.selected_recipe_indices = set(self.selected_recipe_indices)
+        env._selected_mask = self._selected_mask.copy()
+        return env
     
     def reset(self, seed=None, options=None):
         """
@@ -239,9 +252,10 @@ class MealPlanningEnv(gym.Env):
         self.total_carbs = 0.0
         self.total_fat = 0.0
         self.total_cost = 0.0
-        self.selected_recipes = []
+        self.selected_actions = []
         self.selected_categories = []
         self.selected_recipe_indices = set()  # 记录已选菜品的索引，用于防止重复
+        self._selected_mask[:] = False
 
         # 可行性检查：防止生成完全无解的低预算场景
         if self.training_mode:
@@ -282,31 +296,35 @@ class MealPlanningEnv(gym.Env):
         action = int(action)
 
         # 获取选中的菜品
-        recipe = self.recipes[action]
+        catalog = self.catalog
+        recipe_name = catalog.names[action]
 
         # 检查菜品是否适合当前餐次
         current_meal_type = self._get_current_meal_type()
+        meal_idx = self.current_step_idx // self.items_per_meal
 
         # [修复] 动作屏蔽应该已经阻止了错误餐次选择
         # 如果仍然发生，说明action_masks有bug，给极大惩罚并提前终止
-        if current_meal_type not in recipe['meal_type']:
-            print(f"[ERROR] Action masking failed! Selected {recipe['name']} for {current_meal_type}")
+        if meal_idx >= self.num_meals_per_day or not catalog.meal_masks[meal_idx, action]:
+            print(f"[ERROR] Action masking failed! Selected {recipe_name} for {current_meal_type}")
             return self._get_observation(), -100.0, True, False, {
                 'error': 'Invalid meal type selection',
-                'selected_recipe': recipe['name']
+                'selected_recipe': recipe_name
             }
 
         # 更新累计营养和花费
-        self.total_calories += recipe['calories']
-        self.total_protein += recipe['protein']
-        self.total_carbs += recipe['carbs']
-        self.total_fat += recipe['fat']
-        self.total_cost += recipe['price']
+        calories, protein, carbs, fat, price = catalog.features_f64[action].tolist()
+        self.total_calories += calories
+        self.total_protein += protein
+        self.total_carbs += carbs
+        self.total_fat += fat
+        self.total_cost += price
 
         # 记录选择的菜品
-        self.selected_recipes.append(recipe)
-        self.selected_categories.append(recipe['category'])
+        self.selected_actions.append(action)
+        self.selected_categories.append(catalog.category_of(action))
         self.selected_recipe_indices.add(action)  # 记录已选菜品索引
+        self._selected_mask[action] = True
 
         # 移动到下一步
         self.current_step_idx += 1
@@ -325,7 +343,7 @@ class MealPlanningEnv(gym.Env):
 
         observation = self._get_observation()
         info = {
-            'selected_recipe': recipe['name'],
+            'selected_recipe': recipe_name,
             'valid_action': True,
             'total_cost': self.total_cost,
             'total_calories': self.total_calories,
@@ -403,7 +421,7 @@ class MealPlanningEnv(gym.Env):
             float(current_meal == 'breakfast'),                                  # [9] 当前是否早餐
             float(current_meal == 'lunch'),                                      # [10] 当前是否午餐
             float(current_meal == 'dinner'),                                     # [11] 当前是否晚餐
-            len(set(self.selected_categories)) / max(1, len(self.selected_recipes)),  # [12] 多样性指标
+            len(set(self.selected_categories)) / max(1, len(self.selected_actions)),  # [12] 多样性指标
         ], dtype=np.float32)
 
         # 截断到 [-2.0, 2.0] 范围内，防止极值影响
@@ -503,10 +521,9 @@ class MealPlanningEnv(gym.Env):
         # ========== 4. 忌口惩罚 ==========
         dislike_penalty = 0.0
         if self.disliked_tags:
-            for recipe in self.selected_recipes:
-                recipe_tags = set(recipe.get('tags', []))
-                disliked = recipe_tags.intersection(set(self.disliked_tags))
-                if disliked:
+            disliked = self.catalog.has_any_tag(self.disliked_tags)
+            for action in self.selected_actions:
+                if disliked[action]:
                     dislike_penalty -= 8.0  # 每触犯一个忌口扣8分
 
         # ========== 综合奖励 ==========
@@ -517,10 +534,13 @@ class MealPlanningEnv(gym.Env):
             dislike_penalty
         )
 
-        # Debug输出 (训练时可见)
-        cal_error = abs(self.total_calories - self.target_calories) / self.target_calories * 100
-        print(f"[FINAL] R={total_reward:6.2f} | Nutri={nutrition_reward:5.1f} (CalErr:{cal_error:4.1f}%) | "
-              f"Budg={budget_reward:4.1f} ({budget_ratio*100:.0f}%) | Var={variety_reward:3.1f} ({unique_categories}cat)")
+        # 奖励分量遥测 (未启用时不做额外计算)
+        if self.telemetry is not None:
+            cal_error = abs(self.total_calories - self.target_calories) / self.target_calories * 100
+            self.telemetry.record(
+                total_reward, nutrition_reward, budget_reward, variety_reward,
+                dislike_penalty, cal_error, budget_ratio, unique_categories,
+            )
 
         return total_reward
     
@@ -545,15 +565,9 @@ class MealPlanningEnv(gym.Env):
         """
         if self.current_step_idx >= self.max_steps:
             return []
-        
-        current_meal_type = self._get_current_meal_type()
-        valid_actions = []
-        
-        for i, recipe in enumerate(self.recipes):
-            if current_meal_type in recipe['meal_type']:
-                valid_actions.append(i)
-        
-        return valid_actions
+
+        meal_idx = self.current_step_idx // self.items_per_meal
+        return self.catalog.meal_indices[meal_idx].tolist()
 
     def action_masks(self) -> np.ndarray:
         """
@@ -561,67 +575,51 @@ class MealPlanningEnv(gym.Env):
         1. 必须符合当前餐次 (早餐只能选早餐菜)
         2. 必须买得起 (当前价格 <= 剩余预算 + 缓冲)
         3. [新增] 不能选择已经选过的菜品 (防止重复，增加多样性)
+
+        在整个目录上做连续的布尔数组运算 (餐次掩码 & 价格比较 & 未选过)，
+        代价随目录规模线性增长但常数很小，见 scripts/benchmark_action_masks.py；
+        防死锁兜底直接从按价格排序的索引中取最便宜的菜品。
         """
         mask = np.zeros(self.action_space.n, dtype=bool)
 
         if self.current_step_idx >= self.max_steps:
             return mask
 
-        current_meal_type = self._get_current_meal_type()
+        catalog = self.catalog
+        meal_idx = self.current_step_idx // self.items_per_meal
 
         # 计算剩余预算，并给予一定的浮动 (例如允许超支 10% 用于最后微调)
         remaining_budget = self.budget_limit - self.total_cost
         budget_buffer = 0.0 if self.strict_budget else self.budget_limit * 0.10
         max_affordable_price = remaining_budget + budget_buffer
 
-        possible_indices = []
-
-        for i, recipe in enumerate(self.recipes):
-            # 条件1: 餐次必须对
-            if current_meal_type not in recipe['meal_type']:
-                continue
-
-            # 条件2: 不能选已经选过的菜 (核心改动：防止重复)
-            if i in self.selected_recipe_indices:
-                continue
-
-            # 条件3: 价格必须在预算范围内
-            if recipe['price'] <= max_affordable_price:
-                mask[i] = True
-                possible_indices.append(i)
+        # 条件1: 价格必须在预算范围内; 条件2: 餐次必须对; 条件3: 不能选已经选过的菜
+        allowed = mask[:self.n_real_recipes]
+        np.less_equal(catalog.price_f64, max_affordable_price, out=allowed)
+        allowed &= catalog.meal_masks[meal_idx]
+        allowed &= ~self._selected_mask[:self.n_real_recipes]
 
         # 防死锁兜底逻辑
-        if self.strict_budget:
+        if self.strict_budget or allowed.any():
             return mask
 
-        if not possible_indices:
-            # 情况1: 预算不够但还有未选的菜 -> 选最便宜的未选过的菜
-            valid_meal_indices = [
-                i for i, r in enumerate(self.recipes)
-                if current_meal_type in r['meal_type'] and i not in self.selected_recipe_indices
-            ]
-
-            if valid_meal_indices:
-                min_price = min(self.recipes[i]['price'] for i in valid_meal_indices)
-                for i in valid_meal_indices:
-                    if self.recipes[i]['price'] == min_price:
-                        mask[i] = True
-                        possible_indices.append(i)
+        by_price = catalog.meal_indices_by_price[meal_idx]
+        sorted_prices = catalog.meal_sorted_prices[meal_idx]
+        if by_price.size == 0:
+            # 极端情况：当前餐次没有任何菜品，开放所有实际菜品
+            mask[:self.n_real_recipes] = True
+            return mask
 
+        unselected = ~self._selected_mask[by_price]
+        if unselected.any():
+            # 情况1: 预算不够但还有未选的菜 -> 选最便宜的未选过的菜
+            start = int(np.argmax(unselected))
+        else:
             # 情况2: 所有符合餐次的菜都选过了 -> 允许重复选择 (极端情况兜底)
-            if not possible_indices:
-                valid_meal_indices = [
-                    i for i, r in enumerate(self.recipes)
-                    if current_meal_type in r['meal_type']
-                ]
-                if valid_meal_indices:
-                    min_price = min(self.recipes[i]['price'] for i in valid_meal_indices)
-                    for i in valid_meal_indices:
-                        if self.recipes[i]['price'] == min_price:
-                            mask[i] = True
-
-            # 极端情况：如果还是没有可选的，开放所有实际菜品
-            if not np.any(mask):
-                mask[:self.n_real_recipes] = True
+            start = 0
+            unselected[:] = True
+
+        end = int(np.searchsorted(sorted_prices, sorted_prices[start], side='right'))
+        mask[by_price[start:end][unselected[start:end]]] = True
 
         return mask
@@ -0,0 +1,207 @@
+"""
+分支定界精确配餐求解器
+
+在 MealPlanningEnv 的动作约束下 (餐次、不重复、预算) 搜索终局奖励最优的一日方案。
+每餐 2 道菜，候选按餐次预先展开为菜品对 (早餐 ~190 对，午/晚餐各 ~9000 对)：
+
+1. 早餐对按上界排序逐个展开；
+2. 对每个早餐对，向量化计算所有午餐对的上界并按上界降序展开；
+3. 晚餐对直接用批量终局奖励整体评估，取最大值更新当前最优。
+
+上界对每个营养素取剩余餐次可达区间内的最高分，预算取最低剩余花费，
+多样性假设剩余每道菜都是新类别；上界不超过当前最优时剪枝。
+展开的节点数达到上限时返回当前最优解并标记 optimal=False；节点上限只取决于输入，
+同一请求总是得到同一结果。可选的时间上限只作为异常情况下的保护。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from .plan_reward import (
+    DISLIKE_PENALTY,
+    NUTRIENT_SCORING,
+    PlanRewardModel,
+    budget_scores,
+    nutrient_scores,
+    plan_budget_cap,
+    popcount,
+    variety_scores,
+)
+
+_EPS = 1e-9
+
+
+@dataclass
+class ExactPlanResult:
+    """精确求解结果"""
+
+    actions: List[int]    # 按步骤顺序的菜品索引 (早餐 2 道、午餐 2 道、晚餐 2 道)
+    reward: float         # 终局奖励 (与 env 回放一致)
+    optimal: bool         # 搜索是否在节点/时间上限内完成 (即已证明最优)
+    nodes: int            # 展开的 (早餐, 午餐) 节点数
+    elapsed_ms: float
+
+
+class _MealPairs:
+    """某一餐次的全部候选菜品对及其累计特征"""
+
+    def __init__(self, reward_model: PlanRewardModel, indices: np.ndarray):
+        first, second = np.triu_indices(len(indices), k=1)
+        self.a = indices[first]
+        self.b = indices[second]
+        features = reward_model.features
+        self.totals = features[self.a] + features[self.b]
+        self.bits = reward_model.category_bits[self.a] | reward_model.category_bits[self.b]
+        self.disliked = reward_model.disliked[self.a] + reward_model.disliked[self.b]
+        if len(self.a):
+            self.low = self.totals.min(axis=0)
+            self.high = self.totals.max(axis=0)
+        else:
+            self.low = self.high = np.full(5, np.inf)
+
+    def __len__(self) -> int:
+        return len(self.a)
+
+
+def _upper_bounds(
+    model: PlanRewardModel,
+    totals: np.ndarray,
+    bits: np.ndarray,
+    disliked: np.ndarray,
+    rest_low: np.ndarray,
+    rest_high: np.ndarray,
+    remaining_items: int,
+    n_categories: int,
+) -> np.ndarray:
+    """部分方案 [N] 在剩余餐次任意补全下的终局奖励上界"""
+    nutrition = np.zeros(len(totals), dtype=np.float64)
+    for k, (max_bonus, tolerance) in enumerate(NUTRIENT_SCORING):
+        # 分段线性评分在目标处取峰值，区间内的最高分在目标的投影点取得
+        best = np.clip(model.targets[k], totals[:, k] + rest_low[k], totals[:, k] + rest_high[k])
+        nutrition += nutrient_scores(best, model.targets[k], max_bonus, tolerance)
+    budget = budget_scores(totals[:, 4] + rest_low[4], model.budget_limit)
+    categories = np.minimum(popcount(bits) + remaining_items, n_categories)
+    return (
+        model.weight_nutrition * nutrition
+        + model.weight_budget * budget
+        + model.weight_variety * variety_scores(categories)
+        - DISLIKE_PENALTY * disliked
+    )
+
+
+def _order(bounds: np.ndarray, totals: np.ndarray, targets: np.ndarray, progress: float) -> np.ndarray:
+    """上界降序；同上界时优先营养进度最接近理想进度的部分方案"""
+    deviation = np.abs(totals[:, :4] / targets - progress).sum(axis=1)
+    return np.lexsort((deviation, -bounds))
+
+
+def solve_exact(
+    env,
+    time_limit_ms: Optional[float] = None,
+    incumbent_reward: float = -np.inf,
+    max_nodes: Optional[int] = None,
+) -> Optional[ExactPlanResult]:
+    """
+    求解 env 当前目标下终局奖励最优的方案
+
+    Args:
+        env: MealPlanningEnv (3 餐 x 2 道；读取目标、预算、忌口与 strict_budget)
+        time_limit_ms: 时间保护上限 (毫秒)，None 表示不限；超时返回当前最优。
+            应远高于正常耗时，否则结果会随机器负载变化
+        incumbent_reward: 已知可行方案的奖励 (如 DQN 方案)，只搜索严格更优的方案
+        max_nodes: 展开的 (早餐, 午餐) 节点数上限 (正常的停止条件)，None 表示不限
+
+    Returns:
+        ExactPlanResult；找不到优于 incumbent_reward 的可行方案时返回 None
+        (达到上限前未找到，或在 optimal 意义下证明不存在)
+    """
+    if env.items_per_meal != 2 or env.num_meals_per_day != 3:
+        raise ValueError("精确求解器只支持 3 餐 x 2 道菜的方案结构")
+
+    start = time.perf_counter()
+    deadline = None if time_limit_ms is None else start + time_limit_ms / 1000.0
+    model = PlanRewardModel(env)
+    catalog = env.catalog
+    budget_cap = plan_budget_cap(env) + _EPS
+    n_categories = len(catalog.categories)
+
+    meals = []
+    for m in range(3):
+        indices = catalog.meal_indices[m]
+        meals.append(_MealPairs(model, indices[catalog.meal_prices[m] <= budget_cap]))
+    breakfast, lunch, dinner = meals
+
+    best_reward = incumbent_reward
+    best_actions: Optional[List[int]] = None
+    max_reward = model.max_reward
+    nodes = 0
+    complete = True
+
+    if min(len(meal) for meal in meals) == 0:
+        return None
+
+    rest_low = lunch.low + dinner.low
+    rest_high = lunch.high + dinner.high
+    bounds_b = _upper_bounds(
+        model, breakfast.totals, breakfast.bits, breakfast.disliked,
+        rest_low, rest_high, 4, n_categories,
+    )
+    bounds_b[breakfast.totals[:, 4] + rest_low[4] > budget_cap] = -np.inf
+    used = np.zeros(len(catalog), dtype=bool)
+
+    for bi in _order(bounds_b, breakfast.totals, model.targets, 1.0 / 3.0):
+        if bounds_b[bi] <= best_reward + _EPS or best_reward >= max_reward - _EPS:
+            break
+        ba, bb = breakfast.a[bi], breakfast.b[bi]
+        lunch_ok = (lunch.a != ba) & (lunch.a != bb) & (lunch.b != ba) & (lunch.b != bb)
+        totals_l = breakfast.totals[bi] + lunch.totals
+        bits_l = breakfast.bits[bi] | lunch.bits
+        disliked_l = breakfast.disliked[bi] + lunch.disliked
+        bounds_l = _upper_bounds(
+            model, totals_l, bits_l, disliked_l, dinner.low, dinner.high, 2, n_categories,
+        )
+        bounds_l[~lunch_ok | (totals_l[:, 4] + dinner.low[4] > budget_cap)] = -np.inf
+
+        for li in _order(bounds_l, totals_l, model.targets, 2.0 / 3.0):
+            if bounds_l[li] <= best_reward + _EPS:
+                break
+            if (max_nodes is not None and nodes >= max_nodes) or (
+                deadline is not None and time.perf_counter() > deadline
+            ):
+                complete = False
+                break
+            nodes += 1
+
+            used[[ba, bb, lunch.a[li], lunch.b[li]]] = True
+            dinner_ok = ~used[dinner.a] & ~used[dinner.b]
+            used[[ba, bb, lunch.a[li], lunch.b[li]]] = False
+
+            totals = totals_l[li] + dinner.totals
+            rewards = model.rewards(
+                totals, popcount(bits_l[li] | dinner.bits), disliked_l[li] + dinner.disliked
+            )
+            rewards[~dinner_ok | (totals[:, 4] > budget_cap)] = -np.inf
+            di = int(np.argmax(rewards))
+            if rewards[di] > best_reward + _EPS:
+                best_reward = float(rewards[di])
+                best_actions = [
+                    int(ba), int(bb), int(lunch.a[li]), int(lunch.b[li]),
+                    int(dinner.a[di]), int(dinner.b[di]),
+                ]
+                if best_reward >= max_reward - _EPS:
+                    break
+        if not complete:
+            break
+
+    if best_actions is None:
+        return None
+    return ExactPlanResult(
+        actions=best_actions,
+        reward=best_reward,
+        optimal=complete,
+        nodes=nodes,
+        elapsed_ms=(time.perf_counter() - start) * 1000.0,
+    )
@@ -0,0 +1,114 @@
+"""
+局部搜索方案精修
+
+在完整方案上做最陡上升的单菜替换：每一轮用批量终局奖励一次评估所有合法的
+单道菜替换 (同餐次、不与方案内菜品重复、总价不超出预算)，应用提升最大的一个，
+直到没有改进的替换 (局部最优) 或达到替换次数上限。两者都只取决于输入，
+同一请求总是得到同一方案；可选的时间上限只作为异常情况下的保护。
+
+用于 DQN 贪心 rollout 之后的后处理：贪心方案常在卡路里上差几个百分点，
+或预算没有用足，一两次替换即可补上。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .plan_reward import PlanRewardModel, plan_budget_cap, popcount
+
+_EPS = 1e-9
+
+
+@dataclass
+class RefineResult:
+    """精修结果"""
+
+    actions: List[int]      # 按步骤顺序的菜品索引 (替换不改变餐次位置)
+    reward: float           # 精修后的终局奖励
+    initial_reward: float   # 精修前的终局奖励
+    swaps: int              # 应用的替换次数
+    converged: bool         # 是否到达局部最优 (否则为达到替换上限/触发时间保护)
+    elapsed_ms: float
+
+    @property
+    def reward_gain(self) -> float:
+        return self.reward - self.initial_reward
+
+
+def refine_plan(
+    env,
+    actions: Sequence[int],
+    time_limit_ms: Optional[float] = None,
+    max_swaps: int = 50,
+) -> RefineResult:
+    """
+    对 env 当前目标下的完整方案做单菜替换局部搜索
+
+    Args:
+        env: MealPlanningEnv (读取目标、预算、忌口与 strict_budget)
+        actions: 完整方案，按步骤顺序的 max_steps 个菜品索引
+        time_limit_ms: 时间保护上限 (毫秒)，None 表示不限；应远高于正常耗时，
+            否则结果会随机器负载变化
+        max_swaps: 替换次数上限 (正常的停止条件)
+
+    Returns:
+        RefineResult；奖励不会低于原方案
+    """
+    if len(actions) != env.max_steps:
+        raise ValueError(f"方案需要 {env.max_steps} 道菜，实际 {len(actions)} 道")
+
+    start = time.perf_counter()
+    deadline = None if time_limit_ms is None else start + time_limit_ms / 1000.0
+    model = PlanRewardModel(env)
+    catalog = env.catalog
+    budget_cap = plan_budget_cap(env) + _EPS
+
+    plan = np.asarray(actions, dtype=np.int64).copy()
+    # 所有 (槽位, 候选菜品) 组合，槽位只能换成同餐次的菜
+    per_slot = [catalog.meal_indices[slot // env.items_per_meal] for slot in range(len(plan))]
+    slot_of = np.repeat(np.arange(len(plan)), [len(c) for c in per_slot])
+    candidates = np.concatenate(per_slot).astype(np.int64)
+    candidate_features = model.features[candidates]
+    candidate_bits = model.category_bits[candidates]
+    candidate_disliked = model.disliked[candidates]
+
+    initial_reward = reward = float(model.plan_rewards(plan)[0])
+    swaps = 0
+    converged = False
+    while swaps < max_swaps:
+        plan_features = model.features[plan]
+        plan_bits = model.category_bits[plan]
+        plan_disliked = model.disliked[plan]
+        # 去掉槽位 s 后其余菜品的类别位掩码
+        others_bits = np.array([
+            np.bitwise_or.reduce(np.delete(plan_bits, slot)) for slot in range(len(plan))
+        ])
+
+        totals = plan_features.sum(axis=0) - plan_features[slot_of] + candidate_features
+        rewards = model.rewards(
+            totals,
+            popcount(others_bits[slot_of] | candidate_bits),
+            plan_disliked.sum() - plan_disliked[slot_of] + candidate_disliked,
+        )
+        rewards[np.isin(candidates, plan) | (totals[:, 4] > budget_cap)] = -np.inf
+
+        best = int(np.argmax(rewards))
+        if rewards[best] <= reward + _EPS:
+            converged = True
+            break
+        plan[slot_of[best]] = candidates[best]
+        reward = float(rewards[best])
+        swaps += 1
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+    return RefineResult(
+        actions=[int(action) for action in plan],
+        reward=reward,
+        initial_reward=initial_reward,
+        swaps=swaps,
+        converged=converged,
+        elapsed_ms=(time.perf_counter() - start) * 1000.0,
+    )
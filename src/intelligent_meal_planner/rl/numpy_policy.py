@@ -0,0 +1,299 @@
+"""
+纯 NumPy 的 Dueling DQN 推理引擎
+
+部署时只需要 online 网络的权重和五次小矩阵乘法：从 .pt 检查点导出
+仅供推理的 .policy 文件，由 NumpyDuelingPolicy 以内存映射方式加载并执行
+带掩码的贪心推理，结果与 DuelingDQN.get_action_values 一致。推理进程无需
+导入 torch，也无需构建优化器和经验回放缓冲区。
+
+.policy 文件格式 (单文件，小端):
+    MAGIC (8 字节) | 头部长度 (uint32) | JSON 头部 | 填充至 64 字节对齐 | float32 权重
+JSON 头部记录网络结构、训练所用菜品目录的版本以及每个张量的偏移与形状。
+权重按 [in, out] 方向存放，加载时直接在内存映射上切片，不做任何拷贝。
+
+导出 (需要 torch):
+    export_numpy_policy("models/dqn_meal_best.pt")  # -> models/dqn_meal_best.policy
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .catalog import RecipeCatalog
+
+
+MAGIC = b'IMPDQN\x00\x01'
+FORMAT_VERSION = 1
+POLICY_SUFFIX = '.policy'
+_ALIGN = 64
+
+# DuelingDQN 中的线性层 (state_dict 前缀)，按计算顺序排列
+LAYERS = (
+    'feature.0',
+    'feature.2',
+    'value_stream.0',
+    'value_stream.2',
+    'advantage_stream.0',
+    'advantage_stream.2',
+)
+
+
+class NumpyDuelingPolicy:
+    """
+    Dueling DQN 的 NumPy 推理实现 (仅确定性贪心)
+
+    Args:
+        layers: 层名 -> (权重 [in, out], 偏置 [out])，float32
+        train_step: 导出时的训练步数 (仅作记录)
+        catalog_version: 训练所用菜品目录的版本 (None 表示未记录)
+    """
+
+    def __init__(
+        self,
+        layers: Mapping[str, Tuple[np.ndarray, np.ndarray]],
+        train_step: int = 0,
+        catalog_version: Optional[str] = None
+    ):
+        self.layers = {name: layers[name] for name in LAYERS}
+        self.train_step = train_step
+        self.catalog_version = catalog_version
+
+        self.state_dim = self.layers['feature.0'][0].shape[0]
+        self.action_dim = self.layers['advantage_stream.2'][0].shape[1]
+        self.hidden_dims: List[int] = [
+            self.layers['feature.0'][0].shape[1],
+            self.layers['feature.2'][0].shape[1],
+            self.layers['value_stream.0'][0].shape[1],
+        ]
+
+    @classmethod
+    def from_state_dict(
+        cls,
+        state_dict: Mapping[str, np.ndarray],
+        train_step: int = 0,
+        catalog_version: Optional[str] = None
+    ) -> 'NumpyDuelingPolicy':
+        """从 DuelingDQN.state_dict() 构建 (NumPy 数组或 CPU 张量均可)"""
+        layers = {}
+        for name in LAYERS:
+            weight = np.asarray(state_dict[f'{name}.weight'], dtype=np.float32)
+            bias = np.asarray(state_dict[f'{name}.bias'], dtype=np.float32)
+            layers[name] = (np.ascontiguousarray(weight.T), bias.copy())
+        return cls(layers, train_step=train_step, catalog_version=catalog_version)
+
+    # ------------------------------------------------------------------
+    # 推理
+    # ------------------------------------------------------------------
+
+    def _linear(self, x: np.ndarray, name: str) -> np.ndarray:
+        weight, bias = self.layers[name]
+        return x @ weight + bias
+
+    def forward(self, states: np.ndarray) -> np.ndarray:
+        """
+        计算 Q 值
+
+        Args:
+            states: 状态 [state_dim] 或 [batch, state_dim]
+
+        Returns:
+            Q 值 [batch, action_dim]
+        """
+        x = np.atleast_2d(np.asarray(states, dtype=np.float32))
+        features = np.maximum(self._linear(x, 'feature.0'), 0)
+        features = np.maximum(self._linear(features, 'feature.2'), 0)
+
+        value = self._linear(np.maximum(self._linear(features, 'value_stream.0'), 0), 'value_stream.2')
+        advantage = self._linear(
+            np.maximum(self._linear(features, 'advantage_stream.0'), 0), 'advantage_stream.2'
+        )
+        return value + (advantage - advantage.mean(axis=1, keepdims=True))
+
+    def get_action_values(
+        self,
+        states: np.ndarray,
+        action_masks: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """获取 Q 值，无效动作 (掩码为 False) 的 Q 值为 -inf"""
+        q_values = self.forward(states)
+        if action_masks is not None:
+            masks = np.atleast_2d(np.asarray(action_masks, dtype=bool))
+            q_values[~masks] = -np.inf
+        return q_values
+
+    def select_actions(
+        self,
+        states: np.ndarray,
+        action_masks: np.ndarray,
+        step: int = 0,
+        deterministic: bool = True
+    ) -> np.ndarray:
+        """
+        批量贪心选择动作 [batch] (int64)；没有有效动作的行回退为 0
+
+        签名与 MaskableDQNAgent.select_actions 兼容，step / deterministic 参数被忽略。
+        """
+        return self.get_action_values(states, action_masks).argmax(axis=1).astype(np.int64)
+
+    def select_action(
+        self,
+        state: np.ndarray,
+        action_mask: np.ndarray,
+        step: int = 0,
+        deterministic: bool = True
+    ) -> int:
+        """
+        单个状态的贪心动作 (签名与 MaskableDQNAgent.select_action 兼容)
+
+        推理引擎不做探索，step / deterministic 参数被忽略。
+        """
+        if not np.any(action_mask):
+            return 0  # 安全回退
+        return int(self.select_actions(state, action_mask)[0])
+
+    # ------------------------------------------------------------------
+    # 校验
+    # ------------------------------------------------------------------
+
+    def check_catalog(self, catalog: RecipeCatalog):
+        """
+        校验模型与菜品目录是否匹配
+
+        动作索引即菜品索引：目录内容变化 (版本不同) 或菜品数超过动作维度时，
+        模型选出的动作不再对应训练时的菜品，直接拒绝加载。
+        价格/自定义菜品叠加层不改变已有菜品的索引，只比较基础目录版本。
+        """
+        if len(catalog) > self.action_dim:
+            raise ValueError(
+                f"模型动作维度 {self.action_dim} 小于菜品目录大小 {len(catalog)}"
+            )
+        base_version = catalog.version.split('+', 1)[0]
+        if self.catalog_version and base_version and self.catalog_version != base_version:
+            raise ValueError(
+                f"模型训练所用的菜品目录版本 {self.catalog_version} "
+                f"与当前目录 {base_version} 不一致，请重新训练或导出"
+            )
+
+    # ------------------------------------------------------------------
+    # 序列化
+    # ------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]):
+        """保存为 .policy 文件"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tensors: Dict[str, np.ndarray] = {}
+        for name, (weight, bias) in self.layers.items():
+            tensors[f'{name}.weight'] = np.ascontiguousarray(weight, dtype=np.float32)
+            tensors[f'{name}.bias'] = np.ascontiguousarray(bias, dtype=np.float32)
+
+        offset = 0
+        index = {}
+        for name, array in tensors.items():
+            index[name] = {'offset': offset, 'shape': list(array.shape)}
+            offset += array.size
+
+        header = json.dumps({
+            'format_version': FORMAT_VERSION,
+            'state_dim': self.state_dim,
+            'action_dim': self.action_dim,
+            'hidden_dims': self.hidden_dims,
+            'train_step': self.train_step,
+            'catalog_version': self.catalog_version,
+            'tensors': index,
+        }).encode('utf-8')
+        prefix = len(MAGIC) + 4 + len(header)
+        padding = -prefix % _ALIGN
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(b'\x00' * padding)
+            for array in tensors.values():
+                f.write(array.astype('<f4', copy=False).tobytes())
+
+    @staticmethod
+    def read_header(path: Union[str, Path]) -> Tuple[Dict, int]:
+        """读取 JSON 头部，返回 (头部, 权重数据起始偏移)"""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是推理模型文件: {path}")
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length).decode('utf-8'))
+        if header.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"不支持的推理模型格式版本: {header.get('format_version')}")
+        prefix = len(MAGIC) + 4 + length
+        return header, prefix + (-prefix % _ALIGN)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        catalog: Optional[RecipeCatalog] = None,
+        mmap: bool = True
+    ) -> 'NumpyDuelingPolicy':
+        """
+        加载 .policy 文件
+
+        Args:
+            path: 文件路径
+            catalog: 提供时校验目录版本与动作维度 (见 check_catalog)
+            mmap: 以只读内存映射方式加载权重 (否则读入内存)
+        """
+        header, data_offset = cls.read_header(path)
+        total = sum(int(np.prod(t['shape'])) for t in header['tensors'].values())
+        if mmap:
+            data = np.memmap(path, dtype='<f4', mode='r', offset=data_offset, shape=(total,))
+        else:
+            with open(path, 'rb') as f:
+                f.seek(data_offset)
+                data = np.fromfile(f, dtype='<f4', count=total)
+
+        def tensor(name: str) -> np.ndarray:
+            spec = header['tensors'][name]
+            size = int(np.prod(spec['shape']))
+            return data[spec['offset']:spec['offset'] + size].reshape(spec['shape'])
+
+        layers = {name: (tensor(f'{name}.weight'), tensor(f'{name}.bias')) for name in LAYERS}
+        policy = cls(layers, train_step=header['train_step'], catalog_version=header['catalog_version'])
+        if policy.action_dim != header['action_dim'] or policy.state_dim != header['state_dim']:
+            raise ValueError(f"推理模型头部与权重形状不一致: {path}")
+        if catalog is not None:
+            policy.check_catalog(catalog)
+        return policy
+
+
+def export_numpy_policy(
+    checkpoint_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    catalog_version: Optional[str] = None
+) -> Path:
+    """
+    从 MaskableDQNAgent.save 的检查点导出推理模型
+
+    Args:
+        checkpoint_path: .pt 检查点
+        output_path: 输出路径，默认与检查点同名的 .policy
+        catalog_version: 训练所用菜品目录的版本 (默认取检查点中记录的版本)
+
+    Returns:
+        输出文件路径
+    """
+    import torch
+
+    checkpoint_path = Path(checkpoint_path)
+    output_path = Path(output_path) if output_path else checkpoint_path.with_suffix(POLICY_SUFFIX)
+
+    checkpoint = torch.load(checkpoint_path, map_location='cpu')
+    policy = NumpyDuelingPolicy.from_state_dict(
+        {name: tensor.numpy() for name, tensor in checkpoint['q_network'].items()},
+        train_step=checkpoint.get('train_step', 0),
+        catalog_version=catalog_version or checkpoint['config'].get('catalog_version'),
+    )
+    policy.save(output_path)
+    return output_path
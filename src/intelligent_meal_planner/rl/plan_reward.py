@@ -0,0 +1,160 @@
+"""
+批量终局奖励
+
+与 MealPlanningEnv._calculate_reward 逐项一致的数组实现：一次计算任意多个完整方案的终局奖励，
+供精确求解器、局部搜索等需要大量评估候选方案的规划器使用。
+
+方案由三个量描述：
+- 累计营养与价格 totals [N, 5] (calories, protein, carbs, fat, price)
+- 不同类别数 unique_categories [N]
+- 忌口菜品数 disliked_counts [N]
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# (max_bonus, tolerance)，顺序与 RecipeCatalog.features 前四列一致
+NUTRIENT_SCORING: Tuple[Tuple[float, float], ...] = (
+    (15.0, 0.10),  # calories
+    (10.0, 0.20),  # protein
+    (8.0, 0.25),   # carbs
+    (7.0, 0.30),   # fat
+)
+
+# 各分量的最大值：营养 40、预算 5、多样性 6 + 3 (不重复奖励)
+MAX_NUTRITION_REWARD = sum(bonus for bonus, _ in NUTRIENT_SCORING)
+MAX_BUDGET_REWARD = 5.0
+MAX_VARIETY_REWARD = 9.0
+DISLIKE_PENALTY = 8.0
+
+
+def nutrient_scores(
+    actual: np.ndarray, target: float, max_bonus: float, tolerance: float
+) -> np.ndarray:
+    """
+    MealPlanningEnv._nutrient_score 的向量化版本
+
+    以 e = 误差 / 容忍度 表示：e <= 3 时三段线性合并为 min(1, 1.5 - 0.5e)，
+    超出 3 倍容忍度后为小幅惩罚 max(-0.3, -0.5 * 误差)。
+    分段边界与 env 一样用 误差 <= 容忍度 * 3 判断，避免浮点边界上的分数跳变不一致。
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    if target <= 0:
+        return np.zeros_like(actual)
+
+    error = np.abs(actual / target - 1.0)
+    scaled = error / tolerance
+    inside = np.minimum(1.0, 1.5 - 0.5 * scaled)
+    outside = np.maximum(-0.3, -0.5 * error)
+    return max_bonus * np.where(error <= tolerance * 3, inside, outside)
+
+
+_BUDGET_THRESHOLDS = np.array([0.90, 1.0, 1.05, 1.15])
+_BUDGET_LEVELS = np.array([5.0, 3.0, 1.0, -2.0, 0.0])
+# 类别数 0..4 (4 个及以上同分) 的多样性奖励，含 6 道菜不重复的固定 3 分
+_VARIETY_LEVELS = np.array([3.0, 3.0, 5.0, 7.0, 9.0])
+
+
+def budget_scores(cost: np.ndarray, budget_limit: float) -> np.ndarray:
+    """终局预算奖励 (随花费单调不增)"""
+    ratio = np.asarray(cost, dtype=np.float64) / budget_limit
+    levels = _BUDGET_LEVELS[np.searchsorted(_BUDGET_THRESHOLDS, ratio, side='left')]
+    return np.where(ratio <= 1.15, levels, np.maximum(-8.0, -5.0 - (ratio - 1.15) * 20))
+
+
+def variety_scores(unique_categories: np.ndarray) -> np.ndarray:
+    """终局多样性奖励"""
+    return _VARIETY_LEVELS[np.minimum(np.asarray(unique_categories, dtype=np.int64), 4)]
+
+
+_POPCOUNT_16 = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.int64)
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """int64 位掩码中置位的个数"""
+    bits = np.asarray(bits, dtype=np.int64)
+    count = np.zeros(bits.shape, dtype=np.int64)
+    while bits.any():
+        count += _POPCOUNT_16[bits & 0xFFFF]
+        bits = bits >> 16
+    return count
+
+
+def plan_budget_cap(env) -> float:
+    """
+    完整方案总价的上限，与 action_masks 的预算条件等价
+
+    每步价格不超过剩余预算 (+缓冲) 等价于总价不超过 预算 (+缓冲)：
+    严格预算无缓冲，否则允许超支 10%。不含非严格模式下的防死锁兜底。
+    """
+    return env.budget_limit * (1.0 if env.strict_budget else 1.10)
+
+
+class PlanRewardModel:
+    """
+    绑定到一个环境 (目标、权重、目录、忌口) 的批量终局奖励
+
+    Args:
+        env: 已 reset 的 MealPlanningEnv (读取当前目标与预算)
+    """
+
+    def __init__(self, env):
+        self.catalog = env.catalog
+        self.targets = np.array(
+            [env.target_calories, env.target_protein, env.target_carbs, env.target_fat],
+            dtype=np.float64,
+        )
+        self.budget_limit = float(env.budget_limit)
+        self.weight_nutrition = env.weight_nutrition
+        self.weight_budget = env.weight_budget
+        self.weight_variety = env.weight_variety
+
+        catalog = self.catalog
+        self.features = catalog.features_f64
+        if len(catalog.categories) > 63:
+            raise ValueError(f"类别数 {len(catalog.categories)} 超过位掩码上限 63")
+        self.category_bits = np.left_shift(1, catalog.category_codes.astype(np.int64))
+        if env.disliked_tags:
+            self.disliked = catalog.has_any_tag(env.disliked_tags).astype(np.int64)
+        else:
+            self.disliked = np.zeros(len(catalog), dtype=np.int64)
+
+    @property
+    def max_reward(self) -> float:
+        """奖励上界 (营养全部达标、花费不超过 90% 预算、至少 4 个类别、无忌口)"""
+        return (
+            self.weight_nutrition * MAX_NUTRITION_REWARD
+            + self.weight_budget * MAX_BUDGET_REWARD
+            + self.weight_variety * MAX_VARIETY_REWARD
+        )
+
+    def nutrition_rewards(self, nutrients: np.ndarray) -> np.ndarray:
+        """营养奖励 [N]，nutrients 为 [N, 4] 累计营养"""
+        nutrients = np.asarray(nutrients, dtype=np.float64)
+        total = np.zeros(nutrients.shape[:-1], dtype=np.float64)
+        for k, (max_bonus, tolerance) in enumerate(NUTRIENT_SCORING):
+            total += nutrient_scores(nutrients[..., k], self.targets[k], max_bonus, tolerance)
+        return total
+
+    def rewards(
+        self,
+        totals: np.ndarray,
+        unique_categories: np.ndarray,
+        disliked_counts: np.ndarray,
+    ) -> np.ndarray:
+        """终局奖励 [N]"""
+        totals = np.asarray(totals, dtype=np.float64)
+        return (
+            self.weight_nutrition * self.nutrition_rewards(totals[..., :4])
+            + self.weight_budget * budget_scores(totals[..., 4], self.budget_limit)
+            + self.weight_variety * variety_scores(unique_categories)
+            - DISLIKE_PENALTY * np.asarray(disliked_counts)
+        )
+
+    def plan_rewards(self, plans: np.ndarray) -> np.ndarray:
+        """完整方案 (菜品索引 [N, 6]) 的终局奖励 [N]"""
+        plans = np.atleast_2d(np.asarray(plans, dtype=np.int64))
+        totals = self.features[plans].sum(axis=1)
+        bits = np.bitwise_or.reduce(self.category_bits[plans], axis=1)
+        return self.rewards(totals, popcount(bits), self.disliked[plans].sum(axis=1))
@@ -0,0 +1,117 @@
+"""
+Episode 遥测 (EpisodeTelemetry)
+
+替代 _calculate_reward 中的逐回合 print：环境在每个 episode 结束时
+把各奖励分量写入固定容量的 NumPy 环形缓冲区，由调用方按需聚合。
+
+- 未启用 (env.telemetry 为 None) 时不做任何额外计算
+- 启用时每个 episode 只写入一行 float64，聚合在 NumPy 中完成
+- drain() 返回自上次 drain 以来的记录，便于按日志间隔写入 TensorBoard
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+TELEMETRY_FIELDS: Tuple[str, ...] = (
+    'total_reward',
+    'nutrition_reward',
+    'budget_reward',
+    'variety_reward',
+    'dislike_penalty',
+    'calorie_error_pct',
+    'budget_ratio',
+    'unique_categories',
+)
+
+
+class EpisodeTelemetry:
+    """
+    每个 episode 一行的奖励分量环形缓冲区
+
+    缓冲区写满后覆盖最旧的记录；values() / drain() 按时间顺序返回。
+    MealPlanningEnv 与 VecMealPlanningEnv 可共享同一个实例。
+
+    Args:
+        capacity: 最多保留的 episode 数
+    """
+
+    fields = TELEMETRY_FIELDS
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = int(capacity)
+        self.buffer = np.zeros((self.capacity, len(self.fields)), dtype=np.float64)
+        self.total_episodes = 0
+        self._drained = 0
+
+    def __len__(self) -> int:
+        return min(self.total_episodes, self.capacity)
+
+    def record(
+        self,
+        total_reward: float,
+        nutrition_reward: float,
+        budget_reward: float,
+        variety_reward: float,
+        dislike_penalty: float,
+        calorie_error_pct: float,
+        budget_ratio: float,
+        unique_categories: int,
+    ):
+        """记录单个 episode (标量环境)"""
+        row = self.buffer[self.total_episodes % self.capacity]
+        row[0] = total_reward
+        row[1] = nutrition_reward
+        row[2] = budget_reward
+        row[3] = variety_reward
+        row[4] = dislike_penalty
+        row[5] = calorie_error_pct
+        row[6] = budget_ratio
+        row[7] = unique_categories
+        self.total_episodes += 1
+
+    def record_batch(self, rows: np.ndarray):
+        """记录多个 episode，rows 形状为 [k, len(fields)] (向量化环境)"""
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.shape[0] > self.capacity:
+            skipped = rows.shape[0] - self.capacity
+            self.total_episodes += skipped
+            rows = rows[skipped:]
+        k = rows.shape[0]
+        start = self.total_episodes % self.capacity
+        first = min(k, self.capacity - start)
+        self.buffer[start:start + first] = rows[:first]
+        self.buffer[:k - first] = rows[first:]
+        self.total_episodes += k
+
+    def _window(self, count: int) -> np.ndarray:
+        count = min(count, self.capacity)
+        end = self.total_episodes % self.capacity
+        if count <= end:
+            return self.buffer[end - count:end].copy()
+        return np.concatenate([self.buffer[self.capacity - (count - end):], self.buffer[:end]])
+
+    def values(self) -> np.ndarray:
+        """缓冲区中保留的全部记录 [n, len(fields)]，按时间顺序"""
+        return self._window(len(self))
+
+    def drain(self) -> np.ndarray:
+        """返回自上次 drain 以来的新记录 (超出容量的部分已被覆盖)"""
+        rows = self._window(self.total_episodes - self._drained)
+        self._drained = self.total_episodes
+        return rows
+
+    def summary(self, rows: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """各字段均值；默认对缓冲区中全部记录求均值，无记录时返回空字典"""
+        if rows is None:
+            rows = self.values()
+        if len(rows) == 0:
+            return {}
+        return dict(zip(self.fields, rows.mean(axis=0).tolist()))
+
+    def clear(self):
+        self.total_episodes = 0
+        self._drained = 0
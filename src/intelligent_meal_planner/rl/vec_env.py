@@ -0,0 +1,501 @@
+"""
+批量向量化配餐环境
+
+将 N 个 MealPlanningEnv episode 的状态保存在 NumPy 数组中，
+一次数组运算推进所有环境，用于高吞吐训练与批量评估。
+
+奖励计算与 MealPlanningEnv._calculate_step_reward / _calculate_reward
+逐项保持相同的浮点运算顺序，结果与标量环境逐位一致。
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from gymnasium import spaces
+
+from .catalog import MEAL_TYPES, RecipeCatalog
+from .telemetry import EpisodeTelemetry
+
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+class VecMealPlanningEnv:
+    """
+    向量化配餐环境
+
+    状态以结构化数组保存：
+    - 累计营养与花费: totals [N, 5] (calories, protein, carbs, fat, cost)
+    - 当前步骤: step_idx [N]
+    - 已选菜品集合: selected [N, action_dim] (bool)
+    - 已选类别集合: selected_categories [N, n_categories] (bool)
+    - 每个环境的目标: targets [N, 5] (calories, protein, carbs, fat, budget)
+
+    Episode 结束时自动重置，结束前的观察值与掩码通过
+    infos['final_observation'] / infos['final_action_masks'] 返回。
+
+    Args:
+        n_envs: 并行环境数
+        其余参数与 MealPlanningEnv 相同；目标与预算可传入长度为 n_envs 的数组，
+        为每个环境设置不同的目标 (评估模式下生效)
+        seed: 课程学习随机目标的随机种子
+        catalog: 共享菜品目录 (默认按 recipes_path 加载进程内缓存的目录)
+        telemetry: Episode 遥测缓冲区 (None=不记录奖励分量)
+    """
+
+    def __init__(
+        self,
+        n_envs: int,
+        recipes_path: Optional[str] = None,
+        target_calories: ArrayLike = 2000.0,
+        target_protein: ArrayLike = 100.0,
+        target_carbs: ArrayLike = 250.0,
+        target_fat: ArrayLike = 65.0,
+        budget_limit: ArrayLike = 100.0,
+        disliked_tags: Optional[List[str]] = None,
+        weight_nutrition: float = 1.0,
+        weight_budget: float = 0.5,
+        weight_variety: float = 0.3,
+        training_mode: bool = True,
+        price_scale: float = 1.0,
+        custom_recipes: Optional[List[Dict]] = None,
+        strict_budget: bool = False,
+        seed: Optional[int] = None,
+        catalog: Optional[RecipeCatalog] = None,
+        telemetry: Optional[EpisodeTelemetry] = None,
+    ):
+        self.n_envs = int(n_envs)
+        self.training_mode = training_mode
+        self.strict_budget = strict_budget
+        self.disliked_tags = disliked_tags if disliked_tags else []
+        self.telemetry = telemetry
+
+        self.weight_nutrition = weight_nutrition
+        self.weight_budget = weight_budget
+        self.weight_variety = weight_variety
+
+        if catalog is None:
+            catalog = RecipeCatalog.load(recipes_path)
+        self.catalog = catalog.overlay(price_scale=price_scale, custom_recipes=custom_recipes)
+        self.n_real_recipes = len(self.catalog)
+
+        # 与 MealPlanningEnv 相同的回合结构与空间定义
+        self.meal_types = list(MEAL_TYPES)
+        self.items_per_meal = 2
+        self.max_steps = len(self.meal_types) * self.items_per_meal
+        self.observation_space = spaces.Box(low=-2.0, high=2.0, shape=(13,), dtype=np.float32)
+        self.action_space = spaces.Discrete(max(300, self.n_real_recipes))
+        self.action_dim = int(self.action_space.n)
+
+        self._build_recipe_arrays()
+
+        # 默认目标 (评估模式 reset 时恢复)
+        self.default_targets = np.stack([
+            self._broadcast(target_calories),
+            self._broadcast(target_protein),
+            self._broadcast(target_carbs),
+            self._broadcast(target_fat),
+            self._broadcast(budget_limit),
+        ], axis=1)
+
+        self.curriculum_stage = 1
+        self.global_step = 0
+        self._rng = np.random.default_rng(seed)
+
+        n = self.n_envs
+        self.targets = self.default_targets.copy()
+        self.totals = np.zeros((n, 5), dtype=np.float64)
+        self.step_idx = np.zeros(n, dtype=np.int64)
+        self.selected = np.zeros((n, self.action_dim), dtype=bool)
+        self.selected_categories = np.zeros((n, self.n_categories), dtype=bool)
+        self.dislike_counts = np.zeros(n, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # 初始化辅助
+    # ------------------------------------------------------------------
+
+    def _broadcast(self, value: ArrayLike) -> np.ndarray:
+        return np.broadcast_to(
+            np.asarray(value, dtype=np.float64), (self.n_envs,)
+        ).copy()
+
+    def _build_recipe_arrays(self):
+        """将目录数组扩展到动作维度 (未使用的 slot 填充为无效)"""
+        a = self.action_dim
+        n_real = self.n_real_recipes
+        catalog = self.catalog
+
+        # [A, 5]: calories, protein, carbs, fat, price (float64 累加与标量环境一致)
+        self.recipe_values = np.zeros((a, 5), dtype=np.float64)
+        self.recipe_values[:n_real] = catalog.features_f64
+        self.price = np.full(a, np.inf, dtype=np.float64)
+        self.price[:n_real] = catalog.price_f64
+        self.meal_ok = np.zeros((len(self.meal_types), a), dtype=bool)
+        self.meal_ok[:, :n_real] = catalog.meal_masks
+        self.category_codes = np.zeros(a, dtype=np.int64)
+        self.category_codes[:n_real] = catalog.category_codes
+        self.is_disliked = np.zeros(a, dtype=bool)
+        self.is_disliked[:n_real] = catalog.has_any_tag(self.disliked_tags)
+
+        self.n_categories = max(1, len(catalog.categories))
+        self.real_mask = np.zeros(a, dtype=bool)
+        self.real_mask[:n_real] = True
+
+    # ------------------------------------------------------------------
+    # 重置
+    # ------------------------------------------------------------------
+
+    def reset(self, seed: Optional[int] = None, options=None) -> Tuple[np.ndarray, Dict]:
+        """
+        重置所有环境
+
+        Returns:
+            observations: [N, 13]
+            info: 包含 curriculum_stage / target_calories / budget_limit 数组
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self._reset_envs(np.arange(self.n_envs))
+        return self._get_observations(), {
+            'curriculum_stage': self.curriculum_stage if self.training_mode else 0,
+            'target_calories': self.targets[:, 0].copy(),
+            'budget_limit': self.targets[:, 4].copy(),
+        }
+
+    def _reset_envs(self, idx: np.ndarray):
+        """重置指定索引的环境 (含向量化课程学习采样)"""
+        if idx.size == 0:
+            return
+
+        if self.training_mode:
+            self._sample_curriculum_targets(idx)
+            # 可行性检查：防止生成完全无解的低预算场景
+            min_cost_6_items = 24.0
+            self.targets[idx, 4] = np.maximum(
+                self.targets[idx, 4], min_cost_6_items * 1.2
+            )
+        else:
+            self.targets[idx] = self.default_targets[idx]
+
+        self.totals[idx] = 0.0
+        self.step_idx[idx] = 0
+        self.selected[idx] = False
+        self.selected_categories[idx] = False
+        self.dislike_counts[idx] = 0
+
+    def _sample_curriculum_targets(self, idx: np.ndarray):
+        """按 global_step 对应的课程阶段批量采样目标 (与 MealPlanningEnv.reset 分布一致)"""
+        if self.global_step < 100000:
+            self.curriculum_stage = 1
+        elif self.global_step < 300000:
+            self.curriculum_stage = 2
+        else:
+            self.curriculum_stage = 3
+
+        k = idx.size
+        rng = self._rng
+
+        if self.curriculum_stage == 1:
+            self.targets[idx] = (2000.0, 100.0, 250.0, 65.0, 120.0)
+            return
+
+        if self.curriculum_stage == 2:
+            calories = rng.uniform(1800.0, 2200.0, size=k)
+            budget = rng.uniform(80.0, 150.0, size=k)
+            protein_ratio = np.full(k, 0.20)
+            carb_ratio = np.full(k, 0.50)
+            fat_ratio = np.full(k, 0.30)
+        else:
+            calories = rng.uniform(1200.0, 3000.0, size=k)
+            base_cost_per_100kcal = rng.uniform(3.5, 6.0, size=k)
+            budget = np.clip((calories / 100.0) * base_cost_per_100kcal, 50.0, 250.0)
+
+            mode_roll = rng.random(k)
+            keto = mode_roll < 0.2
+            fitness = (mode_roll >= 0.2) & (mode_roll < 0.5)
+
+            # Keto/低碳 | 健身/高蛋白 | 均衡
+            protein_ratio = np.where(
+                keto, rng.uniform(0.20, 0.35, size=k),
+                np.where(fitness, rng.uniform(0.30, 0.50, size=k),
+                         rng.uniform(0.15, 0.25, size=k)),
+            )
+            carb_keto = rng.uniform(0.05, 0.15, size=k)
+            fat_ratio = np.where(
+                keto, 1.0 - protein_ratio - carb_keto,
+                np.where(fitness, rng.uniform(0.15, 0.25, size=k),
+                         rng.uniform(0.20, 0.35, size=k)),
+            )
+            carb_ratio = np.where(keto, carb_keto, 1.0 - protein_ratio - fat_ratio)
+
+            total_ratio = protein_ratio + fat_ratio + carb_ratio
+            protein_ratio = protein_ratio / total_ratio
+            fat_ratio = fat_ratio / total_ratio
+            carb_ratio = carb_ratio / total_ratio
+
+        self.targets[idx, 0] = calories
+        self.targets[idx, 1] = (calories * protein_ratio) / 4.0
+        self.targets[idx, 2] = (calories * carb_ratio) / 4.0
+        self.targets[idx, 3] = (calories * fat_ratio) / 9.0
+        self.targets[idx, 4] = budget
+
+    # ------------------------------------------------------------------
+    # 推进
+    # ------------------------------------------------------------------
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """
+        同时推进所有环境
+
+        Args:
+            actions: [N] 动作索引
+
+        Returns:
+            observations: [N, 13] (已结束的环境为自动重置后的初始观察)
+            rewards: [N] float64
+            terminated: [N] bool
+            truncated: [N] bool
+            infos: 数组字典；final_observation / final_action_masks 为结束前的值
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rows = np.arange(self.n_envs)
+
+        meal_idx = np.minimum(self.step_idx // self.items_per_meal, len(self.meal_types) - 1)
+        in_range = (actions >= 0) & (actions < self.action_dim)
+        safe_actions = np.where(in_range, actions, 0)
+        valid = (
+            in_range
+            & (self.step_idx < self.max_steps)
+            & self.meal_ok[meal_idx, safe_actions]
+        )
+
+        # 更新累计营养和花费 (仅有效动作)
+        v_rows = rows[valid]
+        v_actions = safe_actions[valid]
+        self.totals[v_rows] += self.recipe_values[v_actions]
+        self.selected[v_rows, v_actions] = True
+        self.selected_categories[v_rows, self.category_codes[v_actions]] = True
+        self.dislike_counts[v_rows] += self.is_disliked[v_actions]
+        self.step_idx[v_rows] += 1
+
+        terminated = (self.step_idx >= self.max_steps) | ~valid
+        truncated = np.zeros(self.n_envs, dtype=bool)
+
+        rewards = np.where(
+            terminated,
+            self._calculate_rewards(record=terminated & valid),
+            self._calculate_step_rewards(),
+        )
+        # 动作掩码失效 (选择了错误餐次) 时与标量环境一致：-100 并提前终止
+        rewards[~valid] = -100.0
+
+        unique_categories = self.selected_categories.sum(axis=1)
+        infos = {
+            'valid_action': valid,
+            'total_cost': self.totals[:, 4].copy(),
+            'total_calories': self.totals[:, 0].copy(),
+            'step': self.step_idx.copy(),
+            'unique_categories': unique_categories,
+        }
+
+        observations = self._get_observations()
+        done_idx = np.flatnonzero(terminated)
+        if done_idx.size:
+            infos['final_observation'] = observations.copy()
+            infos['final_action_masks'] = self.action_masks()
+            infos['final_totals'] = self.totals.copy()
+            infos['final_targets'] = self.targets.copy()
+            self._reset_envs(done_idx)
+            observations[done_idx] = self._get_observations()[done_idx]
+
+        return observations, rewards, terminated, truncated, infos
+
+    def step_async(self, actions: np.ndarray):
+        """与 AsyncMealPlanningVecEnv 接口一致：记录动作，在 step_wait 中推进"""
+        self._pending_actions = actions
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        return self.step(self._pending_actions)
+
+    def close(self):
+        pass
+
+    # ------------------------------------------------------------------
+    # 奖励 (与 MealPlanningEnv 逐项一致)
+    # ------------------------------------------------------------------
+
+    def _calculate_step_rewards(self) -> np.ndarray:
+        """批量计算中间步骤奖励，对应 MealPlanningEnv._calculate_step_reward"""
+        progress = self.step_idx / self.max_steps
+        ideal_cal = progress * self.targets[:, 0]
+        ideal_budget = progress * self.targets[:, 4]
+
+        # 1. 卡路里进度奖励
+        cal_deviation = np.abs(self.totals[:, 0] - ideal_cal)
+        cal_reward = np.where(
+            cal_deviation < 100,
+            2.0 - (cal_deviation / 50.0),
+            np.where(
+                cal_deviation < 300,
+                1.0 - (cal_deviation - 100) / 200.0,
+                np.maximum(-2.0, 0.0 - (cal_deviation - 300) / 300.0),
+            ),
+        )
+        reward = cal_reward * 0.5
+
+        # 2. 预算进度奖励
+        budget_deviation = self.totals[:, 4] - ideal_budget
+        budget_reward = np.where(
+            budget_deviation <= 0,
+            0.5,
+            np.where(
+                budget_deviation < 10,
+                0.5 - (budget_deviation / 20.0),
+                np.maximum(-1.0, 0.0 - (budget_deviation / 30.0)),
+            ),
+        )
+        reward = reward + budget_reward * 0.3
+
+        # 3. 多样性奖励
+        unique_categories = self.selected_categories.sum(axis=1)
+        diversity = unique_categories > 1
+        reward[diversity] = reward[diversity] + (unique_categories[diversity] - 1) * 0.3
+
+        return reward
+
+    @staticmethod
+    def _nutrient_scores(actual, target, max_bonus: float, tolerance: float) -> np.ndarray:
+        """批量营养评分，对应 MealPlanningEnv._nutrient_score"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = actual / target
+        error = np.abs(ratio - 1.0)
+
+        score = np.where(
+            error <= tolerance,
+            max_bonus,
+            np.where(
+                error <= tolerance * 2,
+                max_bonus * (1.0 - 0.5 * (error - tolerance) / tolerance),
+                np.where(
+                    error <= tolerance * 3,
+                    max_bonus * 0.5 * (1.0 - (error - tolerance * 2) / tolerance),
+                    np.maximum(-max_bonus * 0.3, -error * max_bonus * 0.5),
+                ),
+            ),
+        )
+        return np.where(target <= 0, 0.0, score)
+
+    def _calculate_rewards(self, record: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        批量计算最终奖励，对应 MealPlanningEnv._calculate_reward
+
+        Args:
+            record: [N] bool，启用遥测时记录这些环境的奖励分量 (正常结束的 episode)
+        """
+        totals = self.totals
+        targets = self.targets
+
+        # 1. 营养达标奖励
+        calorie_reward = self._nutrient_scores(totals[:, 0], targets[:, 0], 15.0, 0.10)
+        protein_reward = self._nutrient_scores(totals[:, 1], targets[:, 1], 10.0, 0.20)
+        carbs_reward = self._nutrient_scores(totals[:, 2], targets[:, 2], 8.0, 0.25)
+        fat_reward = self._nutrient_scores(totals[:, 3], targets[:, 3], 7.0, 0.30)
+        nutrition_reward = calorie_reward + protein_reward + carbs_reward + fat_reward
+
+        # 2. 预算奖励
+        budget_ratio = totals[:, 4] / targets[:, 4]
+        budget_reward = np.select(
+            [budget_ratio <= 0.90, budget_ratio <= 1.0,
+             budget_ratio <= 1.05, budget_ratio <= 1.15],
+            [5.0, 3.0, 1.0, -2.0],
+            default=np.maximum(-8.0, -5.0 - (budget_ratio - 1.15) * 20),
+        )
+
+        # 3. 多样性奖励
+        unique_categories = self.selected_categories.sum(axis=1)
+        variety_reward = np.select(
+            [unique_categories >= 4, unique_categories >= 3, unique_categories >= 2],
+            [6.0, 4.0, 2.0],
+            default=0.0,
+        )
+        variety_reward = variety_reward + 3.0
+
+        # 4. 忌口惩罚
+        dislike_penalty = self.dislike_counts * -8.0
+
+        total_reward = (
+            self.weight_nutrition * nutrition_reward +
+            self.weight_budget * budget_reward +
+            self.weight_variety * variety_reward +
+            dislike_penalty
+        )
+
+        # 奖励分量遥测 (未启用时不做额外计算)
+        if self.telemetry is not None and record is not None and record.any():
+            cal_error = np.abs(totals[:, 0] - targets[:, 0]) / targets[:, 0] * 100
+            self.telemetry.record_batch(np.stack([
+                total_reward, nutrition_reward, budget_reward, variety_reward,
+                dislike_penalty, cal_error, budget_ratio, unique_categories,
+            ], axis=1)[record])
+
+        return total_reward
+
+    # ------------------------------------------------------------------
+    # 观察与掩码
+    # ------------------------------------------------------------------
+
+    def _get_observations(self) -> np.ndarray:
+        """批量获取观察值 [N, 13]，对应 MealPlanningEnv._get_observation"""
+        n = self.n_envs
+        totals = self.totals
+        targets = self.targets
+        step = self.step_idx
+
+        obs = np.empty((n, 13), dtype=np.float64)
+        obs[:, 0] = step / self.max_steps
+        obs[:, 1:5] = totals[:, :4] / targets[:, :4]
+        obs[:, 5] = totals[:, 4] / targets[:, 4]
+        obs[:, 6] = (targets[:, 0] - totals[:, 0]) / targets[:, 0]
+        obs[:, 7] = (targets[:, 4] - totals[:, 4]) / targets[:, 4]
+        obs[:, 8] = (self.max_steps - step) / self.max_steps
+
+        meal_idx = step // self.items_per_meal
+        for m in range(len(self.meal_types)):
+            obs[:, 9 + m] = meal_idx == m
+
+        obs[:, 12] = self.selected_categories.sum(axis=1) / np.maximum(1, step)
+
+        return np.clip(obs.astype(np.float32), -2.0, 2.0)
+
+    def action_masks(self) -> np.ndarray:
+        """
+        批量生成动作掩码 [N, action_dim]，规则与 MealPlanningEnv.action_masks 一致
+        """
+        active = self.step_idx < self.max_steps
+        meal_idx = np.minimum(self.step_idx // self.items_per_meal, len(self.meal_types) - 1)
+        meal_ok = self.meal_ok[meal_idx] & active[:, None]
+
+        remaining_budget = self.targets[:, 4] - self.totals[:, 4]
+        budget_buffer = 0.0 if self.strict_budget else self.targets[:, 4] * 0.10
+        max_affordable_price = remaining_budget + budget_buffer
+
+        unselected = meal_ok & ~self.selected
+        mask = unselected & (self.price[None, :] <= max_affordable_price[:, None])
+
+        if self.strict_budget:
+            return mask
+
+        # 防死锁兜底：无可选菜品时选择最便宜的 (先未选过的，再允许重复)
+        stuck = active & ~mask.any(axis=1)
+        if stuck.any():
+            for eligible in (unselected, meal_ok):
+                rows = stuck & eligible.any(axis=1)
+                if rows.any():
+                    prices = np.where(eligible[rows], self.price[None, :], np.inf)
+                    min_price = prices.min(axis=1, keepdims=True)
+                    mask[rows] = eligible[rows] & (prices == min_price)
+                stuck = stuck & ~rows
+            if stuck.any():
+                mask[stuck] = self.real_mask
+
+        return mask
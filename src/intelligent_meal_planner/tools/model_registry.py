@@ -0,0 +1,148 @@
+"""Process-wide registry of the served DQN policy.
+
+The registry resolves and loads the best checkpoint once, hands the same
+read-only policy to every ``RLModelTool``, and swaps in a new one when the
+checkpoint (or its ``.policy`` export) changes on disk. Change detection is
+a throttled ``stat`` on access; a reload builds the new policy first and
+then replaces the reference, so in-flight plans keep the old one.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+from ..rl.numpy_policy import POLICY_SUFFIX
+from .rl_model_tool import (
+    Policy,
+    RLModelTool,
+    default_project_root,
+    load_policy,
+    quantize_requested,
+    resolve_model_path,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel(NamedTuple):
+    model: Policy
+    engine: str
+    path: Path
+    version: str
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModelRegistry:
+    """Load the served policy once and hot-swap it when the files change.
+
+    Args:
+        model_path: Fixed checkpoint to serve. By default the best checkpoint
+            under ``<project>/models`` is re-resolved on every check, so a
+            newly written ``dqn_meal_best.pt`` replaces ``dqn_meal_final.pt``.
+        poll_interval: Minimum seconds between on-disk change checks.
+        quantize: Serve the int8 torch model (default: ``RL_QUANTIZE``).
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        poll_interval: float = 2.0,
+        quantize: Optional[bool] = None,
+    ):
+        self.model_path = Path(model_path) if model_path is not None else None
+        self.poll_interval = poll_interval
+        self.quantize = quantize_requested() if quantize is None else quantize
+
+        self._current: Optional[LoadedModel] = None
+        self._signature = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        self.reload_count = 0
+
+    def _resolve(self) -> Path:
+        if self.model_path is not None:
+            if not self.model_path.exists():
+                raise FileNotFoundError(f"模型文件不存在: {self.model_path}")
+            return self.model_path
+        return resolve_model_path(default_project_root())
+
+    def _signature_of(self, path: Path):
+        export_path = path.with_suffix(POLICY_SUFFIX)
+        export = _file_signature(export_path) if export_path.exists() else None
+        return str(path), _file_signature(path), export
+
+    def get(self) -> LoadedModel:
+        """Return the current policy, reloading first if the files changed."""
+        current = self._current
+        if current is None:
+            with self._reload_lock:
+                if self._current is None:
+                    self._reload_if_changed()
+                return self._current
+        if time.monotonic() - self._last_check >= self.poll_interval:
+            # Only one thread checks and reloads; the others keep serving.
+            if self._reload_lock.acquire(blocking=False):
+                try:
+                    self._reload_if_changed()
+                except Exception as exc:
+                    logger.warning("Model reload failed, keeping %s: %s", current.version, exc)
+                finally:
+                    self._reload_lock.release()
+        return self._current
+
+    def _reload_if_changed(self) -> None:
+        self._last_check = time.monotonic()
+        path = self._resolve()
+        signature = self._signature_of(path)
+        if signature != self._signature:
+            self._load(path, signature)
+
+    def _load(self, path: Path, signature) -> LoadedModel:
+        model, engine = load_policy(path, self.quantize)
+        mtime_ns = max(sig[0] for sig in signature[1:] if sig is not None)
+        version = f"{path.name}@{mtime_ns}"
+        loaded = LoadedModel(model=model, engine=engine, path=path, version=version)
+        # Publish atomically: readers see either the old or the new model.
+        self._current = loaded
+        self._signature = signature
+        self.reload_count += 1
+        logger.info("Loaded DQN model %s (%s engine)", version, engine)
+        return loaded
+
+    def reload(self) -> LoadedModel:
+        """Load (or re-load) the policy now, regardless of the poll interval."""
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            path = self._resolve()
+            return self._load(path, self._signature_of(path))
+
+    def warm_start(self) -> LoadedModel:
+        """Load the policy and run one dummy plan so first requests skip cold paths."""
+        loaded = self.get()
+        RLModelTool(registry=self)._run()
+        return loaded
+
+    @property
+    def version(self) -> Optional[str]:
+        current = self._current
+        return current.version if current is not None else None
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide registry (created on first use)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,182 @@
+"""LRU + TTL cache for RL meal plans with single-flight de-duplication.
+
+Planning is deterministic for a given model, catalog and set of targets, so
+requests whose targets fall into the same quantization bucket share one
+computed plan. Concurrent misses on the same key are coalesced: the first
+caller computes, the others wait for its result.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+def quantize(value: float, step: float) -> float:
+    """Snap ``value`` to the centre of its ``step``-wide bucket grid."""
+    return round(float(value) / step) * step
+
+
+def quantize_down(value: float, step: float) -> float:
+    """Snap ``value`` down to the ``step`` grid, never above ``value``."""
+    return min(math.floor(float(value) / step) * step, float(value))
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class PlanCache:
+    """Thread-safe LRU cache with per-entry TTL and single-flight misses.
+
+    Args:
+        max_entries: LRU capacity.
+        ttl_seconds: Lifetime of a cached plan.
+        calorie_step: Quantization step for target calories (kcal).
+        macro_step: Quantization step for protein/carbs/fat targets (g).
+        budget_step: Quantization step for the budget (yuan). Strict budgets
+            are rounded down so a shared plan never costs more than any
+            budget in its bucket.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600.0,
+        calorie_step: float = 10.0,
+        macro_step: float = 1.0,
+        budget_step: float = 0.5,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.calorie_step = calorie_step
+        self.macro_step = macro_step
+        self.budget_step = budget_step
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def quantize_targets(
+        self,
+        target_calories: float,
+        target_protein: float,
+        target_carbs: float,
+        target_fat: float,
+        max_budget: float,
+        strict_budget: bool = False,
+    ) -> Dict[str, float]:
+        snap_budget = quantize_down if strict_budget else quantize
+        return {
+            "target_calories": quantize(target_calories, self.calorie_step),
+            "target_protein": quantize(target_protein, self.macro_step),
+            "target_carbs": quantize(target_carbs, self.macro_step),
+            "target_fat": quantize(target_fat, self.macro_step),
+            "max_budget": snap_budget(max_budget, self.budget_step),
+        }
+
+    def make_key(
+        self,
+        targets: Dict[str, float],
+        disliked_tags: Optional[Iterable[str]],
+        strict_budget: bool,
+        model_version: Optional[str],
+        catalog_version: Optional[str],
+    ) -> Hashable:
+        """Key from already-quantized targets plus everything else the plan depends on."""
+        return (
+            tuple(sorted(targets.items())),
+            tuple(sorted(set(disliked_tags or ()))),
+            bool(strict_budget),
+            model_version,
+            catalog_version,
+        )
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it at most once concurrently."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as exc:
+            # Failures are not cached; waiting callers see the same error.
+            flight.error = exc
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, flight.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+
+_plan_cache: Optional[PlanCache] = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """The process-wide plan cache (created on first use)."""
+    global _plan_cache
+    if _plan_cache is None:
+        with _plan_cache_lock:
+            if _plan_cache is None:
+                _plan_cache = PlanCache()
+    return _plan_cache
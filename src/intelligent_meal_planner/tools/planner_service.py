@@ -0,0 +1,162 @@
+"""In-process micro-batching planner.
+
+Concurrent plan requests are queued for a few milliseconds and their
+episodes are advanced together: every step does one batched Q-network
+forward over the stacked observations and masks of all pending requests.
+Throughput then grows with concurrency instead of paying one batch-size-1
+forward per request per step.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from .model_registry import ModelRegistry, get_model_registry
+from .rl_model_tool import PlanResult, make_planning_env, rollout_plans
+
+logger = logging.getLogger(__name__)
+
+
+class PlannerService:
+    """Batch concurrent ``plan`` calls into lockstep rollouts on the shared policy.
+
+    Args:
+        registry: Source of the served policy (default: the process-wide one).
+        max_batch_size: Upper bound on episodes advanced together.
+        max_wait_ms: How long the first queued request waits for company.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(
+                    target=self._worker, name="planner-service", daemon=True
+                )
+                thread.start()
+                self._thread = thread
+
+    def submit(self, **request: Any) -> "Future[PlanResult]":
+        """Queue one plan request (``make_planning_env`` kwargs) and return its future."""
+        self._ensure_started()
+        future: "Future[PlanResult]" = Future()
+        self._queue.put((request, future))
+        return future
+
+    def plan(self, timeout: Optional[float] = None, **request: Any) -> PlanResult:
+        """Blocking ``submit``: ``(meal_plan, metrics, status)`` for one request."""
+        return self.submit(**request).result(timeout=timeout)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _collect(self, first: tuple) -> List[tuple]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the stop marker back so the worker exits after this batch.
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [
+                item for item in self._collect(first)
+                if item[1].set_running_or_notify_cancel()
+            ]
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch: List[tuple]) -> None:
+        try:
+            registry = self.registry or get_model_registry()
+            model = registry.get().model
+        except Exception as exc:
+            for _request, future in batch:
+                future.set_exception(exc)
+            return
+
+        envs, futures = [], []
+        for request, future in batch:
+            try:
+                envs.append(make_planning_env(**request))
+                futures.append(future)
+            except Exception as exc:
+                future.set_exception(exc)
+        if not envs:
+            return
+
+        try:
+            results = rollout_plans(model, envs)
+        except Exception as exc:
+            logger.exception("Batched planning failed for %d requests", len(envs))
+            for future in futures:
+                future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.requests += len(envs)
+        self.largest_batch = max(self.largest_batch, len(envs))
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "largest_batch": self.largest_batch,
+            "mean_batch": self.requests / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+_service: Optional[PlannerService] = None
+_service_lock = threading.Lock()
+
+
+def get_planner_service() -> PlannerService:
+    """The process-wide planner service (created on first use)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PlannerService()
+    return _service
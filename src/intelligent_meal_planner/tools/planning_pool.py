@@ -0,0 +1,219 @@
+"""Bounded worker pool for RL planning.
+
+Planning calls are dispatched to a dedicated thread or process pool so they
+never run on the API event loop. The pool admits at most
+``max_workers + max_queue`` calls at a time; beyond that ``submit`` fails
+fast with ``PlanningPoolSaturatedError`` (mapped to HTTP 429), and a call
+that does not finish within ``timeout_seconds`` raises
+``PlanningTimeoutError``. Process workers preload the recipe catalog and
+the served policy when they start.
+
+Configuration comes from the environment:
+
+- ``RL_POOL_MODE``: ``thread`` (default) or ``process``
+- ``RL_POOL_WORKERS``: worker count (default 2)
+- ``RL_POOL_QUEUE``: calls allowed to wait for a worker (default 16)
+- ``RL_POOL_TIMEOUT``: per-call timeout in seconds (default 10)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ("thread", "process")
+
+
+class PlanningPoolSaturatedError(Exception):
+    """All workers are busy and the wait queue is full."""
+
+
+class PlanningTimeoutError(Exception):
+    """A planning call did not finish within the pool timeout."""
+
+
+def preload_worker() -> None:
+    """Process-worker initializer: load the catalog and policy before the first call."""
+    from ..rl.catalog import RecipeCatalog
+    from .model_registry import get_model_registry
+
+    RecipeCatalog.load()
+    try:
+        get_model_registry().get()
+    except FileNotFoundError:
+        logger.info("No DQN model found; planning worker starts without a policy")
+
+
+def run_default_plan(planner_backend: Optional[str] = None, **request: Any) -> str:
+    """Plan with the process-wide RL tool; returns the tool's JSON payload."""
+    from .rl_model_tool import create_rl_model_tool
+
+    return create_rl_model_tool(planner_backend=planner_backend)._run(**request)
+
+
+def run_default_plan_options(num_plans: int = 3, **request: Any) -> List[Dict[str, Any]]:
+    """Top-k distinct plans (beam search) with the process-wide RL tool."""
+    from .rl_model_tool import create_rl_model_tool
+
+    return create_rl_model_tool().generate_multiple_plans(num_plans=num_plans, **request)
+
+
+def run_default_plan_batch(
+    requests: List[Dict[str, Any]], planner_backend: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Plans for many target sets in one batched rollout with the process-wide RL tool."""
+    from .rl_model_tool import create_rl_model_tool
+
+    return create_rl_model_tool(planner_backend=planner_backend).run_batch(requests)
+
+
+class PlanningPool:
+    """Thread or process pool with bounded admission and per-call timeouts.
+
+    Args:
+        mode: ``"thread"`` or ``"process"``. Process mode needs picklable,
+            module-level callables and arguments.
+        max_workers: Concurrent planning calls.
+        max_queue: Calls allowed to wait for a free worker.
+        timeout_seconds: Per-call timeout.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 16,
+        timeout_seconds: float = 10.0,
+    ):
+        if mode not in POOL_MODES:
+            raise ValueError(f"mode must be one of {POOL_MODES}, got {mode!r}")
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError("max_workers must be >= 1 and max_queue >= 0")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "PlanningPool":
+        return cls(
+            mode=os.getenv("RL_POOL_MODE", "thread").lower(),
+            max_workers=int(os.getenv("RL_POOL_WORKERS", "2")),
+            max_queue=int(os.getenv("RL_POOL_QUEUE", "16")),
+            timeout_seconds=float(os.getenv("RL_POOL_TIMEOUT", "10")),
+        )
+
+    def start(self) -> Executor:
+        """Create the executor (idempotent)."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.mode == "process":
+                        # spawn: never fork a parent that already runs threads.
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=preload_worker,
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="rl-planning",
+                        )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Dispatch ``fn``; raises ``PlanningPoolSaturatedError`` when the pool is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise PlanningPoolSaturatedError(
+                f"planning pool saturated ({self.max_workers} workers, {self.max_queue} queued)"
+            )
+        with self._stats_lock:
+            self.in_flight += 1
+        try:
+            future = self.start().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # A slot is held until the call really finishes, including timed-out calls.
+        future.add_done_callback(lambda _f: self._release(completed=True))
+        return future
+
+    def _release(self, completed: bool = False) -> None:
+        with self._stats_lock:
+            self.in_flight -= 1
+            if completed:
+                self.completed += 1
+        self._slots.release()
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Blocking dispatch with the pool timeout."""
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            self._timed_out(future)
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Awaitable dispatch with the pool timeout; the event loop is never blocked."""
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self._timed_out(future)
+
+    def _timed_out(self, future: Future) -> None:
+        future.cancel()
+        with self._stats_lock:
+            self.timeouts += 1
+        raise PlanningTimeoutError(f"planning did not finish within {self.timeout_seconds}s")
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "mode": self.mode,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout_seconds,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+_pool: Optional[PlanningPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_planning_pool() -> PlanningPool:
+    """The process-wide planning pool, configured from ``RL_POOL_*`` (created on first use)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PlanningPool.from_env()
+    return _pool
@@ -1,20 +1,53 @@
 """RL-backed meal planning tool."""
 
 import json
+import logging
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union,
+)
 
 import numpy as np
 
+from ..rl.catalog import RecipeCatalog
 from ..rl.environment import MealPlanningEnv
-from ..rl.dqn import MaskableDQNAgent
+from ..rl.exact_planner import solve_exact
+from ..rl.local_search import refine_plan
+from ..rl.vec_env import VecMealPlanningEnv
+from ..rl.numpy_policy import POLICY_SUFFIX, NumpyDuelingPolicy
+from .plan_cache import PlanCache
+
+if TYPE_CHECKING:
+    from ..rl.dqn import MaskableDQNAgent
+    from .model_registry import ModelRegistry
+    from .planner_service import PlannerService
+
+Policy = Union["MaskableDQNAgent", NumpyDuelingPolicy]
+
+logger = logging.getLogger(__name__)
+
+
+def __getattr__(name: str):
+    # torch is only imported when a .pt checkpoint has no inference export.
+    if name == "MaskableDQNAgent":
+        from ..rl.dqn import MaskableDQNAgent
+
+        return MaskableDQNAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def default_project_root() -> Path:
+    return Path(__file__).parent.parent.parent.parent
 
 
 def resolve_model_path(project_root: Path) -> Path:
     models_dir = project_root / "models"
     candidates = (
         models_dir / "dqn_meal_best.pt",
+        models_dir / "dqn_meal_best.policy",
         models_dir / "dqn_meal_final.pt",
+        models_dir / "dqn_meal_final.policy",
     )
     for candidate in candidates:
         if candidate.exists():
@@ -23,31 +56,408 @@ def resolve_model_path(project_root: Path) -> Path:
     raise FileNotFoundError(f"未找到 DQN 模型文件，已检查: {checked_paths}")
 
 
+def quantize_requested() -> bool:
+    return os.getenv("RL_QUANTIZE", "").lower() in ("1", "true", "yes")
+
+
+PLANNER_BACKENDS = ("dqn", "exact")
+# The exact search stops after a fixed number of expanded nodes (~50 ms on a typical core),
+# so its result does not depend on load; the time limit is only a safety cutoff.
+EXACT_MAX_NODES = 32
+EXACT_SAFETY_LIMIT_MS = 1000.0
+# Refinement stops on convergence or the swap limit (typically < 10 swaps, ~0.4 ms each),
+# so plans are deterministic; the time limit only guards against pathological inputs.
+REFINE_MAX_SWAPS = 20
+REFINE_SAFETY_LIMIT_MS = 1000.0
+
+
+def planner_backend_requested() -> str:
+    return os.getenv("RL_PLANNER_BACKEND", "dqn").lower()
+
+
+def inference_export_path(model_path: Path) -> Optional[Path]:
+    """Inference-only export to serve from, if it is at least as new as the checkpoint."""
+    if model_path.suffix == POLICY_SUFFIX:
+        return model_path
+    export_path = model_path.with_suffix(POLICY_SUFFIX)
+    if export_path.exists() and export_path.stat().st_mtime >= model_path.stat().st_mtime:
+        return export_path
+    return None
+
+
+def load_policy(model_path: Path, quantize: bool = False) -> Tuple[Policy, str]:
+    """Load the policy to serve from ``model_path``; returns (policy, inference engine)."""
+    export_path = None if quantize else inference_export_path(model_path)
+    if export_path is not None:
+        # Memory-mapped; rejects exports trained against a different catalog.
+        return NumpyDuelingPolicy.load(export_path, catalog=RecipeCatalog.load()), "numpy"
+
+    from ..rl.dqn import MaskableDQNAgent
+
+    if quantize:
+        return MaskableDQNAgent.from_pretrained(str(model_path), quantize=True), "torch-int8"
+    return MaskableDQNAgent.from_pretrained(str(model_path)), "torch"
+
+
+MEAL_NAMES = ("breakfast", "lunch", "dinner")
+MAX_PLAN_STEPS = 20
+
+PlanResult = Tuple[Dict[str, int], Dict[str, Any], str]
+
+TARGET_KEYS = ("target_calories", "target_protein", "target_carbs", "target_fat", "max_budget")
+# ``RLModelTool._run`` keyword defaults, used to complete batch requests.
+REQUEST_DEFAULTS: Dict[str, Any] = {
+    "target_calories": 2000,
+    "target_protein": 100,
+    "target_carbs": 250,
+    "target_fat": 60,
+    "max_budget": 50.0,
+    "disliked_ingredients": None,
+    "preferred_tags": None,
+    "strict_budget": True,
+}
+
+
+def make_planning_env(
+    target_calories: float,
+    target_protein: float,
+    target_carbs: float,
+    target_fat: float,
+    max_budget: float,
+    disliked_ingredients: Optional[List[str]] = None,
+    strict_budget: bool = True,
+) -> MealPlanningEnv:
+    return MealPlanningEnv(
+        target_calories=target_calories,
+        target_protein=target_protein,
+        target_carbs=target_carbs,
+        target_fat=target_fat,
+        budget_limit=max_budget,
+        disliked_tags=disliked_ingredients or [],
+        training_mode=False,
+        strict_budget=strict_budget,
+    )
+
+
+def plan_slot(env: MealPlanningEnv, step_index: int) -> Optional[str]:
+    """Meal-plan key (e.g. ``lunch_1``) for the zero-based ``step_index``."""
+    meal_idx = step_index // env.items_per_meal
+    if meal_idx >= len(MEAL_NAMES):
+        return None
+    return f"{MEAL_NAMES[meal_idx]}_{step_index % env.items_per_meal}"
+
+
+def plan_metrics(totals: Sequence[float], targets: Sequence[float], final_reward: float) -> Dict[str, Any]:
+    """Metrics from (calories, protein, carbs, fat, cost) totals and the matching targets/budget."""
+    calories, protein, carbs, fat, cost = totals
+    return {
+        "total_calories": calories,
+        "total_protein": protein,
+        "total_carbs": carbs,
+        "total_fat": fat,
+        "total_cost": cost,
+        "final_reward": final_reward,
+        "calories_achievement": (calories / targets[0]) * 100,
+        "protein_achievement": (protein / targets[1]) * 100,
+        "budget_usage": (cost / targets[4]) * 100,
+    }
+
+
+def build_plan_metrics(env: MealPlanningEnv, final_reward: float) -> Dict[str, Any]:
+    return plan_metrics(
+        (env.total_calories, env.total_protein, env.total_carbs, env.total_fat, env.total_cost),
+        (env.target_calories, env.target_protein, env.target_carbs, env.target_fat, env.budget_limit),
+        final_reward,
+    )
+
+
+def rollout_plans(model: Policy, envs: List[MealPlanningEnv]) -> List[PlanResult]:
+    """Greedy rollouts for several episodes in lockstep, one batched forward per step."""
+    results: List[Optional[PlanResult]] = [None] * len(envs)
+    observations = [env.reset()[0] for env in envs]
+    meal_plans: List[Dict[str, int]] = [{} for _ in envs]
+    rewards = [0.0] * len(envs)
+    active = list(range(len(envs)))
+    steps = 0
+
+    while active and steps < MAX_PLAN_STEPS:
+        steps += 1
+        stepping, masks = [], []
+        for i in active:
+            action_masks = np.asarray(envs[i].action_masks(), dtype=bool)
+            if not action_masks.any():
+                results[i] = ({}, build_plan_metrics(envs[i], rewards[i]), "budget_infeasible")
+                continue
+            stepping.append(i)
+            masks.append(action_masks[: model.action_dim])
+        if not stepping:
+            break
+
+        actions = model.select_actions(
+            np.stack([observations[i] for i in stepping]).astype(np.float32),
+            np.stack(masks),
+            step=getattr(model, "train_step", 0),
+            deterministic=True,
+        )
+
+        active = []
+        for i, action in zip(stepping, actions):
+            env = envs[i]
+            observations[i], rewards[i], terminated, truncated, info = env.step(int(action))
+            if info.get("valid_action", False):
+                slot = plan_slot(env, steps - 1)
+                if slot is not None:
+                    meal_plans[i][slot] = int(action)
+            if terminated or truncated:
+                results[i] = (meal_plans[i], build_plan_metrics(env, rewards[i]), "ok")
+            else:
+                active.append(i)
+
+    for i in active:
+        results[i] = (meal_plans[i], build_plan_metrics(envs[i], rewards[i]), "ok")
+    return results
+
+
+def rollout_batch(
+    model: Policy,
+    targets: np.ndarray,
+    disliked_ingredients: Optional[List[str]] = None,
+    strict_budget: bool = True,
+) -> List[PlanResult]:
+    """Greedy rollouts for ``targets`` [N, 5] (calories, protein, carbs, fat, budget).
+
+    All episodes share one vectorized env: every step computes the N masks
+    with one array op and runs one batched Q forward for the episodes
+    that still have an action. Episodes whose mask empties end as
+    ``budget_infeasible``.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    n = len(targets)
+    vec_env = VecMealPlanningEnv(
+        n,
+        target_calories=targets[:, 0],
+        target_protein=targets[:, 1],
+        target_carbs=targets[:, 2],
+        target_fat=targets[:, 3],
+        budget_limit=targets[:, 4],
+        disliked_tags=disliked_ingredients or [],
+        training_mode=False,
+        strict_budget=strict_budget,
+    )
+    observations, _info = vec_env.reset()
+    results: List[Optional[PlanResult]] = [None] * n
+    meal_plans: List[Dict[str, int]] = [{} for _ in range(n)]
+    rewards = np.zeros(n, dtype=np.float64)
+    active = np.ones(n, dtype=bool)
+
+    for step_index in range(vec_env.max_steps):
+        masks = vec_env.action_masks()
+        stuck = active & ~masks.any(axis=1)
+        for i in np.flatnonzero(stuck):
+            metrics = plan_metrics(
+                vec_env.totals[i].tolist(), targets[i].tolist(), float(rewards[i])
+            )
+            results[i] = ({}, metrics, "budget_infeasible")
+        active &= ~stuck
+        if not active.any():
+            break
+
+        # Finished rows take an out-of-range action; their auto-reset episodes are ignored.
+        actions = np.full(n, -1, dtype=np.int64)
+        actions[active] = model.select_actions(
+            observations[active],
+            masks[active, : model.action_dim],
+            step=getattr(model, "train_step", 0),
+            deterministic=True,
+        )
+        observations, step_rewards, terminated, _truncated, infos = vec_env.step(actions)
+
+        slot = plan_slot(vec_env, step_index)
+        for i in np.flatnonzero(active):
+            meal_plans[i][slot] = int(actions[i])
+        rewards[active] = step_rewards[active]
+        for i in np.flatnonzero(active & terminated):
+            metrics = plan_metrics(
+                infos["final_totals"][i].tolist(), targets[i].tolist(), float(rewards[i])
+            )
+            results[i] = (meal_plans[i], metrics, "ok")
+        active &= ~terminated
+
+    return results
+
+
+def replay_plan(env: MealPlanningEnv, actions: List[int]) -> PlanResult:
+    """Step a fresh episode through ``actions``; metrics and reward come from the env itself."""
+    env.reset()
+    meal_plan: Dict[str, int] = {}
+    reward = 0.0
+    for step_index, action in enumerate(actions):
+        _obs, reward, _terminated, _truncated, info = env.step(int(action))
+        slot = plan_slot(env, step_index)
+        if info.get("valid_action", False) and slot is not None:
+            meal_plan[slot] = int(action)
+    return meal_plan, build_plan_metrics(env, reward), "ok"
+
+
+class _Beam(NamedTuple):
+    env: MealPlanningEnv
+    obs: np.ndarray
+    actions: Tuple[int, ...]
+    collected: float
+    reward: float
+
+
+def _plan_signature(env: MealPlanningEnv, actions: Tuple[int, ...]) -> Tuple:
+    """Order-insensitive within a meal: (a, b) and (b, a) for lunch are the same plan."""
+    per_meal = env.items_per_meal
+    return tuple(
+        tuple(sorted(actions[start:start + per_meal]))
+        for start in range(0, len(actions), per_meal)
+    )
+
+
+def beam_search_plans(
+    model: Policy,
+    env: MealPlanningEnv,
+    num_plans: int = 3,
+    beam_width: int = 8,
+    branch_factor: int = 4,
+    min_changes: int = 2,
+) -> List[PlanResult]:
+    """Up to ``num_plans`` distinct plans, best final env reward first.
+
+    Every step scores all live beams with one batched Q evaluation. A child
+    is ranked by the step rewards collected so far plus Q(s, a). The top
+    ``branch_factor`` actions of each beam compete for ``beam_width`` slots.
+    Children that repeat an already kept plan (same dishes per meal, in any
+    order) are skipped. Beams whose mask empties under a strict budget are
+    dropped. Among the completed plans, those that swap at least
+    ``min_changes`` dishes relative to every plan already picked are
+    preferred, so the alternatives are not one-dish variations of each other.
+    """
+    beam_width = max(beam_width, num_plans)
+    obs, _info = env.reset()
+    beams = [_Beam(env, obs, (), 0.0, 0.0)]
+
+    for _ in range(env.max_steps):
+        live, masks = [], []
+        for beam in beams:
+            action_masks = np.asarray(beam.env.action_masks(), dtype=bool)
+            if action_masks.any():
+                live.append(beam)
+                masks.append(action_masks[: model.action_dim])
+        if not live:
+            return []
+
+        q_values = model.get_action_values(
+            np.stack([beam.obs for beam in live]).astype(np.float32), np.stack(masks)
+        )
+        candidates = []
+        for row, (beam, q_row) in enumerate(zip(live, q_values)):
+            valid = np.flatnonzero(np.isfinite(q_row))
+            top = valid[np.argsort(-q_row[valid], kind="stable")[:branch_factor]]
+            candidates.extend((beam.collected + float(q_row[a]), row, int(a)) for a in top)
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        beams, seen = [], set()
+        for _score, row, action in candidates:
+            parent = live[row]
+            actions = parent.actions + (action,)
+            signature = _plan_signature(parent.env, actions)
+            if signature in seen:
+                continue
+            seen.add(signature)
+            child = parent.env.clone()
+            child_obs, reward, _terminated, _truncated, _info = child.step(action)
+            beams.append(_Beam(child, child_obs, actions, parent.collected + reward, reward))
+            if len(beams) >= beam_width:
+                break
+
+    beams.sort(key=lambda beam: -beam.reward)
+    # Prefer plans that differ from every pick by min_changes dishes, then fill up.
+    picked: List[_Beam] = []
+    for beam in beams:
+        if len(picked) < num_plans and all(
+            len(set(beam.actions) ^ set(other.actions)) // 2 >= min_changes for other in picked
+        ):
+            picked.append(beam)
+    picked += [beam for beam in beams if beam not in picked][: num_plans - len(picked)]
+    picked.sort(key=lambda beam: -beam.reward)
+
+    results = []
+    for beam in picked:
+        meal_plan = {}
+        for step_index, action in enumerate(beam.actions):
+            slot = plan_slot(beam.env, step_index)
+            if slot is not None:
+                meal_plan[slot] = action
+        results.append((meal_plan, build_plan_metrics(beam.env, beam.reward), "ok"))
+    return results
+
+
 class RLModelTool:
     """Load the trained DQN model and produce a meal plan JSON payload."""
 
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        registry: Optional["ModelRegistry"] = None,
+        plan_cache: Optional[PlanCache] = None,
+        planner: Optional["PlannerService"] = None,
+        planner_backend: Optional[str] = None,
+        exact_max_nodes: int = EXACT_MAX_NODES,
+        refine_max_swaps: Optional[int] = None,
+    ):
         self.name = "强化学习配餐模型"
         self.description = (
             "使用训练好的 DQN 模型生成一日三餐方案，"
             "输入营养目标、预算和饮食限制，返回结构化结果。"
         )
 
+        # "exact": branch-and-bound over the reward function, DQN as the fallback.
+        self.backend = planner_backend_requested() if planner_backend is None else planner_backend
+        if self.backend not in PLANNER_BACKENDS:
+            raise ValueError(f"planner_backend must be one of {PLANNER_BACKENDS}, got {self.backend!r}")
+        self.exact_max_nodes = exact_max_nodes
+        # Local-search post-processing of DQN plans; None disables it.
+        self.refine_max_swaps = refine_max_swaps
+        # Opt-in int8 torch inference; takes precedence over a .policy export.
+        self.quantize = quantize_requested() if quantize is None else quantize
+        self.inference_engine: Optional[str] = None
+        self.model: Optional[Policy] = None
+        self.model_version: Optional[str] = None
+        self.env: Optional[MealPlanningEnv] = None
+        # Plans are computed on quantized targets, shared across tools and
+        # re-scored against each caller's own targets.
+        self.plan_cache = plan_cache
+        # Micro-batches this tool's rollouts with other concurrent requests.
+        self.planner = planner
+
+        # A registry-backed tool shares the process-wide policy and picks up hot reloads.
+        self.registry = registry
+        self.model_path: Optional[Path] = None
+        if registry is not None:
+            self._load_model()
+            return
+
         if model_path is None:
-            project_root = Path(__file__).parent.parent.parent.parent
-            model_path = resolve_model_path(project_root)
+            model_path = resolve_model_path(default_project_root())
 
         self.model_path = Path(model_path)
         if not self.model_path.exists():
             raise FileNotFoundError(f"模型文件不存在: {self.model_path}")
 
-        self.backend = "dqn"
-        self.model: Optional[MaskableDQNAgent] = None
-        self.env: Optional[MealPlanningEnv] = None
-
     def _load_model(self) -> None:
+        if self.registry is not None:
+            loaded = self.registry.get()
+            self.model = loaded.model
+            self.inference_engine = loaded.engine
+            self.model_path = loaded.path
+            self.model_version = loaded.version
+            return
         if self.model is None:
-            self.model = MaskableDQNAgent.from_pretrained(str(self.model_path))
+            self.model, self.inference_engine = load_policy(self.model_path, self.quantize)
 
     def _run(
         self,
@@ -61,21 +471,115 @@ class RLModelTool:
         strict_budget: bool = True,
     ) -> str:
         self._load_model()
-
-        self.env = MealPlanningEnv(
+        request = dict(
             target_calories=target_calories,
             target_protein=target_protein,
             target_carbs=target_carbs,
             target_fat=target_fat,
-            budget_limit=max_budget,
-            disliked_tags=disliked_ingredients or [],
-            training_mode=False,
+            max_budget=max_budget,
+            disliked_ingredients=disliked_ingredients,
             strict_budget=strict_budget,
         )
 
-        meal_plan, metrics, status = self._generate_meal_plan()
+        if self.plan_cache is None:
+            plan = self._plan(**request)
+        else:
+            targets = self.plan_cache.quantize_targets(
+                target_calories, target_protein, target_carbs, target_fat, max_budget,
+                strict_budget=strict_budget,
+            )
+            key = self.plan_cache.make_key(
+                targets,
+                disliked_ingredients,
+                strict_budget,
+                model_version=self._plan_version(),
+                catalog_version=RecipeCatalog.load().version,
+            )
+            shared = self.plan_cache.get_or_compute(
+                key,
+                lambda: self._plan(
+                    disliked_ingredients=disliked_ingredients,
+                    strict_budget=strict_budget,
+                    **targets,
+                ),
+            )
+            plan = self._rescore(shared, **request)
+            if plan is None:
+                plan = self._plan(**request)
+
+        result = self._payload(
+            plan,
+            target_calories, target_protein, target_carbs, target_fat, max_budget,
+            preferred_tags,
+        )
+        return json.dumps(result, ensure_ascii=False, indent=2)
+
+    def _plan_version(self) -> str:
+        """Everything besides the request that decides the plan: backend, model and search limits."""
+        return (
+            f"{self.backend}:{self.model_version or self.model_path}"
+            f":nodes={self.exact_max_nodes}:swaps={self.refine_max_swaps}"
+        )
+
+    def run_batch(self, requests: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Payloads (``_run`` format plus ``index``) for many target sets, in input order.
+
+        Each request takes ``_run``'s keyword arguments. With the DQN
+        backend, requests that share disliked ingredients and budget mode
+        are rolled out together by ``rollout_batch``. Each payload's
+        ``status`` is ``ok`` or ``budget_infeasible``. The plan cache is
+        bypassed.
+        """
+        self._load_model()
+        completed = []
+        for request in requests:
+            unknown = set(request) - set(REQUEST_DEFAULTS)
+            if unknown:
+                raise ValueError(f"Unknown plan request fields: {sorted(unknown)}")
+            completed.append({**REQUEST_DEFAULTS, **request})
+
+        plans: List[Optional[PlanResult]] = [None] * len(completed)
+        if self.backend == "exact":
+            for index, request in enumerate(completed):
+                plans[index] = self._plan(**self._planning_args(request))
+        else:
+            groups: Dict[Tuple[Tuple[str, ...], bool], List[int]] = {}
+            for index, request in enumerate(completed):
+                key = (tuple(sorted(request["disliked_ingredients"] or [])), bool(request["strict_budget"]))
+                groups.setdefault(key, []).append(index)
+            for (disliked, strict_budget), indices in groups.items():
+                targets = np.array([[completed[i][key] for key in TARGET_KEYS] for i in indices])
+                group_plans = rollout_batch(self.model, targets, list(disliked), strict_budget)
+                for index, plan in zip(indices, group_plans):
+                    plans[index] = plan
+
+        payloads = []
+        for index, (request, plan) in enumerate(zip(completed, plans)):
+            if self.backend != "exact" and self.refine_max_swaps is not None:
+                plan = self._refine(plan, **self._planning_args(request))
+            payload = self._payload(
+                plan, *(request[key] for key in TARGET_KEYS), request["preferred_tags"]
+            )
+            payload["index"] = index
+            payloads.append(payload)
+        return payloads
+
+    @staticmethod
+    def _planning_args(request: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in request.items() if key != "preferred_tags"}
 
-        result = {
+    @staticmethod
+    def _payload(
+        plan: PlanResult,
+        target_calories: float,
+        target_protein: float,
+        target_carbs: float,
+        target_fat: float,
+        max_budget: float,
+        preferred_tags: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        meal_plan, metrics, status = plan
+        return {
             "status": status,
             "meal_plan": meal_plan,
             "metrics": metrics,
@@ -88,21 +592,141 @@ class RLModelTool:
                 "preferred_tags": preferred_tags or [],
             },
         }
-        return json.dumps(result, ensure_ascii=False, indent=2)
 
-    def _generate_meal_plan(self) -> Tuple[Dict[str, int], Dict[str, Any], str]:
+    def _plan(
+        self,
+        target_calories: float,
+        target_protein: float,
+        target_carbs: float,
+        target_fat: float,
+        max_budget: float,
+        disliked_ingredients: Optional[List[str]],
+        strict_budget: bool,
+    ) -> PlanResult:
+        request = dict(
+            target_calories=target_calories,
+            target_protein=target_protein,
+            target_carbs=target_carbs,
+            target_fat=target_fat,
+            max_budget=max_budget,
+            disliked_ingredients=disliked_ingredients,
+            strict_budget=strict_budget,
+        )
+        if self.backend == "exact":
+            return self._plan_exact(**request)
+        return self._plan_dqn(**request)
+
+    def _plan_exact(self, **request: Any) -> PlanResult:
+        """Exact plan within ``exact_max_nodes``; the DQN plan when the search is cut short.
+
+        A search that hits the node limit keeps the better of its incumbent
+        and the DQN plan, so the exact backend never does worse than the DQN.
+        """
+        env = make_planning_env(**request)
+        env.reset()
+        exact = solve_exact(
+            env, time_limit_ms=EXACT_SAFETY_LIMIT_MS, max_nodes=self.exact_max_nodes
+        )
+        if exact is not None and exact.optimal:
+            return replay_plan(env, exact.actions)
+
+        fallback = self._plan_dqn(**request)
+        if exact is not None and (
+            fallback[2] != "ok" or exact.reward > fallback[1]["final_reward"]
+        ):
+            return replay_plan(env, exact.actions)
+        return fallback
+
+    def _plan_dqn(
+        self,
+        target_calories: float,
+        target_protein: float,
+        target_carbs: float,
+        target_fat: float,
+        max_budget: float,
+        disliked_ingredients: Optional[List[str]],
+        strict_budget: bool,
+    ) -> PlanResult:
+        request = dict(
+            target_calories=target_calories,
+            target_protein=target_protein,
+            target_carbs=target_carbs,
+            target_fat=target_fat,
+            max_budget=max_budget,
+            disliked_ingredients=disliked_ingredients,
+            strict_budget=strict_budget,
+        )
+        if self.planner is not None:
+            plan = self.planner.plan(**request)
+        else:
+            self.env = make_planning_env(**request)
+            plan = self._generate_meal_plan()
+        if self.refine_max_swaps is None:
+            return plan
+        return self._refine(plan, **request)
+
+    def _refine(self, plan: PlanResult, **request: Any) -> PlanResult:
+        """Improve a complete DQN plan by single-dish swaps; metrics record the reward gained."""
+        meal_plan, _metrics, status = plan
+        env = make_planning_env(**request)
+        slots = [plan_slot(env, step_index) for step_index in range(env.max_steps)]
+        if status != "ok" or any(slot not in meal_plan for slot in slots):
+            return plan
+
+        env.reset()
+        refined = refine_plan(
+            env,
+            [meal_plan[slot] for slot in slots],
+            time_limit_ms=REFINE_SAFETY_LIMIT_MS,
+            max_swaps=self.refine_max_swaps,
+        )
+        meal_plan, metrics, status = replay_plan(env, refined.actions)
+        metrics["refinement"] = {
+            "initial_reward": refined.initial_reward,
+            "reward_gain": refined.reward_gain,
+            "swaps": refined.swaps,
+            "converged": refined.converged,
+        }
+        logger.debug(
+            "Refined plan: %d swaps, reward %.2f -> %.2f in %.1f ms",
+            refined.swaps, refined.initial_reward, refined.reward, refined.elapsed_ms,
+        )
+        return meal_plan, metrics, status
+
+    @staticmethod
+    def _rescore(plan: PlanResult, **request: Any) -> Optional[PlanResult]:
+        """Replay a cached plan against the caller's own targets.
+
+        Metrics, reward and status are recomputed for ``request``. Returns
+        None when the plan is incomplete or, under a strict budget, costs
+        more than the caller's budget; the caller then plans directly.
+        """
+        meal_plan, metrics, status = plan
+        env = make_planning_env(**request)
+        slots = [plan_slot(env, step_index) for step_index in range(env.max_steps)]
+        if status != "ok" or any(slot not in meal_plan for slot in slots):
+            return None
+
+        meal_plan, rescored, status = replay_plan(env, [meal_plan[slot] for slot in slots])
+        if len(meal_plan) != len(slots):
+            return None
+        if request["strict_budget"] and rescored["total_cost"] > request["max_budget"]:
+            return None
+        if "refinement" in metrics:
+            rescored["refinement"] = metrics["refinement"]
+        return meal_plan, rescored, status
+
+    def _generate_meal_plan(self) -> PlanResult:
         if self.env is None or self.model is None:
             raise RuntimeError("Model tool is not initialized")
 
         obs, _info = self.env.reset()
         meal_plan: Dict[str, int] = {}
-        meal_names = ["breakfast", "lunch", "dinner"]
         done = False
         reward = 0.0
         current_steps = 0
-        max_steps_safety = 20
 
-        while not done and current_steps < max_steps_safety:
+        while not done and current_steps < MAX_PLAN_STEPS:
             current_steps += 1
 
             action_masks = np.asarray(self.env.action_masks(), dtype=bool)
@@ -122,41 +746,75 @@ class RLModelTool:
             done = terminated or truncated
 
             if info.get("valid_action", False):
-                step_idx_zero_based = current_steps - 1
-                meal_idx = step_idx_zero_based // self.env.items_per_meal
-                if meal_idx < len(meal_names):
-                    key = f"{meal_names[meal_idx]}_{step_idx_zero_based % self.env.items_per_meal}"
-                    meal_plan[key] = int(action)
+                slot = plan_slot(self.env, current_steps - 1)
+                if slot is not None:
+                    meal_plan[slot] = int(action)
 
         return meal_plan, self._build_metrics(final_reward=reward), "ok"
 
     def _build_metrics(self, final_reward: float) -> Dict[str, Any]:
         if self.env is None:
             raise RuntimeError("Environment is not initialized")
-
-        return {
-            "total_calories": self.env.total_calories,
-            "total_protein": self.env.total_protein,
-            "total_carbs": self.env.total_carbs,
-            "total_fat": self.env.total_fat,
-            "total_cost": self.env.total_cost,
-            "final_reward": final_reward,
-            "calories_achievement": (self.env.total_calories / self.env.target_calories)
-            * 100,
-            "protein_achievement": (self.env.total_protein / self.env.target_protein)
-            * 100,
-            "budget_usage": (self.env.total_cost / self.env.budget_limit) * 100,
-        }
+        return build_plan_metrics(self.env, final_reward)
 
     def generate_multiple_plans(
-        self, num_plans: int = 3, **kwargs
+        self,
+        num_plans: int = 3,
+        target_calories: int = 2000,
+        target_protein: int = 100,
+        target_carbs: int = 250,
+        target_fat: int = 60,
+        max_budget: float = 50.0,
+        disliked_ingredients: Optional[List[str]] = None,
+        preferred_tags: Optional[List[str]] = None,
+        strict_budget: bool = True,
+        beam_width: int = 8,
     ) -> List[Dict[str, Any]]:
-        plans = []
-        for _ in range(num_plans):
-            result = json.loads(self._run(**kwargs))
-            plans.append(result)
-        return plans
+        """Up to ``num_plans`` distinct payloads (``_run`` format) from one beam search.
+
+        Best final reward first; falls back to the single greedy plan when no
+        beam completes (e.g. a strict budget that only the greedy path fits).
+        """
+        self._load_model()
+        env = make_planning_env(
+            target_calories=target_calories,
+            target_protein=target_protein,
+            target_carbs=target_carbs,
+            target_fat=target_fat,
+            max_budget=max_budget,
+            disliked_ingredients=disliked_ingredients,
+            strict_budget=strict_budget,
+        )
+        targets = (target_calories, target_protein, target_carbs, target_fat, max_budget)
+        plans = beam_search_plans(self.model, env, num_plans=num_plans, beam_width=beam_width)
+        if not plans:
+            return [
+                json.loads(
+                    self._run(
+                        *targets,
+                        disliked_ingredients=disliked_ingredients,
+                        preferred_tags=preferred_tags,
+                        strict_budget=strict_budget,
+                    )
+                )
+            ]
+        return [self._payload(plan, *targets, preferred_tags) for plan in plans]
 
 
-def create_rl_model_tool(model_path: Optional[str] = None) -> RLModelTool:
-    return RLModelTool(model_path=model_path)
+def create_rl_model_tool(
+    model_path: Optional[str] = None, planner_backend: Optional[str] = None
+) -> RLModelTool:
+    """Tool for ``model_path``, or one on the shared registry, plan cache and planner by default."""
+    if model_path is None:
+        from .model_registry import get_model_registry
+        from .plan_cache import get_plan_cache
+        from .planner_service import get_planner_service
+
+        return RLModelTool(
+            registry=get_model_registry(),
+            plan_cache=get_plan_cache(),
+            planner=get_planner_service(),
+            planner_backend=planner_backend,
+            refine_max_swaps=REFINE_MAX_SWAPS,
+        )
+    return RLModelTool(model_path=model_path, planner_backend=planner_backend)
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from intelligent_meal_planner.api.schemas import UserPreferences
+from intelligent_meal_planner.api.services import (
+    BudgetGuardService,
+    MealPlanService,
+    StrictBudgetPlanner,
+)
+from intelligent_meal_planner.tools import planning_pool
+
+
+class _RecordingPool:
+    def __init__(self, status="ok"):
+        self.calls = []
+        self.status = status
+
+    def run(self, fn, *args, **kwargs):
+        self.calls.append((fn, args, kwargs))
+        payload = {"meal_plan": {}, "metrics": {}, "status": self.status}
+        if fn is planning_pool.run_default_plan_batch:
+            return [payload for _ in args[0]]
+        return json.dumps(payload)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    recording = _RecordingPool()
+    monkeypatch.setattr(planning_pool, "get_planning_pool", lambda: recording)
+    return recording
+
+
+def _targets(calories, protein, carbs, fat):
+    return dict(
+        target_calories=calories, target_protein=protein, target_carbs=carbs, target_fat=fat
+    )
+
+
+def test_strict_planner_rejects_unaffordable_budget_without_rollout(pool):
+    with pytest.raises(ValueError, match="budget_infeasible"):
+        StrictBudgetPlanner().generate("maintain", 10.0, [], [], _targets(2000, 100, 250, 60))
+    assert pool.calls == []
+
+
+def test_strict_planner_warns_on_affordable_but_conflicting_targets(pool):
+    planner = StrictBudgetPlanner()
+
+    # 预算足够凑齐三餐；各项单独可达，但无法在同一方案中同时达到
+    plan = planner.generate("maintain", 112.0, [], [], _targets(2736, 194, 354, 22))
+    assert len(pool.calls) == 1
+    assert "无法在同一方案中同时达到" in plan["warning"]
+
+    plan = planner.generate("maintain", 80.0, [], [], _targets(2000, 100, 250, 60))
+    assert len(pool.calls) == 2
+    assert plan["warning"] is None
+
+
+def test_generate_plan_skips_rollout_below_min_plan_cost(pool):
+    guard = BudgetGuardService()
+    assert not guard.has_plan(10.0) and guard.has_plan(50.0)
+
+    plan = MealPlanService().generate_plan(UserPreferences(max_budget=10.0))
+
+    assert plan.meals == [] and plan.nutrition.total_price == 0
+    assert pool.calls == []
+
+
+def test_batch_sends_only_plannable_items_to_the_pool(pool):
+    items = [
+        UserPreferences(max_budget=10.0),
+        UserPreferences(max_budget=80.0),
+        UserPreferences(max_budget=12.0),
+    ]
+
+    rows = list(MealPlanService().generate_plan_batch(items))
+
+    assert [row.status for row in rows] == ["budget_infeasible", "ok", "budget_infeasible"]
+    assert [len(args[0]) for _fn, args, _kwargs in pool.calls] == [1]
+    assert pool.calls[0][1][0][0]["max_budget"] == 80.0
+
+    pool.calls.clear()
+    rows = list(MealPlanService().generate_plan_batch(items[:1]))
+    assert rows[0].status == "budget_infeasible" and pool.calls == []
@@ -0,0 +1,189 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.api.feasibility import FeasibilityService, NUTRIENTS
+
+MEAL_TYPE_CHOICES = (
+    ["breakfast"], ["lunch"], ["dinner"], ["lunch", "dinner"],
+    ["breakfast", "lunch"], ["breakfast", "lunch", "dinner"],
+)
+TAG_CHOICES = ["spicy", "meat", "seafood", "light"]
+
+
+def _random_recipes(seed, count=9):
+    rng = random.Random(seed)
+    return [
+        {
+            "price": rng.choice([1.5, 2, 3, 4.5, 6, 8]),
+            "calories": rng.randint(100, 800),
+            "protein": rng.randint(1, 50),
+            "carbs": rng.randint(1, 90),
+            "fat": rng.randint(1, 40),
+            "meal_type": rng.choice(MEAL_TYPE_CHOICES),
+            "tags": rng.sample(TAG_CHOICES, rng.randint(0, 2)),
+        }
+        for _ in range(count)
+    ]
+
+
+def _brute_force(recipes, budget):
+    def pairs(meal_type):
+        return [
+            pair for pair in itertools.combinations(range(len(recipes)), 2)
+            if all(meal_type in recipes[i]["meal_type"] for i in pair)
+        ]
+
+    best = {name: 0 for name in NUTRIENTS}
+    for plan in itertools.product(pairs("breakfast"), pairs("lunch"), pairs("dinner")):
+        dishes = {i for pair in plan for i in pair}
+        if len(dishes) < 6 or sum(recipes[i]["price"] for i in dishes) > budget:
+            continue
+        for name in NUTRIENTS:
+            best[name] = max(best[name], sum(recipes[i][name] for i in dishes))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_frontier_matches_brute_force(seed):
+    recipes = _random_recipes(seed)
+    service = FeasibilityService(recipes)
+
+    for budget in np.arange(0.0, 45.0, 0.75):
+        assert service.get_max_achievable(budget) == _brute_force(recipes, budget)
+
+
+def test_catalog_frontier_is_monotone_and_needs_a_full_plan():
+    service = FeasibilityService()
+    min_cost = service.min_plan_cost
+
+    assert service.get_max_achievable(min_cost - 0.5) == {name: 0 for name in NUTRIENTS}
+    previous = service.get_max_achievable(min_cost)
+    assert previous["calories"] > 0
+    for budget in np.arange(min_cost, 250.0, 2.5):
+        current = service.get_max_achievable(budget)
+        assert all(current[name] >= previous[name] for name in NUTRIENTS)
+        previous = current
+
+
+def test_budget_below_a_full_plan_warns():
+    service = FeasibilityService()
+
+    result = service.check_feasibility(service.min_plan_cost - 1, 2000, 100, 250, 60)
+
+    assert result.has_warning
+    assert result.calories_feasibility == 0
+    assert f"{service.min_plan_cost:.1f}" in result.warning_message
+
+
+def test_recipes_that_cannot_fill_three_meals():
+    service = FeasibilityService([r for r in _random_recipes(0) if r["meal_type"] == ["breakfast"]])
+
+    assert service.min_plan_cost is None
+    assert service.get_max_achievable(500.0) == {name: 0 for name in NUTRIENTS}
+
+
+def _brute_force_joint(recipes, budget, targets):
+    def pairs(meal_type):
+        return [
+            pair for pair in itertools.combinations(range(len(recipes)), 2)
+            if all(meal_type in recipes[i]["meal_type"] for i in pair)
+        ]
+
+    for plan in itertools.product(pairs("breakfast"), pairs("lunch"), pairs("dinner")):
+        dishes = {i for pair in plan for i in pair}
+        if len(dishes) < 6 or sum(recipes[i]["price"] for i in dishes) > budget:
+            continue
+        if all(sum(recipes[i][name] for i in dishes) >= t for name, t in zip(NUTRIENTS, targets)):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_certain_joint_answers_match_brute_force(seed):
+    recipes = _random_recipes(seed, count=10)
+    service = FeasibilityService(recipes)
+    rng = np.random.default_rng(seed)
+
+    for _ in range(20):
+        budget = float(rng.uniform(5, 45))
+        targets = (
+            int(rng.integers(500, 4000)), int(rng.integers(10, 250)),
+            int(rng.integers(10, 450)), int(rng.integers(5, 200)),
+        )
+        result = service.check_joint_feasibility(budget, *targets)
+        truth = _brute_force_joint(recipes, budget, targets)
+        if result.confidence == "certain":
+            assert result.feasible == truth
+        else:
+            # LP 松弛只能排除不可行，不会把可行方案判为不可行
+            assert result.feasible
+
+
+def test_individually_reachable_targets_that_conflict():
+    service = FeasibilityService()
+    targets = (2736, 194, 354, 22)
+
+    result = service.check_feasibility(112.0, *targets)
+
+    assert result.protein_feasibility == result.carbs_feasibility == 100
+    assert not result.jointly_feasible and result.joint_confidence == "certain"
+    assert "同时达到" in result.warning_message
+
+
+def test_joint_results_are_memoized_per_price_grid():
+    service = FeasibilityService()
+
+    first = service.check_joint_feasibility(80.2, 2000, 100, 250, 60)
+    second = service.check_joint_feasibility(80.4, 2000, 100, 250, 60)
+
+    assert first.feasible and first.confidence == "certain"
+    assert (second.feasible, second.confidence) == (first.feasible, first.confidence)
+    assert service.frontier()._joint_cached.cache_info().hits == 1
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_dislikes_exclude_tagged_recipes(seed):
+    recipes = _random_recipes(seed, count=12)
+    service = FeasibilityService(recipes)
+    allowed = [r for r in recipes if not {"meat", "spicy"} & set(r["tags"])]
+
+    for budget in (10, 20, 30, 45):
+        assert service.get_max_achievable(budget, ["meat", "spicy"]) == _brute_force(allowed, budget)
+        assert service.get_max_achievable(budget) == _brute_force(recipes, budget)
+
+
+def test_frontiers_are_shared_across_tag_orderings():
+    service = FeasibilityService()
+
+    first = service.frontier(["spicy", "sichuan"])
+    second = service.frontier(["sichuan", "spicy", "not-a-tag"])
+
+    assert first is second
+    assert service.frontier(["not-a-tag"]) is service.frontier()
+    info = service.frontier_cache_info()
+    assert (info["misses"], info["size"]) == (2, 2)
+
+
+def test_frontier_cache_is_bounded():
+    service = FeasibilityService(_random_recipes(0, count=12), max_frontiers=2)
+
+    default = service.frontier()
+    service.frontier(["meat"])
+    service.frontier(["spicy"])
+
+    assert service.frontier_cache_info()["size"] == 2
+    assert service.frontier() is not default
+
+
+def test_feasibility_warns_when_dislikes_raise_cost():
+    service = FeasibilityService()
+    budget = service.min_plan_cost
+    dislikes = ["spicy", "noodle", "home-style", "guangdong", "sichuan"]
+
+    assert not service.check_feasibility(budget, 0, 0, 0, 0).has_warning
+    result = service.check_feasibility(budget, 0, 0, 0, 0, disliked_foods=dislikes)
+
+    assert result.has_warning and "凑齐一日三餐" in result.warning_message
@@ -325,3 +325,25 @@ def test_update_session_presentation_returns_overlay_state(client, auth_header,
     assert response.status_code == 200
     assert response.json()["presentation"]["overlay_state"] == "hidden"
     assert response.json()["presentation"]["has_result_overlay"] is False
+
+
+def test_generate_session_returns_429_when_planner_is_saturated(
+    client, auth_header, monkeypatch
+):
+    from intelligent_meal_planner.tools.planning_pool import PlanningPoolSaturatedError
+
+    def saturated(db, user, session_id):
+        raise PlanningPoolSaturatedError("planning pool saturated")
+
+    monkeypatch.setattr(
+        "intelligent_meal_planner.api.routers.meal_chat.meal_chat_app.generate_session",
+        saturated,
+    )
+
+    response = client.post(
+        "/api/meal-chat/sessions/session001/generate",
+        headers=auth_header,
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,56 @@
+import json
+
+from intelligent_meal_planner.api.services import meal_plan_service
+from intelligent_meal_planner.tools import model_registry
+
+
+def test_batch_streams_one_ndjson_line_per_item(
+    client, auth_header, tmp_path, monkeypatch, write_policy
+):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    monkeypatch.setattr(model_registry, "_registry", model_registry.ModelRegistry(model_path=str(path)))
+    items = [
+        {"target_calories": 2000, "max_budget": 80},
+        {"target_calories": 1800, "target_protein": 120, "max_budget": 10, "disliked_foods": ["辣"]},
+        {"target_calories": 2500, "target_protein": 130, "max_budget": 150},
+    ]
+    history = dict(meal_plan_service._history)
+
+    response = client.post("/api/meal-plans/batch", headers=auth_header, json={"items": items})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert [line["status"] for line in lines] == ["ok", "budget_infeasible", "ok"]
+    assert lines[1]["meal_plan"] is None
+    for line, item in zip((lines[0], lines[2]), (items[0], items[2])):
+        assert line["meal_plan"]["meals"]
+        assert line["meal_plan"]["nutrition"]["total_price"] <= item["max_budget"]
+        assert line["meal_plan"]["target"]["target_calories"] == item["target_calories"]
+    # 批量结果不进入方案历史
+    assert meal_plan_service._history == history
+
+
+def test_batch_returns_429_when_planner_is_saturated(client, auth_header, monkeypatch):
+    from intelligent_meal_planner.tools.planning_pool import PlanningPoolSaturatedError
+
+    def saturated(preferences_list):
+        raise PlanningPoolSaturatedError("planning pool saturated")
+        yield
+
+    monkeypatch.setattr(
+        "intelligent_meal_planner.api.routers.meal_plans.meal_plan_service.generate_plan_batch",
+        saturated,
+    )
+
+    response = client.post("/api/meal-plans/batch", headers=auth_header, json={"items": [{}]})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_batch_rejects_empty_requests(client, auth_header):
+    response = client.post("/api/meal-plans/batch", headers=auth_header, json={"items": []})
+
+    assert response.status_code == 422
@@ -0,0 +1,29 @@
+import os
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.numpy_policy import NumpyDuelingPolicy
+
+
+def _write_policy(path, seed=0, mtime_ns=None, action_dim=300):
+    rng = np.random.default_rng(seed)
+    shapes = {
+        "feature.0": (16, 13), "feature.2": (16, 16),
+        "value_stream.0": (8, 16), "value_stream.2": (1, 8),
+        "advantage_stream.0": (8, 16), "advantage_stream.2": (action_dim, 8),
+    }
+    weights = {}
+    for name, shape in shapes.items():
+        weights[f"{name}.weight"] = rng.normal(size=shape).astype(np.float32)
+        weights[f"{name}.bias"] = np.zeros(shape[0], dtype=np.float32)
+    NumpyDuelingPolicy.from_state_dict(weights).save(path)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+@pytest.fixture
+def write_policy():
+    """随机权重的 .policy 导出：write_policy(path, seed=0, mtime_ns=None, action_dim=300) -> path"""
+    return _write_policy
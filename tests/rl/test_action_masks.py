@@ -0,0 +1,90 @@
+"""Tests for the vectorized MealPlanningEnv.action_masks."""
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.catalog import RecipeCatalog
+from intelligent_meal_planner.rl.environment import MealPlanningEnv
+
+
+def reference_action_masks(env):
+    """Per-recipe loop equivalent to the original action_masks implementation."""
+    mask = np.zeros(env.action_space.n, dtype=bool)
+    if env.current_step_idx >= env.max_steps:
+        return mask
+
+    current_meal_type = env._get_current_meal_type()
+    remaining_budget = env.budget_limit - env.total_cost
+    budget_buffer = 0.0 if env.strict_budget else env.budget_limit * 0.10
+    max_affordable_price = remaining_budget + budget_buffer
+
+    possible = []
+    for i, recipe in enumerate(env.recipes):
+        if current_meal_type not in recipe["meal_type"]:
+            continue
+        if i in env.selected_recipe_indices:
+            continue
+        if recipe["price"] <= max_affordable_price:
+            mask[i] = True
+            possible.append(i)
+
+    if env.strict_budget or possible:
+        return mask
+
+    for allow_repeat in (False, True):
+        valid = [
+            i for i, r in enumerate(env.recipes)
+            if current_meal_type in r["meal_type"]
+            and (allow_repeat or i not in env.selected_recipe_indices)
+        ]
+        if valid:
+            min_price = min(env.recipes[i]["price"] for i in valid)
+            for i in valid:
+                if env.recipes[i]["price"] == min_price:
+                    mask[i] = True
+            return mask
+
+    mask[:env.n_real_recipes] = True
+    return mask
+
+
+@pytest.mark.parametrize("strict_budget", [False, True])
+@pytest.mark.parametrize("budget", [10.0, 30.0, 60.0, 150.0])
+def test_matches_reference_loop(strict_budget, budget):
+    env = MealPlanningEnv(training_mode=False, budget_limit=budget, strict_budget=strict_budget)
+    rng = np.random.default_rng(int(budget))
+
+    for _ in range(20):
+        env.reset()
+        while env.current_step_idx < env.max_steps:
+            mask = env.action_masks()
+            assert np.array_equal(mask, reference_action_masks(env))
+            if not mask.any():
+                break
+            env.step(int(rng.choice(np.flatnonzero(mask))))
+        assert np.array_equal(env.action_masks(), reference_action_masks(env))
+
+
+def test_fallback_allows_repeat_when_meal_exhausted():
+    recipes = [
+        {"id": i, "name": f"r{i}", "calories": 300, "protein": 10, "carbs": 30, "fat": 10,
+         "price": price, "meal_type": ["breakfast", "lunch", "dinner"], "category": "Staple"}
+        for i, price in enumerate([8.0, 5.0, 5.0])
+    ]
+    env = MealPlanningEnv(training_mode=False, budget_limit=1.0, catalog=RecipeCatalog(recipes))
+    env.reset()
+
+    for _ in range(env.max_steps):
+        mask = env.action_masks()
+        assert np.array_equal(mask, reference_action_masks(env))
+        env.step(int(np.flatnonzero(mask)[0]))
+
+
+def test_large_catalog_expands_action_space():
+    base = RecipeCatalog.load()
+    catalog = RecipeCatalog(list(base.recipes) * 4)
+    env = MealPlanningEnv(training_mode=False, catalog=catalog)
+    env.reset()
+
+    assert env.action_space.n == len(catalog)
+    assert np.array_equal(env.action_masks(), reference_action_masks(env))
@@ -0,0 +1,67 @@
+"""Tests for the multi-process AsyncMealPlanningVecEnv."""
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.async_vec_env import AsyncMealPlanningVecEnv
+from intelligent_meal_planner.rl.telemetry import EpisodeTelemetry
+from intelligent_meal_planner.rl.vec_env import VecMealPlanningEnv
+
+
+def _targets(n):
+    rng = np.random.default_rng(0)
+    return {
+        "target_calories": rng.uniform(1200.0, 3000.0, size=n),
+        "budget_limit": rng.uniform(20.0, 200.0, size=n),
+    }
+
+
+class TestAsyncMealPlanningVecEnv:
+    def test_matches_in_process_vec_env(self):
+        n_envs = 6
+        targets = _targets(n_envs)
+        sync_telemetry = EpisodeTelemetry()
+        async_telemetry = EpisodeTelemetry()
+        sync_env = VecMealPlanningEnv(
+            n_envs=n_envs, training_mode=False, disliked_tags=["spicy"],
+            telemetry=sync_telemetry, **targets,
+        )
+        with AsyncMealPlanningVecEnv(
+            n_envs=n_envs, n_workers=3, training_mode=False, disliked_tags=["spicy"],
+            telemetry=async_telemetry, **targets,
+        ) as async_env:
+            assert async_env.action_space.n == sync_env.action_space.n
+
+            sync_obs, sync_info = sync_env.reset()
+            async_obs, async_info = async_env.reset()
+            assert np.array_equal(sync_obs, async_obs)
+            assert np.array_equal(sync_info["budget_limit"], async_info["budget_limit"])
+
+            rng = np.random.default_rng(1)
+            for _ in range(3 * sync_env.max_steps):
+                masks = sync_env.action_masks()
+                assert np.array_equal(masks, async_env.action_masks())
+                actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+
+                expected = sync_env.step(actions)
+                actual = async_env.step(actions)
+                for a, b in zip(expected[:4], actual[:4]):
+                    assert np.array_equal(a, b)
+                assert expected[4].keys() == actual[4].keys()
+                for key in expected[4]:
+                    assert np.array_equal(expected[4][key], actual[4][key]), key
+
+        assert np.array_equal(sync_telemetry.values(), async_telemetry.values())
+
+    def test_global_step_reaches_workers(self):
+        with AsyncMealPlanningVecEnv(n_envs=4, n_workers=2, training_mode=True, seed=0) as env:
+            env.global_step = 400_000
+            _, info = env.reset()
+            assert info["curriculum_stage"] == 3
+            assert len(set(info["target_calories"].tolist())) == 4
+
+    def test_close_is_idempotent(self):
+        env = AsyncMealPlanningVecEnv(n_envs=2, n_workers=2, training_mode=False)
+        env.close()
+        env.close()
+        assert all(not p.is_alive() for p in env._processes)
@@ -9,6 +9,7 @@ from intelligent_meal_planner.rl.autoresearch.benchmark import (
 )
 from intelligent_meal_planner.rl.autoresearch.evaluator import (
     AgentProtocol,
+    compare_agents,
     evaluate_agent,
 )
 
@@ -90,3 +91,29 @@ class TestEvaluator:
         state = np.zeros(13, dtype=np.float32)
         action = agent.select_action(state, mask, step=0, deterministic=True)
         assert action == 1  # first valid index
+
+
+class FakeLastValidAgent(FakeDeterministicAgent):
+    """Picks the last valid action instead of the first."""
+
+    def select_action(self, state, action_mask, step, deterministic=True):
+        valid_actions = np.where(action_mask)[0]
+        return int(valid_actions[-1]) if len(valid_actions) else 0
+
+
+class TestCompareAgents:
+    def test_identical_agents_fully_agree(self):
+        cases = get_default_benchmark_cases()[:2]
+        result = compare_agents(FakeDeterministicAgent(), FakeDeterministicAgent(), cases)
+
+        assert result["agreement_rate"] == 1.0
+        assert result["steps"] == sum(c["steps"] for c in result["per_case"])
+        for key in ("reference_latency", "candidate_latency"):
+            assert set(result[key]) == {"mean_ms", "p50_ms", "p99_ms"}
+
+    def test_disagreement_is_measured_on_reference_trajectory(self):
+        cases = get_default_benchmark_cases()[:1]
+        result = compare_agents(FakeDeterministicAgent(), FakeLastValidAgent(), cases, repeats=2)
+
+        assert result["agreement_rate"] == 0.0
+        assert result["per_case"][0]["steps"] == 6
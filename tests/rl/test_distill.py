@@ -0,0 +1,64 @@
+"""Tests for teacher-to-student policy distillation."""
+
+import numpy as np
+import torch
+
+from intelligent_meal_planner.rl.autoresearch.benchmark import get_default_benchmark_cases
+from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+from intelligent_meal_planner.rl.dqn.distill import (
+    collect_teacher_dataset,
+    distill_student,
+    target_grid,
+    validate_student,
+)
+
+
+def _teacher():
+    torch.manual_seed(0)
+    return MaskableDQNAgent(
+        state_dim=13, action_dim=300,
+        config={"hidden_dims": [64, 64, 32], "device": "cpu", "catalog_version": "abc"},
+    )
+
+
+class TestDistillation:
+    def test_target_grid(self):
+        grid = target_grid(calories=(1500, 2500), cost_per_100kcal=(3.0,))
+
+        assert grid.shape == (6, 5)
+        assert (grid[:, 4] >= 30).all() and (grid[:, 4] <= 250).all()
+        # 宏量营养素热量之和等于目标热量
+        assert np.allclose(grid[:, 1] * 4 + grid[:, 2] * 4 + grid[:, 3] * 9, grid[:, 0])
+
+    def test_dataset_labels_are_masked_teacher_argmax(self):
+        teacher = _teacher()
+        grid = target_grid(calories=(1800,), cost_per_100kcal=(4.0,))
+        dataset = collect_teacher_dataset(teacher, grid, price_scales=(1.0,), n_rollouts=2)
+
+        n = len(dataset["states"])
+        assert n == len(grid) * 2 * 6
+        assert dataset["masks"][np.arange(n), dataset["actions"]].all()
+        with torch.no_grad():
+            q = teacher.q_network(torch.from_numpy(dataset["states"])).numpy()
+        assert np.allclose(dataset["q_values"], q, atol=1e-5)
+        assert (np.where(dataset["masks"], q, -np.inf).argmax(axis=1) == dataset["actions"]).all()
+
+    def test_student_learns_teacher_actions(self):
+        teacher = _teacher()
+        dataset = collect_teacher_dataset(teacher, target_grid(), price_scales=(1.0,), n_rollouts=2)
+
+        student = distill_student(teacher, dataset, hidden_dims=[32, 32, 16], epochs=40, learning_rate=3e-3)
+        with torch.no_grad():
+            q = student.q_network(torch.from_numpy(dataset["states"])).numpy()
+        accuracy = (np.where(dataset["masks"], q, -np.inf).argmax(axis=1) == dataset["actions"]).mean()
+
+        assert student.config["hidden_dims"] == [32, 32, 16]
+        assert student.config["catalog_version"] == "abc"
+        assert accuracy > 0.8
+
+    def test_validate_student_reports_scores(self):
+        teacher = _teacher()
+        result = validate_student(teacher, teacher, cases=get_default_benchmark_cases()[:2], tolerance=0.0)
+
+        assert result["score_gap"] == 0.0 and result["passed"]
+        assert result["agreement_rate"] == 1.0
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.environment import MealPlanningEnv
+from intelligent_meal_planner.rl.exact_planner import solve_exact
+from intelligent_meal_planner.rl.plan_reward import PlanRewardModel
+
+
+def _env(**kwargs):
+    params = dict(
+        target_calories=2000, target_protein=100, target_carbs=250, target_fat=60,
+        budget_limit=80.0, training_mode=False, strict_budget=True,
+    )
+    params.update(kwargs)
+    env = MealPlanningEnv(**params)
+    env.reset()
+    return env
+
+
+def _random_plans(env, count, seed=0):
+    rng = np.random.default_rng(seed)
+    plans, rewards = [], []
+    for _ in range(count):
+        env.reset()
+        actions = []
+        for _step in range(env.max_steps):
+            valid = np.flatnonzero(env.action_masks())
+            if len(valid) == 0:
+                break
+            actions.append(int(rng.choice(valid)))
+            env.step(actions[-1])
+        if len(actions) == env.max_steps:
+            plans.append(actions)
+            rewards.append(env._calculate_reward())
+    return np.array(plans), np.array(rewards)
+
+
+def _replay(env, actions):
+    env.reset()
+    reward = None
+    for action in actions:
+        assert env.action_masks()[action]
+        _obs, reward, _terminated, _truncated, _info = env.step(action)
+    return reward
+
+
+@pytest.mark.parametrize("strict_budget", [True, False])
+def test_plan_rewards_match_env_reward(strict_budget):
+    env = _env(budget_limit=50.0, disliked_tags=["辣"], strict_budget=strict_budget)
+    plans, rewards = _random_plans(env, 300)
+
+    assert len(plans) > 50
+    np.testing.assert_allclose(PlanRewardModel(env).plan_rewards(plans), rewards, atol=1e-9)
+
+
+def test_exact_plan_is_feasible_and_beats_random_plans():
+    # keto: 高脂低碳，目录里没有满分方案，需要真正的搜索
+    env = _env(target_calories=1800, target_protein=120, target_carbs=50, target_fat=130, budget_limit=100.0)
+    result = solve_exact(env)
+
+    assert result is not None and result.optimal
+    assert result.reward == pytest.approx(_replay(env, result.actions))
+    assert result.reward < PlanRewardModel(env).max_reward
+    _plans, rewards = _random_plans(env, 500)
+    assert result.reward >= rewards.max()
+
+
+def test_stops_at_the_reward_upper_bound():
+    env = _env()
+    result = solve_exact(env)
+
+    assert result.optimal
+    assert result.reward == pytest.approx(PlanRewardModel(env).max_reward)
+    assert result.reward == pytest.approx(_replay(env, result.actions))
+
+
+def test_returns_none_without_a_better_plan():
+    env = _env()
+
+    assert solve_exact(env, incumbent_reward=PlanRewardModel(env).max_reward) is None
+    assert solve_exact(env, max_nodes=0) is None
+    assert solve_exact(env, time_limit_ms=0.0) is None
+    assert solve_exact(_env(budget_limit=1.0)) is None
+
+
+def test_rejects_other_plan_structures():
+    env = _env()
+    env.items_per_meal = 3
+
+    with pytest.raises(ValueError):
+        solve_exact(env)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.environment import MealPlanningEnv
+from intelligent_meal_planner.rl.local_search import refine_plan
+from intelligent_meal_planner.rl.plan_reward import PlanRewardModel
+
+
+def _env(**kwargs):
+    params = dict(
+        target_calories=2000, target_protein=100, target_carbs=250, target_fat=60,
+        budget_limit=60.0, training_mode=False, strict_budget=True,
+    )
+    params.update(kwargs)
+    env = MealPlanningEnv(**params)
+    env.reset()
+    return env
+
+
+def _cheapest_plan(env):
+    """每步选最便宜的可选菜品：可行但营养远离目标"""
+    env.reset()
+    actions = []
+    for _step in range(env.max_steps):
+        valid = np.flatnonzero(env.action_masks())
+        actions.append(int(valid[np.argmin(env.catalog.price_f64[valid])]))
+        env.step(actions[-1])
+    return actions
+
+
+def _replay(env, actions):
+    env.reset()
+    reward = None
+    for action in actions:
+        assert env.action_masks()[action]
+        _obs, reward, _terminated, _truncated, _info = env.step(action)
+    return reward
+
+
+def test_refinement_improves_a_poor_plan_and_replays_in_the_env():
+    env = _env(disliked_tags=["辣"])
+    actions = _cheapest_plan(env)
+    result = refine_plan(env, actions, time_limit_ms=1000)
+
+    assert result.initial_reward == pytest.approx(_replay(env, actions))
+    assert result.swaps > 0 and result.reward_gain > 0
+    assert result.reward == pytest.approx(_replay(env, result.actions))
+    assert len(set(result.actions)) == env.max_steps
+    assert env.total_cost <= env.budget_limit
+
+
+def test_converged_plan_has_no_improving_single_swap():
+    env = _env()
+    result = refine_plan(env, _cheapest_plan(env), time_limit_ms=1000)
+    assert result.converged
+
+    model = PlanRewardModel(env)
+    plan = np.array(result.actions)
+    for slot in range(len(plan)):
+        for candidate in env.catalog.meal_indices[slot // env.items_per_meal]:
+            if candidate in plan:
+                continue
+            swapped = plan.copy()
+            swapped[slot] = candidate
+            if model.features[swapped, 4].sum() <= env.budget_limit:
+                assert model.plan_rewards(swapped)[0] <= result.reward + 1e-9
+
+
+def test_swap_limit_and_plan_length():
+    env = _env()
+    actions = _cheapest_plan(env)
+
+    result = refine_plan(env, actions, max_swaps=0)
+    assert result.actions == actions and result.reward_gain == 0 and not result.converged
+    with pytest.raises(ValueError):
+        refine_plan(env, actions[:5])
+
+
+def test_swap_limit_not_the_clock_decides_the_result():
+    env = _env(disliked_tags=["辣"])
+    actions = _cheapest_plan(env)
+
+    unlimited = refine_plan(env, actions)
+    guarded = refine_plan(env, actions, time_limit_ms=60_000)
+
+    assert unlimited.converged and guarded.converged
+    assert (guarded.actions, guarded.reward) == (unlimited.actions, unlimited.reward)
@@ -0,0 +1,132 @@
+"""Tests for the torch-free NumpyDuelingPolicy and its inference-only export."""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import torch
+
+from intelligent_meal_planner.rl.catalog import RecipeCatalog
+from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+from intelligent_meal_planner.rl.numpy_policy import NumpyDuelingPolicy, export_numpy_policy
+
+
+ACTION_DIM = 30
+
+
+def _agent():
+    torch.manual_seed(0)
+    return MaskableDQNAgent(
+        state_dim=13, action_dim=ACTION_DIM,
+        config={"hidden_dims": [32, 24, 16], "device": "cpu"},
+    )
+
+
+def _batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.uniform(-1.0, 1.0, size=(n, 13)).astype(np.float32)
+    masks = rng.random((n, ACTION_DIM)) < 0.3
+    return states, masks
+
+
+class TestNumpyDuelingPolicy:
+    def test_matches_torch_action_values(self):
+        agent = _agent()
+        policy = NumpyDuelingPolicy.from_state_dict(agent.q_network.state_dict())
+        states, masks = _batch(64)
+
+        with torch.no_grad():
+            expected = agent.q_network.get_action_values(
+                torch.from_numpy(states), torch.from_numpy(masks)
+            ).numpy()
+        actual = policy.get_action_values(states, masks)
+
+        assert policy.action_dim == ACTION_DIM and policy.hidden_dims == [32, 24, 16]
+        assert np.array_equal(np.isinf(actual), np.isinf(expected))
+        assert np.allclose(actual[masks], expected[masks], atol=1e-5)
+        assert policy.select_actions(states, masks).tolist() == expected.argmax(axis=1).tolist()
+
+    def test_select_action_matches_agent(self):
+        agent = _agent()
+        policy = NumpyDuelingPolicy.from_state_dict(agent.q_network.state_dict())
+        states, masks = _batch(16, seed=1)
+        masks[3] = False
+
+        for state, mask in zip(states, masks):
+            assert policy.select_action(state, mask) == agent.select_action(
+                state, mask, step=0, deterministic=True
+            )
+
+    def test_export_round_trip(self, tmp_path):
+        agent = _agent()
+        agent.train_step = 42
+        agent.save(tmp_path / "agent.pt")
+
+        output = export_numpy_policy(tmp_path / "agent.pt")
+        policy = NumpyDuelingPolicy.load(output)
+
+        assert output == tmp_path / "agent.policy"
+        assert policy.train_step == 42
+        states, masks = _batch(8)
+        assert np.allclose(
+            policy.get_action_values(states, masks)[masks],
+            NumpyDuelingPolicy.from_state_dict(agent.q_network.state_dict()).get_action_values(states, masks)[masks],
+        )
+
+    def test_load_memory_maps_weights(self, tmp_path):
+        agent = _agent()
+        NumpyDuelingPolicy.from_state_dict(agent.q_network.state_dict()).save(tmp_path / "p.policy")
+
+        mapped = NumpyDuelingPolicy.load(tmp_path / "p.policy")
+        loaded = NumpyDuelingPolicy.load(tmp_path / "p.policy", mmap=False)
+
+        weight = mapped.layers["advantage_stream.2"][0]
+        assert isinstance(weight, np.memmap)
+        states, masks = _batch(8)
+        assert np.array_equal(mapped.forward(states), loaded.forward(states))
+
+    def test_catalog_checks(self, tmp_path):
+        agent = _agent()
+        catalog = RecipeCatalog.load()
+        path = tmp_path / "p.policy"
+        NumpyDuelingPolicy.from_state_dict(
+            agent.q_network.state_dict(), catalog_version="0123456789ab"
+        ).save(path)
+
+        # 动作维度 (30) 小于目录菜品数
+        with pytest.raises(ValueError, match="动作维度"):
+            NumpyDuelingPolicy.load(path, catalog=catalog)
+
+        wide = MaskableDQNAgent(
+            state_dim=13, action_dim=len(catalog),
+            config={"hidden_dims": [8, 8, 8], "device": "cpu"},
+        )
+        NumpyDuelingPolicy.from_state_dict(
+            wide.q_network.state_dict(), catalog_version="0123456789ab"
+        ).save(path)
+        with pytest.raises(ValueError, match="目录版本"):
+            NumpyDuelingPolicy.load(path, catalog=catalog)
+
+        NumpyDuelingPolicy.from_state_dict(
+            wide.q_network.state_dict(), catalog_version=catalog.version
+        ).save(path)
+        assert NumpyDuelingPolicy.load(path, catalog=catalog.overlay(price_scale=1.5)).action_dim == len(catalog)
+
+    def test_from_pretrained_infers_action_dim(self, tmp_path):
+        agent = MaskableDQNAgent(
+            state_dim=13, action_dim=300,
+            config={"hidden_dims": [16, 16, 8], "device": "cpu", "catalog_version": "abc"},
+        )
+        agent.save(tmp_path / "agent.pt")
+
+        restored = MaskableDQNAgent.from_pretrained(str(tmp_path / "agent.pt"))
+        assert restored.action_dim == 300
+        assert NumpyDuelingPolicy.load(export_numpy_policy(tmp_path / "agent.pt")).catalog_version == "abc"
+
+    def test_tool_import_does_not_load_torch(self):
+        code = (
+            "import sys; import intelligent_meal_planner.tools.rl_model_tool; "
+            "assert 'torch' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,103 @@
+"""Tests for the background replay BatchPrefetcher and its use in train_step_fn."""
+
+import threading
+
+import numpy as np
+import pytest
+import torch
+
+from intelligent_meal_planner.rl.dqn import BatchPrefetcher, MaskableDQNAgent, PrioritizedReplayBuffer
+
+
+ACTION_DIM = 12
+
+
+def _transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(-1, 1, size=(n, 13)).astype(np.float32),
+        rng.integers(0, ACTION_DIM, size=n),
+        rng.normal(size=n),
+        rng.uniform(-1, 1, size=(n, 13)).astype(np.float32),
+        rng.random(n) < 0.2,
+        rng.random((n, ACTION_DIM)) < 0.5,
+        rng.random((n, ACTION_DIM)) < 0.5,
+    )
+
+
+def _agent(prefetch_batches):
+    return MaskableDQNAgent(
+        state_dim=13,
+        action_dim=ACTION_DIM,
+        config={"hidden_dims": [16, 16, 8], "device": "cpu", "batch_size": 8,
+                "min_buffer_size": 20, "prefetch_batches": prefetch_batches},
+    )
+
+
+class TestBatchPrefetcher:
+    def test_batches_match_stored_transitions(self):
+        buffer = PrioritizedReplayBuffer(capacity=64)
+        data = _transitions(40)
+        buffer.add_batch(*data)
+        prefetcher = BatchPrefetcher(buffer, 16, torch.device("cpu"), threading.Lock(), depth=2)
+        try:
+            for _ in range(5):
+                slot, batch, indices = prefetcher.get()
+                data_idx = indices - (buffer.capacity - 1)
+                assert torch.equal(batch["states"], torch.from_numpy(data[0][data_idx]))
+                assert torch.equal(batch["next_action_masks"], torch.from_numpy(data[6][data_idx]))
+                assert batch["dones"].dtype == torch.float32
+                assert batch["weights"].max().item() == pytest.approx(1.0)
+                prefetcher.release(slot)
+        finally:
+            prefetcher.close()
+
+    def test_slots_reuse_preallocated_tensors(self):
+        buffer = PrioritizedReplayBuffer(capacity=32)
+        buffer.add_batch(*_transitions(32))
+        prefetcher = BatchPrefetcher(buffer, 8, torch.device("cpu"), threading.Lock(), depth=2)
+        try:
+            pointers = set()
+            for _ in range(6):
+                slot, batch, _ = prefetcher.get()
+                pointers.add(batch["states"].data_ptr())
+                prefetcher.release(slot)
+            assert len(pointers) == 2
+        finally:
+            prefetcher.close()
+
+    def test_priority_updates_applied_by_close(self):
+        buffer = PrioritizedReplayBuffer(capacity=16, alpha=1.0)
+        buffer.add_batch(*_transitions(16))
+        prefetcher = BatchPrefetcher(buffer, 4, torch.device("cpu"), threading.Lock())
+        slot, _, indices = prefetcher.get()
+
+        prefetcher.update_priorities(indices, np.full(4, 9.0))
+        prefetcher.close()
+
+        assert buffer.max_priority == pytest.approx(9.0 + buffer.epsilon)
+        assert not prefetcher._thread.is_alive()
+
+
+class TestAgentPrefetch:
+    def test_train_step_with_prefetch(self):
+        agent = _agent(prefetch_batches=2)
+        agent.store_transitions(*_transitions(30))
+
+        for _ in range(10):
+            metrics = agent.train_step_fn()
+            assert np.isfinite(metrics["loss"])
+            agent.store_transitions(*_transitions(4, seed=agent.train_step))
+        agent.close()
+
+        assert agent.train_step == 10
+        assert len(agent.buffer) == 70
+        # 所有 TD 误差都已写回优先级树
+        assert not np.allclose(agent.buffer.tree.tree[agent.buffer.capacity - 1:][:70], 1.0)
+
+    def test_mismatched_batch_size_samples_synchronously(self):
+        agent = _agent(prefetch_batches=2)
+        agent.store_transitions(*_transitions(30))
+
+        assert agent.train_step_fn(batch_size=4) is not None
+        assert agent._prefetcher is None
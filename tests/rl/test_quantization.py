@@ -0,0 +1,60 @@
+"""Tests for dynamic int8 quantization and the inference thread budget."""
+
+import numpy as np
+import pytest
+import torch
+
+from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+from intelligent_meal_planner.rl.dqn.quantization import quantize_dynamic_int8, set_inference_threads
+
+
+@pytest.fixture
+def restore_threads():
+    threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(threads)
+
+
+def _agent(action_dim=40):
+    torch.manual_seed(0)
+    return MaskableDQNAgent(
+        state_dim=13, action_dim=action_dim,
+        config={"hidden_dims": [64, 64, 32], "device": "cpu"},
+    )
+
+
+class TestQuantization:
+    def test_quantized_network_tracks_fp32_values(self):
+        network = _agent().q_network
+        quantized = quantize_dynamic_int8(network)
+        states = torch.from_numpy(np.random.default_rng(0).uniform(-1, 1, size=(64, 13)).astype(np.float32))
+
+        with torch.no_grad():
+            expected = network(states)
+            actual = quantized(states)
+
+        assert isinstance(quantized.feature[0], torch.ao.nn.quantized.dynamic.Linear)
+        assert isinstance(network.feature[0], torch.nn.Linear)  # 原网络不变
+        assert torch.allclose(actual, expected, atol=0.05 * expected.abs().max().item())
+
+    def test_from_pretrained_quantize(self, tmp_path, restore_threads):
+        agent = _agent(action_dim=300)
+        agent.save(tmp_path / "agent.pt")
+
+        quantized = MaskableDQNAgent.from_pretrained(str(tmp_path / "agent.pt"), quantize=True, num_threads=1)
+
+        assert torch.get_num_threads() == 1
+        assert quantized.device.type == "cpu"
+        mask = np.zeros(300, dtype=bool)
+        mask[[3, 7, 250]] = True
+        assert quantized.select_action(np.zeros(13, np.float32), mask, step=0, deterministic=True) in (3, 7, 250)
+
+
+class TestThreadBudget:
+    def test_env_variable(self, monkeypatch, restore_threads):
+        monkeypatch.setenv("RL_INFERENCE_THREADS", "2")
+        assert set_inference_threads() == 2
+
+    def test_rejects_non_positive(self, restore_threads):
+        with pytest.raises(ValueError):
+            set_inference_threads(0)
@@ -0,0 +1,138 @@
+"""Tests for the shared columnar RecipeCatalog."""
+
+import json
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.catalog import DEFAULT_RECIPES_PATH, RecipeCatalog
+from intelligent_meal_planner.rl.environment import MealPlanningEnv
+
+
+def _raw_recipes():
+    with open(DEFAULT_RECIPES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)["recipes"]
+
+
+class TestRecipeCatalog:
+    def test_load_is_cached_per_process(self):
+        assert RecipeCatalog.load() is RecipeCatalog.load()
+        assert RecipeCatalog.load(str(DEFAULT_RECIPES_PATH)) is RecipeCatalog.load()
+
+    def test_columns_match_json(self):
+        catalog = RecipeCatalog.load()
+        raw = _raw_recipes()
+
+        assert len(catalog) == len(raw)
+        assert catalog.price.dtype == np.float32
+        assert catalog.calories.flags["C_CONTIGUOUS"]
+        for i, recipe in enumerate(raw):
+            assert catalog.calories[i] == recipe["calories"]
+            assert catalog.price[i] == recipe["price"]
+            assert catalog.category_of(i) == recipe["category"]
+            for m, meal_type in enumerate(("breakfast", "lunch", "dinner")):
+                assert bool(catalog.meal_masks[m, i]) == (meal_type in recipe["meal_type"])
+
+    def test_arrays_are_read_only(self):
+        catalog = RecipeCatalog.load()
+        with pytest.raises(ValueError):
+            catalog.price[0] = 0.0
+
+    def test_has_any_tag(self):
+        catalog = RecipeCatalog.load()
+        raw = _raw_recipes()
+        expected = [bool({"spicy", "unknown-tag"} & set(r.get("tags", []))) for r in raw]
+        assert catalog.has_any_tag(["spicy", "unknown-tag"]).tolist() == expected
+        assert not catalog.has_any_tag([]).any()
+
+    def test_price_scale_overlay_leaves_base_untouched(self):
+        base = RecipeCatalog.load()
+        scaled = base.overlay(price_scale=1.5)
+
+        assert base.overlay() is base
+        assert scaled.category_codes is base.category_codes
+        assert scaled.price[0] == pytest.approx(round(float(base.price[0]) * 1.5, 1))
+        assert base.recipes[0]["price"] == _raw_recipes()[0]["price"]
+        assert scaled.recipes[0]["price"] == round(base.recipes[0]["price"] * 1.5, 1)
+        assert scaled.version != base.version
+
+    def test_custom_recipes_overlay(self):
+        base = RecipeCatalog.load()
+        custom = [{
+            "name": "番茄蛋汤", "calories": 180, "protein": 10, "carbs": 15, "fat": 8,
+            "price": 4, "meal_type": "lunch", "category": "Soup",
+        }]
+        merged = base.overlay(custom_recipes=custom)
+
+        assert len(merged) == len(base) + 1
+        assert merged.ids[-1] == base.ids.max() + 1
+        assert merged.recipes[-1]["meal_type"] == ["lunch"]
+        assert merged.recipes[-1]["tags"] == []
+        assert merged.meal_masks[1, -1] and not merged.meal_masks[0, -1]
+        assert custom[0]["meal_type"] == "lunch"
+        assert "id" not in custom[0]
+
+    def test_budget_prices_match_recipe_dicts(self):
+        base = RecipeCatalog.load()
+        custom = [{
+            "name": "小米粥套餐", "calories": 320, "protein": 9, "carbs": 60, "fat": 5,
+            "price": 12.3, "meal_type": "breakfast", "category": "Porridge",
+        }]
+        merged = base.overlay(custom_recipes=custom)
+        scaled = base.overlay(price_scale=1.5)
+
+        assert merged.price_f64[-1] == 12.3 and float(merged.price[-1]) != 12.3
+        assert merged.meal_prices[0][-1] == 12.3
+        assert scaled.price_f64.tolist() == [round(r["price"] * 1.5, 1) for r in _raw_recipes()]
+        assert [r["price"] for r in scaled.recipes] == scaled.price_f64.tolist()
+
+        env = MealPlanningEnv(
+            training_mode=False, budget_limit=12.3, strict_budget=True, custom_recipes=custom
+        )
+        env.reset()
+        assert env.action_masks()[len(merged) - 1]
+        env.step(len(merged) - 1)
+        assert env.total_cost == 12.3
+
+    def test_nutrient_totals_match_recipe_dicts(self):
+        custom = [{
+            "name": "燕麦酸奶杯", "calories": 287.3, "protein": 12.1, "carbs": 41.7, "fat": 7.9,
+            "price": 9.9, "meal_type": "breakfast", "category": "Porridge",
+        }]
+        merged = RecipeCatalog.load().overlay(custom_recipes=custom)
+        assert merged.features_f64[-1].tolist() == [287.3, 12.1, 41.7, 7.9, 9.9]
+        assert float(merged.protein[-1]) != 12.1
+
+        env = MealPlanningEnv(training_mode=False, custom_recipes=custom)
+        env.reset()
+        env.step(len(merged) - 1)
+        assert (env.total_calories, env.total_protein, env.total_carbs, env.total_fat) == (
+            287.3, 12.1, 41.7, 7.9
+        )
+
+
+class TestEnvironmentUsesCatalog:
+    def test_envs_share_catalog(self):
+        a = MealPlanningEnv(training_mode=False)
+        b = MealPlanningEnv(training_mode=False)
+        assert a.catalog is b.catalog
+
+    def test_price_scale_env_does_not_affect_other_envs(self):
+        scaled = MealPlanningEnv(training_mode=False, price_scale=2.0)
+        plain = MealPlanningEnv(training_mode=False)
+        assert plain.recipes[0]["price"] == _raw_recipes()[0]["price"]
+        assert scaled.recipes[0]["price"] == round(_raw_recipes()[0]["price"] * 2.0, 1)
+
+    def test_step_totals_match_recipe_dicts(self):
+        env = MealPlanningEnv(training_mode=False, budget_limit=200.0)
+        env.reset()
+        expected = 0.0
+        while env.current_step_idx < env.max_steps:
+            action = int(np.flatnonzero(env.action_masks())[0])
+            expected += env.recipes[action]["calories"]
+            env.step(action)
+
+        assert env.total_calories == expected
+        assert [r["name"] for r in env.selected_recipes] == [
+            env.recipes[i]["name"] for i in env.selected_actions
+        ]
@@ -0,0 +1,284 @@
+"""Tests for the array-backed PrioritizedReplayBuffer and vectorized SumTree."""
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.dqn.replay_buffer import PrioritizedReplayBuffer, SumTree
+
+
+ACTION_DIM = 12
+
+
+def _transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(-1, 1, size=(n, 13)).astype(np.float32),
+        rng.integers(0, ACTION_DIM, size=n),
+        rng.normal(size=n),
+        rng.uniform(-1, 1, size=(n, 13)).astype(np.float32),
+        rng.random(n) < 0.2,
+        rng.random((n, ACTION_DIM)) < 0.5,
+        rng.random((n, ACTION_DIM)) < 0.5,
+    )
+
+
+def _sequential_get(tree, s):
+    """逐个下降的参考实现 (与原始 SumTree.get 一致)"""
+    parent = 0
+    while 2 * parent + 1 < len(tree.tree):
+        left = 2 * parent + 1
+        if s <= tree.tree[left]:
+            parent = left
+        else:
+            s -= tree.tree[left]
+            parent = left + 1
+    return parent
+
+
+def _assert_sums_consistent(tree):
+    internal = np.arange(tree.capacity - 1)
+    assert np.allclose(tree.tree[internal], tree.tree[2 * internal + 1] + tree.tree[2 * internal + 2])
+
+
+class TestSumTree:
+    @pytest.mark.parametrize("capacity", [1, 7, 8, 100])
+    def test_get_batch_matches_sequential_descent(self, capacity):
+        tree = SumTree(capacity)
+        rng = np.random.default_rng(capacity)
+        for priority in rng.uniform(0.1, 2.0, size=capacity):
+            tree.add(priority)
+
+        s = rng.uniform(0, tree.total_priority, size=200)
+        assert tree.get_batch(s).tolist() == [_sequential_get(tree, x) for x in s]
+
+    @pytest.mark.parametrize("capacity", [5, 8, 37])
+    def test_update_batch_matches_sequential_updates(self, capacity):
+        batch_tree = SumTree(capacity)
+        loop_tree = SumTree(capacity)
+        for _ in range(capacity):
+            batch_tree.add(1.0)
+            loop_tree.add(1.0)
+
+        rng = np.random.default_rng(0)
+        leaves = rng.integers(capacity - 1, 2 * capacity - 1, size=3 * capacity)
+        priorities = rng.uniform(0.0, 5.0, size=leaves.size)
+        batch_tree.update_batch(leaves, priorities)
+        for leaf, priority in zip(leaves, priorities):
+            loop_tree.update(leaf, priority)
+
+        assert np.allclose(batch_tree.tree, loop_tree.tree)
+        _assert_sums_consistent(batch_tree)
+
+
+class TestPrioritizedReplayBuffer:
+    def test_add_batch_equals_sequential_add(self):
+        data = _transitions(30)
+        batched = PrioritizedReplayBuffer(capacity=16)
+        looped = PrioritizedReplayBuffer(capacity=16)
+        batched.add_batch(*(x[:10] for x in data))
+        batched.add_batch(*(x[10:] for x in data))
+        for row in zip(*data):
+            looped.add(*row)
+
+        assert len(batched) == len(looped) == 16
+        assert batched.tree.data_pointer == looped.tree.data_pointer
+        expected = looped.get_transitions(np.arange(16))
+        actual = batched.get_transitions(np.arange(16))
+        for key in expected:
+            assert np.array_equal(actual[key], expected[key]), key
+
+    def test_sample_returns_stored_fields(self):
+        buffer = PrioritizedReplayBuffer(capacity=64)
+        data = _transitions(40)
+        buffer.add_batch(*data)
+
+        np.random.seed(0)
+        batch, indices, weights = buffer.sample(16)
+
+        data_idx = indices - (buffer.capacity - 1)
+        assert (data_idx < 40).all()
+        assert np.array_equal(batch["states"], data[0][data_idx])
+        assert np.array_equal(batch["action_masks"], data[5][data_idx])
+        assert batch["dones"].dtype == bool
+        assert weights.dtype == np.float32 and weights.max() == pytest.approx(1.0)
+
+    def test_sampling_follows_stratified_segments(self):
+        buffer = PrioritizedReplayBuffer(capacity=50)
+        buffer.add_batch(*_transitions(50))
+        buffer.update_priorities(
+            np.arange(50) + buffer.capacity - 1, np.random.default_rng(1).uniform(0, 3, size=50)
+        )
+
+        np.random.seed(3)
+        _, indices, _ = buffer.sample(8)
+
+        np.random.seed(3)
+        segment = buffer.tree.total_priority / 8
+        expected = [
+            _sequential_get(buffer.tree, np.random.uniform(segment * i, segment * (i + 1)))
+            for i in range(8)
+        ]
+        assert indices.tolist() == expected
+
+    def test_update_priorities_tracks_max_priority(self):
+        buffer = PrioritizedReplayBuffer(capacity=10, alpha=1.0)
+        buffer.add_batch(*_transitions(10))
+        _, indices, _ = buffer.sample(4)
+
+        buffer.update_priorities(indices, np.array([0.5, 4.0, 1.0, 2.0]))
+
+        assert buffer.max_priority == pytest.approx(4.0 + buffer.epsilon)
+        _assert_sums_consistent(buffer.tree)
+
+
+def _rollout(n_envs, n_steps, seed=0):
+    """模拟向量化环境：未结束时 next_state 即下一步的 state"""
+    rng = np.random.default_rng(seed)
+    states = rng.uniform(-1, 1, size=(n_envs, 13)).astype(np.float32)
+    masks = rng.random((n_envs, ACTION_DIM)) < 0.5
+    for _ in range(n_steps):
+        next_states = rng.uniform(-1, 1, size=(n_envs, 13)).astype(np.float32)
+        next_masks = rng.random((n_envs, ACTION_DIM)) < 0.5
+        dones = rng.random(n_envs) < 1 / 6
+        yield (states, rng.integers(0, ACTION_DIM, size=n_envs), rng.normal(size=n_envs),
+               next_states, dones, masks, next_masks)
+        states, masks = next_states.copy(), next_masks.copy()
+        reset = rng.uniform(-1, 1, size=(n_envs, 13)).astype(np.float32)
+        states[dones] = reset[dones]
+
+
+class TestCompactStorage:
+    def test_consecutive_steps_share_frames(self):
+        buffer = PrioritizedReplayBuffer(capacity=1000)
+        for step in _rollout(n_envs=8, n_steps=60):
+            buffer.add_batch(*step)
+
+        state_frames = buffer.storage["state_frames"][:480]
+        next_frames = buffer.storage["next_frames"][:480]
+        dones = buffer.storage["dones"][:480]
+        # 未结束的经验，下一步的 state 帧就是本步的 next 帧
+        shared = np.isin(next_frames[:-8][~dones[:-8]], state_frames[8:])
+        assert shared.all()
+        assert buffer.frame_pointer < 2 * 480
+
+    def test_wraparound_keeps_transitions_intact(self):
+        n_envs = 4
+        buffer = PrioritizedReplayBuffer(capacity=40, frame_slack=n_envs)
+        history = []
+        for step in _rollout(n_envs=n_envs, n_steps=200, seed=1):
+            buffer.add_batch(*step)
+            history.extend(zip(*step))
+
+        live = history[-40:]
+        data_idx = (buffer.tree.data_pointer + np.arange(40)) % 40
+        batch = buffer.get_transitions(data_idx)
+        for i, (state, action, reward, next_state, done, mask, next_mask) in enumerate(live):
+            assert np.array_equal(batch["states"][i], state)
+            assert np.array_equal(batch["next_states"][i], next_state)
+            assert np.array_equal(batch["action_masks"][i], mask)
+            assert np.array_equal(batch["next_action_masks"][i], next_mask)
+            assert batch["actions"][i] == action and batch["dones"][i] == done
+
+    def test_masks_are_bit_packed(self):
+        buffer = PrioritizedReplayBuffer(capacity=100)
+        buffer.add_batch(*_transitions(10))
+
+        assert buffer.storage["frame_masks"].shape[1] == (ACTION_DIM + 7) // 8
+        batch = buffer.get_transitions(np.arange(10))
+        assert batch["action_masks"].dtype == bool
+        assert batch["action_masks"].shape == (10, ACTION_DIM)
+
+
+class TestPersistence:
+    def test_memmap_storage_writes_npy_files(self, tmp_path):
+        buffer = PrioritizedReplayBuffer(capacity=32, storage_dir=str(tmp_path / "replay"))
+        buffer.add_batch(*_transitions(20))
+
+        assert isinstance(buffer.storage["frame_states"], np.memmap)
+        assert (tmp_path / "replay" / "frame_masks.npy").exists()
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        buffer = PrioritizedReplayBuffer(capacity=16)
+        for step in _rollout(n_envs=4, n_steps=10):
+            buffer.add_batch(*step)
+        buffer.update_priorities(np.arange(16) + 15, np.linspace(0.1, 3.0, 16))
+        buffer.save(str(tmp_path))
+        np.random.seed(0)
+        expected, expected_idx, expected_w = buffer.sample(8)
+
+        for mmap_mode in ("r+", None):
+            restored = PrioritizedReplayBuffer.load(str(tmp_path), mmap_mode=mmap_mode)
+            assert len(restored) == len(buffer)
+            assert restored.max_priority == buffer.max_priority
+            np.random.seed(0)
+            actual, actual_idx, actual_w = restored.sample(8)
+            assert np.array_equal(expected_idx, actual_idx)
+            assert np.array_equal(expected_w, actual_w)
+            for key in expected:
+                assert np.array_equal(expected[key], actual[key]), key
+
+    def test_memmap_buffer_saves_in_place(self, tmp_path):
+        buffer = PrioritizedReplayBuffer(capacity=16, storage_dir=str(tmp_path))
+        buffer.add_batch(*_transitions(10))
+        buffer.save(str(tmp_path))
+
+        restored = PrioritizedReplayBuffer.load(str(tmp_path))
+        restored.add_batch(*_transitions(4, seed=1))
+        assert len(restored) == 14
+        assert np.array_equal(
+            restored.get_transitions(np.arange(10))["states"], _transitions(10)[0]
+        )
+
+    @pytest.mark.parametrize("mmap_mode", ["c", "r"])
+    def test_saving_a_mapped_copy_back_to_its_source(self, tmp_path, mmap_mode):
+        source = PrioritizedReplayBuffer(capacity=16)
+        source.add_batch(*_transitions(10))
+        source.save(str(tmp_path))
+
+        buffer = PrioritizedReplayBuffer.load(str(tmp_path), mmap_mode=mmap_mode)
+        if mmap_mode == "c":
+            buffer.add_batch(*_transitions(4, seed=1))
+        buffer.save(str(tmp_path))
+
+        restored = PrioritizedReplayBuffer.load(str(tmp_path), mmap_mode=None)
+        assert len(restored) == len(buffer)
+        idx = np.arange(len(buffer))
+        expected, actual = buffer.get_transitions(idx), restored.get_transitions(idx)
+        for key in expected:
+            assert np.array_equal(expected[key], actual[key]), key
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_warm_start_imports_latest_transitions(self, tmp_path):
+        source = PrioritizedReplayBuffer(capacity=20)
+        history = []
+        for step in _rollout(n_envs=4, n_steps=8, seed=2):
+            source.add_batch(*step)
+            history.extend(zip(*step))
+        source.save(str(tmp_path))
+        before = (tmp_path / "actions.npy").read_bytes()
+
+        target = PrioritizedReplayBuffer(capacity=100)
+        assert target.warm_start(str(tmp_path), max_transitions=12) == 12
+
+        batch = target.get_transitions(np.arange(12))
+        for i, (state, action, _, next_state, done, mask, _) in enumerate(history[-12:]):
+            assert np.array_equal(batch["states"][i], state)
+            assert np.array_equal(batch["next_states"][i], next_state)
+            assert np.array_equal(batch["action_masks"][i], mask)
+            assert batch["actions"][i] == action and batch["dones"][i] == done
+        assert (tmp_path / "actions.npy").read_bytes() == before
+
+    def test_agent_warm_start_config(self, tmp_path):
+        from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+
+        source = PrioritizedReplayBuffer(capacity=50)
+        source.add_batch(*_transitions(30))
+        source.save(str(tmp_path / "corpus"))
+
+        agent = MaskableDQNAgent(
+            state_dim=13, action_dim=ACTION_DIM,
+            config={"hidden_dims": [16, 16, 8], "device": "cpu", "min_buffer_size": 20,
+                    "batch_size": 8, "buffer_warm_start": str(tmp_path / "corpus")},
+        )
+        assert len(agent.buffer) == 30
+        assert agent.train_step_fn() is not None
@@ -0,0 +1,75 @@
+"""Tests for MaskableDQNAgent.select_actions (batched masked epsilon-greedy)."""
+
+import numpy as np
+
+from intelligent_meal_planner.rl.dqn import MaskableDQNAgent
+
+
+ACTION_DIM = 40
+
+
+def _agent(epsilon):
+    return MaskableDQNAgent(
+        state_dim=13,
+        action_dim=ACTION_DIM,
+        config={
+            "hidden_dims": [32, 32, 16],
+            "device": "cpu",
+            "epsilon_schedule": [(0, 10, epsilon, epsilon)],
+        },
+    )
+
+
+def _batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.uniform(-1.0, 1.0, size=(n, 13)).astype(np.float32)
+    masks = rng.random((n, ACTION_DIM)) < 0.3
+    masks[np.arange(n), rng.integers(0, ACTION_DIM, size=n)] = True
+    return states, masks
+
+
+class TestSelectActions:
+    def test_greedy_matches_select_action(self):
+        agent = _agent(epsilon=0.0)
+        states, masks = _batch(32)
+
+        actions = agent.select_actions(states, masks, step=0, deterministic=True)
+
+        assert actions.dtype == np.int64
+        assert actions.tolist() == [
+            int(agent.select_action(s, m, step=0, deterministic=True))
+            for s, m in zip(states, masks)
+        ]
+
+    def test_single_forward_pass(self, monkeypatch):
+        agent = _agent(epsilon=0.0)
+        calls = []
+        forward = agent.q_network.forward
+        monkeypatch.setattr(agent.q_network, "forward", lambda x: calls.append(len(x)) or forward(x))
+
+        agent.select_actions(*_batch(16), step=0)
+
+        assert calls == [16]
+
+    def test_exploration_stays_within_mask(self):
+        agent = _agent(epsilon=1.0)
+        states, masks = _batch(8)
+        np.random.seed(0)
+
+        seen = [set() for _ in range(len(states))]
+        for _ in range(300):
+            actions = agent.select_actions(states, masks, step=0)
+            assert masks[np.arange(len(states)), actions].all()
+            for i, action in enumerate(actions):
+                seen[i].add(int(action))
+
+        assert all(seen[i] == set(np.flatnonzero(masks[i]).tolist()) for i in range(len(states)))
+
+    def test_rows_without_valid_actions_fall_back_to_zero(self):
+        agent = _agent(epsilon=0.5)
+        states, masks = _batch(4)
+        masks[1] = False
+
+        actions = agent.select_actions(states, masks, step=0)
+
+        assert actions[1] == 0
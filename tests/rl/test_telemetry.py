@@ -0,0 +1,98 @@
+"""Tests for the EpisodeTelemetry ring buffer and its environment hooks."""
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.environment import MealPlanningEnv
+from intelligent_meal_planner.rl.telemetry import TELEMETRY_FIELDS, EpisodeTelemetry
+from intelligent_meal_planner.rl.vec_env import VecMealPlanningEnv
+
+
+def _play_episode(env, rng):
+    env.reset()
+    terminated = False
+    while not terminated:
+        action = rng.choice(np.flatnonzero(env.action_masks()))
+        _, reward, terminated, _, _ = env.step(action)
+    return reward
+
+
+class TestEpisodeTelemetry:
+    def test_ring_buffer_keeps_latest_rows_in_order(self):
+        telemetry = EpisodeTelemetry(capacity=4)
+        for i in range(6):
+            telemetry.record(i, 0, 0, 0, 0, 0, 0, 0)
+
+        assert len(telemetry) == 4
+        assert telemetry.total_episodes == 6
+        assert telemetry.values()[:, 0].tolist() == [2, 3, 4, 5]
+
+    def test_record_batch_wraps_around(self):
+        telemetry = EpisodeTelemetry(capacity=5)
+        rows = np.arange(7 * len(TELEMETRY_FIELDS), dtype=float).reshape(7, -1)
+        telemetry.record_batch(rows[:3])
+        telemetry.record_batch(rows[3:])
+
+        assert np.array_equal(telemetry.values(), rows[2:])
+        telemetry.record_batch(rows)
+        assert np.array_equal(telemetry.values(), rows[2:])
+        assert telemetry.total_episodes == 14
+
+    def test_drain_returns_only_new_rows(self):
+        telemetry = EpisodeTelemetry(capacity=8)
+        telemetry.record(1.0, 0, 0, 0, 0, 0, 0, 0)
+        telemetry.record(3.0, 0, 0, 0, 0, 0, 0, 0)
+
+        assert telemetry.summary(telemetry.drain())["total_reward"] == 2.0
+        assert len(telemetry.drain()) == 0
+        assert telemetry.summary(telemetry.drain()) == {}
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            EpisodeTelemetry(capacity=0)
+
+
+class TestEnvironmentTelemetry:
+    def test_episode_end_is_silent(self, capsys):
+        _play_episode(MealPlanningEnv(training_mode=False), np.random.default_rng(0))
+        assert capsys.readouterr().out == ""
+
+    def test_scalar_env_records_reward_components(self):
+        telemetry = EpisodeTelemetry()
+        env = MealPlanningEnv(training_mode=False, disliked_tags=["spicy"], telemetry=telemetry)
+        rng = np.random.default_rng(0)
+        rewards = [_play_episode(env, rng) for _ in range(3)]
+
+        values = telemetry.values()
+        assert values[:, 0].tolist() == rewards
+        row = dict(zip(TELEMETRY_FIELDS, values[-1]))
+        assert row["budget_ratio"] == env.total_cost / env.budget_limit
+        assert row["unique_categories"] == len(set(env.selected_categories))
+        assert row["total_reward"] == pytest.approx(
+            row["nutrition_reward"] + 0.5 * row["budget_reward"]
+            + 0.3 * row["variety_reward"] + row["dislike_penalty"]
+        )
+
+    def test_vec_env_matches_scalar_envs(self):
+        n_envs = 4
+        vec_telemetry = EpisodeTelemetry()
+        vec = VecMealPlanningEnv(n_envs=n_envs, training_mode=False, telemetry=vec_telemetry)
+        envs = [MealPlanningEnv(training_mode=False, telemetry=EpisodeTelemetry()) for _ in range(n_envs)]
+
+        vec.reset()
+        for env in envs:
+            env.reset()
+        rng = np.random.default_rng(2)
+        for _ in range(2 * vec.max_steps):
+            masks = vec.action_masks()
+            actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+            vec.step(actions)
+            for env, action in zip(envs, actions):
+                if env.step(action)[2]:
+                    env.reset()
+
+        expected = np.stack([
+            np.stack([env.telemetry.values() for env in envs])[:, episode]
+            for episode in range(2)
+        ]).reshape(-1, len(TELEMETRY_FIELDS))
+        assert np.array_equal(vec_telemetry.values(), expected)
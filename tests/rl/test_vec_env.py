@@ -0,0 +1,111 @@
+"""Tests for the batched VecMealPlanningEnv."""
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.rl.environment import MealPlanningEnv
+from intelligent_meal_planner.rl.vec_env import VecMealPlanningEnv
+
+
+CUSTOM_RECIPES = [
+    {
+        "name": "家常豆腐", "calories": 280, "protein": 15, "carbs": 12, "fat": 18,
+        "price": 5, "meal_type": ["lunch", "dinner"], "category": "Tofu", "tags": ["cheap"],
+    },
+    {
+        "name": "生酮煎蛋", "calories": 320, "protein": 18, "carbs": 2, "fat": 26,
+        "price": 5, "meal_type": "breakfast", "category": "Breakfast",
+    },
+]
+
+
+def _targets(n):
+    rng = np.random.default_rng(0)
+    return {
+        "target_calories": rng.uniform(1200.0, 3000.0, size=n),
+        "target_protein": rng.uniform(60.0, 180.0, size=n),
+        "target_carbs": rng.uniform(50.0, 350.0, size=n),
+        "target_fat": rng.uniform(40.0, 120.0, size=n),
+        "budget_limit": rng.uniform(20.0, 200.0, size=n),
+    }
+
+
+def _run_lockstep(n_envs, n_episodes=3, **env_kwargs):
+    targets = _targets(n_envs)
+    vec = VecMealPlanningEnv(n_envs=n_envs, training_mode=False, **targets, **env_kwargs)
+    envs = [
+        MealPlanningEnv(
+            training_mode=False,
+            **{key: float(values[i]) for key, values in targets.items()},
+            **env_kwargs,
+        )
+        for i in range(n_envs)
+    ]
+
+    vec_obs, _ = vec.reset()
+    scalar_obs = np.stack([env.reset()[0] for env in envs])
+    assert np.array_equal(vec_obs, scalar_obs)
+
+    rng = np.random.default_rng(1)
+    for _ in range(n_episodes * vec.max_steps):
+        vec_masks = vec.action_masks()
+        scalar_masks = np.stack([env.action_masks() for env in envs])
+        assert np.array_equal(vec_masks, scalar_masks)
+
+        actions = np.array([
+            rng.choice(np.flatnonzero(mask)) if mask.any() else 0
+            for mask in scalar_masks
+        ])
+        vec_obs, vec_rewards, vec_done, _, infos = vec.step(actions)
+
+        for i, env in enumerate(envs):
+            obs, reward, terminated, _, _ = env.step(actions[i])
+            assert vec_rewards[i] == reward
+            assert vec_done[i] == terminated
+            if terminated:
+                assert np.array_equal(infos["final_observation"][i], obs)
+                obs, _ = env.reset()
+            assert np.array_equal(vec_obs[i], obs)
+
+
+class TestVecMealPlanningEnv:
+    def test_matches_scalar_env_exactly(self):
+        _run_lockstep(n_envs=16)
+
+    def test_matches_scalar_env_with_dislikes_and_custom_recipes(self):
+        _run_lockstep(
+            n_envs=8,
+            disliked_tags=["spicy", "sichuan"],
+            price_scale=1.3,
+            custom_recipes=CUSTOM_RECIPES,
+        )
+
+    def test_matches_scalar_env_with_strict_budget(self):
+        _run_lockstep(n_envs=8, strict_budget=True)
+
+    def test_auto_reset_after_episode(self):
+        vec = VecMealPlanningEnv(n_envs=4, training_mode=False)
+        vec.reset()
+        for _ in range(vec.max_steps):
+            masks = vec.action_masks()
+            actions = masks.argmax(axis=1)
+            obs, _, done, _, infos = vec.step(actions)
+
+        assert done.all()
+        assert infos["final_observation"][:, 0] == pytest.approx(1.0)
+        assert not infos["final_action_masks"].any()
+        assert np.all(obs[:, 0] == 0.0)
+        assert np.all(vec.step_idx == 0)
+
+    def test_curriculum_sampling_by_stage(self):
+        vec = VecMealPlanningEnv(n_envs=256, training_mode=True, seed=0)
+        vec.reset()
+        assert np.all(vec.targets[:, 0] == 2000.0)
+
+        vec.global_step = 400000
+        vec.reset()
+        assert vec.curriculum_stage == 3
+        assert vec.targets[:, 0].min() >= 1200.0
+        assert vec.targets[:, 0].max() <= 3000.0
+        assert vec.targets[:, 4].min() >= 24.0 * 1.2
+        assert len(np.unique(vec.targets[:, 1])) > 1
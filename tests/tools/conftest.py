@@ -0,0 +1,9 @@
+import pytest
+
+from intelligent_meal_planner.tools import model_registry
+
+
+@pytest.fixture
+def registry(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    return model_registry.ModelRegistry(model_path=str(path))
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.tools import rl_model_tool
+
+
+def _requests(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "target_calories": int(rng.integers(1500, 3000)),
+            "target_protein": int(rng.integers(60, 150)),
+            "target_carbs": int(rng.integers(100, 350)),
+            "target_fat": int(rng.integers(40, 120)),
+            "max_budget": float(rng.integers(20, 150)),
+            "disliked_ingredients": ["辣"] if i % 3 == 0 else None,
+            "strict_budget": i % 4 != 0,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("refine_max_swaps", [None, rl_model_tool.REFINE_MAX_SWAPS])
+def test_batch_matches_one_request_at_a_time(registry, refine_max_swaps):
+    tool = rl_model_tool.RLModelTool(registry=registry, refine_max_swaps=refine_max_swaps)
+    requests = _requests(60)
+
+    payloads = tool.run_batch(requests)
+
+    assert [payload.pop("index") for payload in payloads] == list(range(len(requests)))
+    statuses = {payload["status"] for payload in payloads}
+    assert statuses == {"ok", "budget_infeasible"}
+    for payload, request in zip(payloads, requests):
+        assert payload == json.loads(tool._run(**request))
+
+
+def test_batch_rejects_unknown_fields(registry):
+    tool = rl_model_tool.RLModelTool(registry=registry)
+
+    with pytest.raises(ValueError):
+        tool.run_batch([{"target_calories": 2000, "calories": 2000}])
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from intelligent_meal_planner.api.schemas import UserPreferences
+from intelligent_meal_planner.tools import model_registry, rl_model_tool
+
+
+TARGETS = dict(target_calories=2000, target_protein=100, target_carbs=250, target_fat=60, max_budget=60.0)
+
+
+def _replay_reward(plan):
+    env = rl_model_tool.make_planning_env(**TARGETS)
+    env.reset()
+    reward = 0.0
+    for slot in ("breakfast_0", "breakfast_1", "lunch_0", "lunch_1", "dinner_0", "dinner_1"):
+        _obs, reward, _terminated, _truncated, _info = env.step(plan[slot])
+    return reward
+
+
+def test_exact_backend_plan_is_at_least_as_good_as_dqn(registry):
+    dqn = json.loads(rl_model_tool.RLModelTool(registry=registry)._run(**TARGETS))
+    exact = json.loads(
+        rl_model_tool.RLModelTool(registry=registry, planner_backend="exact")._run(**TARGETS)
+    )
+
+    assert exact["status"] == "ok"
+    assert exact["metrics"]["total_cost"] <= TARGETS["max_budget"]
+    assert exact["metrics"]["final_reward"] == pytest.approx(_replay_reward(exact["meal_plan"]))
+    assert exact["metrics"]["final_reward"] >= dqn["metrics"]["final_reward"]
+
+
+def test_exact_backend_falls_back_to_dqn_within_the_node_budget(registry):
+    dqn = rl_model_tool.RLModelTool(registry=registry)._run(**TARGETS)
+    exact = rl_model_tool.RLModelTool(
+        registry=registry, planner_backend="exact", exact_max_nodes=0
+    )
+
+    assert exact._run(**TARGETS) == dqn
+    assert json.loads(exact._run(max_budget=1.0))["status"] == "budget_infeasible"
+
+
+def test_backend_comes_from_the_environment(registry, monkeypatch):
+    monkeypatch.setenv("RL_PLANNER_BACKEND", "exact")
+    assert rl_model_tool.RLModelTool(registry=registry).backend == "exact"
+
+    with pytest.raises(ValueError):
+        rl_model_tool.RLModelTool(registry=registry, planner_backend="ilp")
+
+
+def test_meal_plan_service_uses_the_exact_backend(registry, monkeypatch):
+    from intelligent_meal_planner.api.services import MealPlanService
+
+    monkeypatch.setattr(model_registry, "_registry", registry)
+    preferences = UserPreferences(max_budget=80.0)
+    exact = MealPlanService(planner_backend="exact").generate_plan(preferences)
+    dqn = MealPlanService(planner_backend="dqn").generate_plan(preferences)
+
+    assert len(exact.meals) == 6
+    assert exact.score >= dqn.score
@@ -0,0 +1,69 @@
+from intelligent_meal_planner.tools import model_registry, rl_model_tool
+
+
+def test_registry_loads_once_and_shares_policy(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    registry = model_registry.ModelRegistry(model_path=str(path), poll_interval=0.0)
+
+    first = rl_model_tool.RLModelTool(registry=registry)
+    second = rl_model_tool.RLModelTool(registry=registry)
+
+    assert first.model is second.model
+    assert first.inference_engine == "numpy"
+    assert registry.reload_count == 1
+
+
+def test_registry_hot_swaps_changed_checkpoint(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy", seed=0, mtime_ns=1_000_000_000)
+    registry = model_registry.ModelRegistry(model_path=str(path), poll_interval=0.0)
+    old = registry.get()
+
+    write_policy(path, seed=1, mtime_ns=2_000_000_000)
+    new = registry.get()
+
+    assert new.model is not old.model
+    assert new.version != old.version
+    assert registry.reload_count == 2
+    assert registry.get() is new
+
+
+def test_registry_keeps_serving_when_reload_fails(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy", mtime_ns=1_000_000_000)
+    registry = model_registry.ModelRegistry(model_path=str(path), poll_interval=0.0)
+    old = registry.get()
+
+    path.write_bytes(b"partially written")
+    assert registry.get() is old
+
+
+def test_registry_resolves_best_checkpoint_under_project_root(tmp_path, monkeypatch, write_policy):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    monkeypatch.setattr(model_registry, "default_project_root", lambda: tmp_path)
+    write_policy(models_dir / "dqn_meal_final.policy")
+    registry = model_registry.ModelRegistry(poll_interval=0.0)
+    assert registry.get().path.name == "dqn_meal_final.policy"
+
+    write_policy(models_dir / "dqn_meal_best.policy", seed=1)
+    assert registry.get().path.name == "dqn_meal_best.policy"
+
+
+def test_warm_start_runs_a_plan(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    registry = model_registry.ModelRegistry(model_path=str(path))
+
+    loaded = registry.warm_start()
+
+    assert loaded.engine == "numpy"
+    assert registry.reload_count == 1
+
+
+def test_create_rl_model_tool_uses_shared_registry(tmp_path, monkeypatch, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    registry = model_registry.ModelRegistry(model_path=str(path))
+    monkeypatch.setattr(model_registry, "_registry", registry)
+
+    tool = rl_model_tool.create_rl_model_tool()
+
+    assert tool.registry is registry
+    assert tool.model is registry.get().model
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+from intelligent_meal_planner.api.schemas import NegotiatedMealPlanResponse, UserPreferences
+from intelligent_meal_planner.tools import model_registry, rl_model_tool
+
+
+def _replay_reward(plan, **targets):
+    env = rl_model_tool.make_planning_env(**targets)
+    env.reset()
+    reward = 0.0
+    for slot in ("breakfast_0", "breakfast_1", "lunch_0", "lunch_1", "dinner_0", "dinner_1"):
+        _obs, reward, _terminated, _truncated, _info = env.step(plan[slot])
+    return reward
+
+
+def test_clone_does_not_share_episode_state():
+    env = rl_model_tool.make_planning_env(2000, 100, 250, 60, 80.0)
+    env.reset()
+    action = int(np.flatnonzero(env.action_masks())[0])
+    clone = env.clone()
+    clone.step(action)
+
+    assert env.current_step_idx == 0 and env.selected_actions == []
+    assert env.action_masks()[action]
+    assert not clone.action_masks()[action]
+
+
+def test_returns_distinct_plans_ranked_by_env_reward(registry):
+    tool = rl_model_tool.RLModelTool(registry=registry)
+    targets = dict(target_calories=2000, target_protein=100, target_carbs=250, target_fat=60, max_budget=60.0)
+
+    plans = tool.generate_multiple_plans(num_plans=3, **targets)
+
+    assert len(plans) == 3
+    dish_sets = [frozenset(plan["meal_plan"].values()) for plan in plans]
+    assert len(set(dish_sets)) == 3
+    rewards = [plan["metrics"]["final_reward"] for plan in plans]
+    assert rewards == sorted(rewards, reverse=True)
+    for plan in plans:
+        assert len(plan["meal_plan"]) == 6
+        assert plan["metrics"]["total_cost"] <= 60.0
+        assert plan["metrics"]["final_reward"] == pytest.approx(
+            _replay_reward(plan["meal_plan"], strict_budget=True, **targets)
+        )
+
+
+def test_falls_back_to_greedy_plan_when_no_beam_completes(registry):
+    tool = rl_model_tool.RLModelTool(registry=registry)
+
+    plans = tool.generate_multiple_plans(num_plans=3, max_budget=1.0)
+
+    assert len(plans) == 1
+    assert plans[0]["status"] == "budget_infeasible"
+    assert plans[0] == json.loads(tool._run(max_budget=1.0))
+
+
+def test_meal_plan_service_returns_primary_and_alternatives(registry, monkeypatch):
+    from intelligent_meal_planner.api.services import MealPlanService
+
+    monkeypatch.setattr(model_registry, "_registry", registry)
+    options = MealPlanService().generate_plan_options(UserPreferences(max_budget=80.0))
+
+    response = NegotiatedMealPlanResponse.model_validate(options)
+    assert len(response.alternatives) == 2
+    ids = {response.primary.id} | {alt.meal_plan.id for alt in response.alternatives}
+    assert len(ids) == 3
@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+
+import pytest
+
+from intelligent_meal_planner.tools import model_registry, rl_model_tool
+from intelligent_meal_planner.tools.plan_cache import PlanCache
+
+
+def test_quantized_targets_share_a_key():
+    cache = PlanCache(calorie_step=10, macro_step=1, budget_step=0.5)
+    a = cache.quantize_targets(2001, 99.8, 250.2, 60, 50.1)
+    b = cache.quantize_targets(1999, 100.3, 249.9, 60.4, 49.9)
+
+    assert a == b
+    assert cache.quantize_targets(2000, 100, 250, 60, 38.78, strict_budget=True)["max_budget"] == 38.5
+    assert cache.make_key(a, ["辣", "海鲜"], True, "m1", "c1") == cache.make_key(
+        b, ["海鲜", "辣"], True, "m1", "c1"
+    )
+    assert cache.make_key(a, [], True, "m1", "c1") != cache.make_key(a, [], True, "m2", "c1")
+    assert cache.make_key(a, [], True, "m1", "c1") != cache.make_key(a, [], False, "m1", "c1")
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = PlanCache(max_entries=2, ttl_seconds=10)
+
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    assert cache.get_or_compute("a", lambda: -1) == 1
+    cache.get_or_compute("c", lambda: 3)  # evicts "b", the least recently used
+    assert cache.get_or_compute("b", lambda: 22) == 22
+
+    now[0] += 11
+    assert cache.get_or_compute("c", lambda: 33) == 33
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 5
+    assert stats["evictions"] == 2
+    assert stats["expirations"] == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = PlanCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "plan"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["coalesced"] < 7:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["plan"] * 8
+    assert cache.stats()["misses"] == 1
+
+
+def test_failures_are_not_cached():
+    cache = PlanCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+    assert cache.stats()["entries"] == 1
+
+
+def test_tool_serves_nearby_targets_from_cache(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    registry = model_registry.ModelRegistry(model_path=str(path))
+    cache = PlanCache()
+    tool = rl_model_tool.RLModelTool(registry=registry, plan_cache=cache)
+
+    first = json.loads(tool._run(target_calories=2001, max_budget=50.1))
+    second = json.loads(tool._run(target_calories=1998, max_budget=50.4))
+
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+    assert first["meal_plan"] == second["meal_plan"]
+    assert second["target"]["calories"] == 1998
+    assert second["metrics"]["calories_achievement"] == pytest.approx(
+        second["metrics"]["total_calories"] / 1998 * 100
+    )
+
+    tool._run(target_calories=2001, disliked_ingredients=["辣"])
+    assert cache.stats()["misses"] == 2
+
+
+def test_cached_plans_respect_the_callers_strict_budget(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    registry = model_registry.ModelRegistry(model_path=str(path))
+    cached = rl_model_tool.RLModelTool(registry=registry, plan_cache=PlanCache(budget_step=0.5))
+    uncached = rl_model_tool.RLModelTool(registry=registry)
+
+    # Both budgets sit just under a bucket boundary that rounding would cross.
+    # At 38.78 the plan for 39.0 costs 39.0, so no plan fits.
+    for budget in (38.78, 64.78):
+        payload = json.loads(cached._run(max_budget=budget))
+        assert payload["status"] == json.loads(uncached._run(max_budget=budget))["status"]
+        if payload["status"] != "ok":
+            continue
+        assert payload["metrics"]["total_cost"] <= budget
+
+        env = rl_model_tool.make_planning_env(2000, 100, 250, 60, budget)
+        slots = [rl_model_tool.plan_slot(env, step) for step in range(env.max_steps)]
+        _plan, expected, _status = rl_model_tool.replay_plan(
+            env, [payload["meal_plan"][slot] for slot in slots]
+        )
+        assert payload["metrics"] == expected
+
+
+def test_refined_and_unrefined_tools_do_not_share_plans(tmp_path, write_policy):
+    path = write_policy(tmp_path / "dqn_meal_best.policy")
+    registry = model_registry.ModelRegistry(model_path=str(path))
+    cache = PlanCache()
+
+    for refine_max_swaps in (None, 20, 5):
+        tool = rl_model_tool.RLModelTool(
+            registry=registry, plan_cache=cache, refine_max_swaps=refine_max_swaps
+        )
+        payload = json.loads(tool._run(max_budget=80.0))
+        assert ("refinement" in payload["metrics"]) == (refine_max_swaps is not None)
+
+    assert cache.stats()["misses"] == 3 and cache.stats()["hits"] == 0
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from intelligent_meal_planner.tools import rl_model_tool
+
+
+TARGETS = dict(target_calories=1500, target_protein=75, target_carbs=180, target_fat=50, max_budget=80.0)
+
+
+def test_refined_plan_reports_the_reward_gained(registry):
+    greedy = json.loads(rl_model_tool.RLModelTool(registry=registry)._run(**TARGETS))
+    refined = json.loads(
+        rl_model_tool.RLModelTool(registry=registry, refine_max_swaps=rl_model_tool.REFINE_MAX_SWAPS)._run(**TARGETS)
+    )
+
+    refinement = refined["metrics"]["refinement"]
+    assert "refinement" not in greedy["metrics"]
+    assert refinement["initial_reward"] == pytest.approx(greedy["metrics"]["final_reward"])
+    assert refined["metrics"]["final_reward"] == pytest.approx(
+        refinement["initial_reward"] + refinement["reward_gain"]
+    )
+    assert refinement["reward_gain"] >= 0
+    assert refined["metrics"]["total_cost"] <= TARGETS["max_budget"]
+
+
+def test_infeasible_plans_are_not_refined(registry):
+    tool = rl_model_tool.RLModelTool(registry=registry, refine_max_swaps=rl_model_tool.REFINE_MAX_SWAPS)
+
+    payload = json.loads(tool._run(max_budget=1.0))
+
+    assert payload["status"] == "budget_infeasible"
+    assert "refinement" not in payload["metrics"]
@@ -0,0 +1,75 @@
+import json
+import threading
+
+import pytest
+
+from intelligent_meal_planner.tools import rl_model_tool
+from intelligent_meal_planner.tools.planner_service import PlannerService
+
+
+REQUESTS = [
+    dict(target_calories=1800, target_protein=90, target_carbs=220, target_fat=55, max_budget=40.0),
+    dict(target_calories=2400, target_protein=140, target_carbs=280, target_fat=70, max_budget=80.0),
+    dict(target_calories=2000, target_protein=100, target_carbs=250, target_fat=60, max_budget=5.0),
+    dict(target_calories=2100, target_protein=110, target_carbs=240, target_fat=65, max_budget=60.0,
+         disliked_ingredients=["辣"]),
+]
+
+
+def test_batched_rollouts_match_sequential_plans(registry):
+    tool = rl_model_tool.RLModelTool(registry=registry)
+    envs = [rl_model_tool.make_planning_env(**request) for request in REQUESTS]
+
+    batched = rl_model_tool.rollout_plans(registry.get().model, envs)
+
+    for request, (meal_plan, metrics, status) in zip(REQUESTS, batched):
+        expected = json.loads(tool._run(**request))
+        assert status == expected["status"]
+        assert meal_plan == expected["meal_plan"]
+        assert metrics["total_cost"] == pytest.approx(expected["metrics"]["total_cost"])
+
+
+def test_concurrent_requests_share_batches(registry):
+    service = PlannerService(registry=registry, max_wait_ms=50.0)
+    results = [None] * 16
+    start = threading.Barrier(len(results))
+
+    def call(i):
+        start.wait()
+        results[i] = service.plan(timeout=10, **REQUESTS[i % len(REQUESTS)])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    stats = service.stats()
+    assert stats["requests"] == 16
+    assert stats["batches"] < 16
+    for i, result in enumerate(results):
+        assert result == results[i % len(REQUESTS)]
+
+
+def test_bad_request_fails_alone(registry):
+    service = PlannerService(registry=registry, max_wait_ms=20.0)
+    bad = service.submit(target_calories=2000)
+    good = service.submit(**REQUESTS[0])
+
+    with pytest.raises(TypeError):
+        bad.result(timeout=10)
+    assert good.result(timeout=10)[2] == "ok"
+    service.close()
+
+
+def test_tool_delegates_to_planner(registry):
+    service = PlannerService(registry=registry)
+    direct = json.loads(rl_model_tool.RLModelTool(registry=registry)._run(**REQUESTS[1]))
+    batched = json.loads(
+        rl_model_tool.RLModelTool(registry=registry, planner=service)._run(**REQUESTS[1])
+    )
+    service.close()
+
+    assert batched == direct
+    assert service.stats()["requests"] == 1
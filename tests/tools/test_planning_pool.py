@@ -0,0 +1,72 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from intelligent_meal_planner.tools.planning_pool import (
+    PlanningPool,
+    PlanningPoolSaturatedError,
+    PlanningTimeoutError,
+)
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    pool = PlanningPool(max_workers=1, max_queue=1, timeout_seconds=5)
+    release = threading.Event()
+    running = pool.submit(release.wait, 5)
+    queued = pool.submit(lambda: "queued")
+
+    with pytest.raises(PlanningPoolSaturatedError):
+        pool.submit(lambda: "rejected")
+
+    release.set()
+    assert running.result(timeout=5) is True
+    assert queued.result(timeout=5) == "queued"
+    assert pool.run(lambda: "admitted") == "admitted"
+    stats = pool.stats()
+    assert stats["rejected"] == 1 and stats["in_flight"] == 0 and stats["completed"] == 3
+    pool.shutdown()
+
+
+def test_timeout_keeps_slot_until_call_finishes():
+    pool = PlanningPool(max_workers=1, max_queue=0, timeout_seconds=0.05)
+    release = threading.Event()
+
+    with pytest.raises(PlanningTimeoutError):
+        pool.run(release.wait, 5)
+    with pytest.raises(PlanningPoolSaturatedError):
+        pool.submit(lambda: None)
+
+    release.set()
+    pool.shutdown()
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_run_async_does_not_block_the_event_loop():
+    pool = PlanningPool(max_workers=1, timeout_seconds=5)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run_async(release.wait, 5))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        release.set()
+        return await task
+
+    assert asyncio.run(scenario()) is True
+    pool.shutdown()
+
+
+def test_process_mode_runs_in_worker_processes():
+    pool = PlanningPool(mode="process", max_workers=1, timeout_seconds=120)
+    try:
+        assert pool.run(os.getpid) != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        PlanningPool(mode="gpu")
@@ -93,3 +93,20 @@ def test_rl_model_tool_runs_inference_with_dqn_backend(tmp_path, monkeypatch):
     assert captured["mask_len"] == 150
     assert captured["deterministic"] is True
     assert captured["env_kwargs"]["training_mode"] is False
+
+
+def test_rl_model_tool_prefers_inference_export(tmp_path, monkeypatch, write_policy):
+    model_path = tmp_path / "dqn_meal_best.pt"
+    model_path.write_text("stub", encoding="utf-8")
+    write_policy(tmp_path / "dqn_meal_best.policy", action_dim=150)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("torch checkpoint should not be loaded")
+
+    monkeypatch.setattr(rl_model_tool.MaskableDQNAgent, "from_pretrained", classmethod(fail))
+
+    tool = rl_model_tool.RLModelTool(model_path=str(model_path))
+    tool._load_model()
+
+    assert tool.inference_engine == "numpy"
+    assert tool.model.action_dim == 150